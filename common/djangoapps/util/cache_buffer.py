@@ -0,0 +1,112 @@
+"""
+Cache-backed write buffers.
+
+Writers append entries to a sequence of numbered cache slots and a single
+flusher at a time reads them back in order, in batches, between its cursor
+and the current sequence number. Request handlers only pay a couple of
+cache round trips and the database sees bulk writes.
+"""
+import logging
+
+from django.core.cache import cache
+
+log = logging.getLogger(__name__)
+
+
+def incr_counter(key, delta=1):
+    """
+    Increment the cache counter `key` by `delta`, creating it when missing.
+    """
+    cache.add(key, 0, None)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # The key was evicted between add and incr.
+        cache.set(key, delta, None)
+        return delta
+
+
+class CacheSlotBuffer(object):
+    """
+    Entries stored in numbered cache slots and read back in order by flush.
+
+    A slot is taken before its entry is stored, so the flush may find a slot
+    whose writer has not stored it yet. It stops there and only skips the
+    slot if it is still missing on the next flush, i.e. the entry was evicted.
+    """
+    def __init__(self, prefix, entry_timeout, batch_size, lock_timeout=5 * 60):
+        self.prefix = prefix
+        self.entry_timeout = entry_timeout
+        self.batch_size = batch_size
+        self.lock_timeout = lock_timeout
+        self.sequence_key = prefix + '.sequence'
+        self.cursor_key = prefix + '.cursor'
+        self.stalled_slot_key = prefix + '.stalled'
+        self.lock_key = prefix + '.flush_lock'
+
+    def _slot_key(self, slot):
+        return u'{}.slot.{}'.format(self.prefix, slot)
+
+    def append(self, entry):
+        """
+        Store `entry` in the next slot. Returns False when the sequence was
+        evicted meanwhile and the entry could not be buffered.
+        """
+        cache.add(self.sequence_key, 0, None)
+        try:
+            slot = cache.incr(self.sequence_key)
+        except ValueError:
+            return False
+        cache.set(self._slot_key(slot), entry, self.entry_timeout)
+        return True
+
+    def flush(self, write):
+        """
+        Pass the entries of the pending slots to `write`, one batch at a time.
+
+        Returns the sum of the values returned by `write`, 0 when another
+        flush is already running.
+        """
+        if not cache.add(self.lock_key, True, self.lock_timeout):
+            log.info(u'Flush of %s already running, skipping.', self.prefix)
+            return 0
+
+        written = 0
+        try:
+            cursor = cache.get(self.cursor_key) or 0
+            sequence = cache.get(self.sequence_key) or 0
+            if sequence < cursor:
+                # The sequence was evicted and restarted from zero.
+                cursor = 0
+            while cursor < sequence:
+                slots = range(cursor + 1, min(cursor + self.batch_size, sequence) + 1)
+                entries, cursor = self._read_slots(slots)
+                written += write(entries)
+                cache.set(self.cursor_key, cursor, None)
+                if cursor < slots[-1]:
+                    # Stopped on a slot whose writer has not stored it yet.
+                    break
+        finally:
+            cache.delete(self.lock_key)
+        return written
+
+    def _read_slots(self, slots):
+        """
+        Read and clear the entries of `slots`, returning them with the new cursor.
+        """
+        slot_values = cache.get_many([self._slot_key(slot) for slot in slots])
+        entries = []
+        cursor = slots[0] - 1
+        for slot in slots:
+            entry = slot_values.get(self._slot_key(slot))
+            if entry is None:
+                if cache.get(self.stalled_slot_key) != slot:
+                    cache.set(self.stalled_slot_key, slot, self.entry_timeout)
+                    break
+                log.warning(u'Slot %s of %s is missing, skipping it.', slot, self.prefix)
+            else:
+                entries.append(entry)
+            cursor = slot
+
+        cache.delete_many([self._slot_key(slot) for slot in slots[:cursor - slots[0] + 1]])
+        return entries, cursor
@@ -1,4 +1,6 @@
 """ Utility functions related to database queries """
+from itertools import islice
+
 from django.conf import settings
 
 
@@ -7,3 +9,16 @@ def use_read_replica_if_available(queryset):
     If there is a database called 'read_replica', use that database for the queryset.
     """
     return queryset.using("read_replica") if "read_replica" in settings.DATABASES else queryset
+
+
+def batches(iterable, batch_size):
+    """
+    Yields lists of up to batch_size consecutive items of the iterable,
+    for instance to read the related rows of each batch in bulk.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,59 @@
+"""
+Tests for the cache slot buffers.
+"""
+from django.core.cache import cache
+
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from util.cache_buffer import CacheSlotBuffer
+
+
+class CacheSlotBufferTest(CacheIsolationTestCase):
+    """
+    Tests that buffered entries are flushed once, in order and in batches.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(CacheSlotBufferTest, self).setUp()
+        self.buffer = CacheSlotBuffer('test.buffer', 60, batch_size=2)
+        self.batches = []
+
+    def write(self, entries):
+        self.batches.append(entries)
+        return len(entries)
+
+    def test_flush_in_batches(self):
+        for entry in range(5):
+            self.assertTrue(self.buffer.append(entry))
+
+        self.assertEqual(self.buffer.flush(self.write), 5)
+        self.assertEqual(self.batches, [[0, 1], [2, 3], [4]])
+        self.assertEqual(self.buffer.flush(self.write), 0)
+
+    def test_missing_slot_is_skipped_on_next_flush(self):
+        for entry in range(3):
+            self.buffer.append(entry)
+        # The writer of slot 2 took it but did not store its entry yet.
+        cache.delete(self.buffer._slot_key(2))  # pylint: disable=protected-access
+
+        self.assertEqual(self.buffer.flush(self.write), 1)
+        self.assertEqual(self.buffer.flush(self.write), 1)
+        self.assertEqual(self.batches, [[0], [2]])
+
+    def test_flush_is_exclusive(self):
+        self.buffer.append(0)
+        cache.add(self.buffer.lock_key, True)
+        self.assertEqual(self.buffer.flush(self.write), 0)
+
+        cache.delete(self.buffer.lock_key)
+        self.assertEqual(self.buffer.flush(self.write), 1)
+
+    def test_evicted_sequence_restarts(self):
+        self.buffer.append(0)
+        self.buffer.append(1)
+        self.buffer.flush(self.write)
+        cache.delete(self.buffer.sequence_key)
+
+        self.buffer.append(2)
+        self.assertEqual(self.buffer.flush(self.write), 1)
+        self.assertEqual(self.batches, [[0, 1], [2]])
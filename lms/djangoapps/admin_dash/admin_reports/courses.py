@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db.models import Count, Sum, Case, When, IntegerField
+from opaque_keys.edx.keys import CourseKey
+
+from student.models import CourseEnrollment
+from leaderboard.models import LeaderBoard
+from admin_dash.models import CourseStats
+
+COUNTERS = ('enrollments', 'passed', 'in_progress')
+
+
+def compute_course_stats(course_keys):
+    """
+    Count enrollments, passed and in progress learners of `course_keys`
+    with one grouped query over each source table.
+    """
+    stats = dict((course_key, dict.fromkeys(COUNTERS, 0)) for course_key in course_keys)
+    if not stats:
+        return stats
+
+    enrollments = CourseEnrollment.objects.filter(
+        course_id__in=course_keys
+    ).values(
+        'course_id'
+    ).annotate(
+        count=Count('id')
+    )
+    for row in enrollments:
+        stats[row['course_id']]['enrollments'] = row['count']
+
+    course_keys_by_id = dict((unicode(course_key), course_key) for course_key in course_keys)
+    progress = LeaderBoard.objects.filter(
+        course_id__in=course_keys_by_id.keys()
+    ).values(
+        'course_id'
+    ).annotate(
+        passed=Sum(Case(When(has_passed=True, then=1), default=0, output_field=IntegerField())),
+        in_progress=Sum(Case(When(has_passed=False, points__gt=0, then=1), default=0, output_field=IntegerField()))
+    )
+    for row in progress:
+        counters = stats[course_keys_by_id[row['course_id']]]
+        counters['passed'] = row['passed'] or 0
+        counters['in_progress'] = row['in_progress'] or 0
+
+    return stats
+
+
+def precomputed_course_stats_enabled():
+    return getattr(settings, 'ADMIN_DASH_PRECOMPUTED_COURSE_STATS', False)
+
+
+def mark_course_stats_stale(course_ids):
+    """
+    Flag the precomputed stats of `course_ids`, course keys or their string
+    form, for recomputation on next read. Courses without stored stats are
+    computed on first read anyway.
+
+    Skipped unless ADMIN_DASH_PRECOMPUTED_COURSE_STATS is set, to keep the
+    enrollment and grade change paths free of writes.
+    """
+    if not precomputed_course_stats_enabled():
+        return
+    course_keys = [
+        course_id if isinstance(course_id, CourseKey) else CourseKey.from_string(course_id)
+        for course_id in course_ids
+    ]
+    CourseStats.objects.filter(course_id__in=course_keys, stale=False).update(stale=True)
+
+
+def get_course_stats(course_keys):
+    """
+    Return {course_key: {'enrollments', 'passed', 'in_progress'}} for `course_keys`.
+
+    With ADMIN_DASH_PRECOMPUTED_COURSE_STATS the counters are read from
+    CourseStats, only recomputing courses flagged stale or not stored yet.
+    """
+    if not precomputed_course_stats_enabled():
+        return compute_course_stats(course_keys)
+
+    stale = set()
+    stored = {}
+    for row in CourseStats.objects.filter(course_id__in=course_keys):
+        stored[row.course_id] = dict((counter, getattr(row, counter)) for counter in COUNTERS)
+        if row.stale:
+            stale.add(row.course_id)
+    refresh = [course_key for course_key in course_keys if course_key in stale or course_key not in stored]
+    if refresh:
+        # Cleared before counting so that changes made meanwhile flag the rows again.
+        CourseStats.objects.filter(course_id__in=stale).update(stale=False)
+        fresh = compute_course_stats(refresh)
+        CourseStats.store(fresh)
+        stored.update(fresh)
+    return stored
@@ -1,8 +1,28 @@
-from django.contrib.auth.models import User
+from datetime import datetime
 from collections import OrderedDict
 
+from pytz import UTC
 
-def get_demographics():
+from student.models import UserProfile
+from admin_dash.models import DemographicsRollup
+from admin_dash.helpers import get_users
+
+
+def get_age_bucket(year_of_birth, current_year):
+    if year_of_birth == DemographicsRollup.UNKNOWN:
+        return 'Unknown'
+    # Same conservative estimate as UserProfile.age
+    age = current_year - int(year_of_birth) - 1
+    if age > 0 and age <= 15:
+        return '1-15'
+    elif age > 15 and age <= 25:
+        return '16-25'
+    elif age > 25 and age <= 40:
+        return '26-40'
+    return '41-above'
+
+
+def get_demographics(orgs=None):
     # Initialize default values
     EDUCATION_LABELS = ["Unknown", "Doctorate", "Masters", "Bachelors degree", "Associate",
                         "Secondary", "Junior secondary", "Elementary", "None", "Other"]
@@ -31,33 +51,36 @@ def get_demographics():
         ('f', 0),
         ('o', 0)
     ])
-    # Get all the active users
-    users = User.objects.filter(is_active=True)
-
-    # Filter the users
-    for user in users:
-        # Filter by age
-        if user.profile.age == None:
-            age_distribution['Unknown'] += 1
-        elif user.profile.age > 0 and user.profile.age <= 15:
-            age_distribution['1-15'] += 1
-        elif user.profile.age > 15 and user.profile.age <= 25:
-            age_distribution['16-25'] += 1
-        elif user.profile.age > 25 and user.profile.age <= 40:
-            age_distribution['26-40'] += 1
-        else:
-            age_distribution['41-above'] += 1
+    if orgs:
+        # Counted over the active learners of the organizations' courses.
+        distributions = DemographicsRollup.distributions(DemographicsRollup.count(
+            UserProfile.objects.filter(user__in=get_users(orgs).filter(is_active=True).values('id'))
+        ))
+    else:
+        # Counts of active users, maintained from profile and user changes
+        distributions = DemographicsRollup.distributions()
+
+    # Filter by age
+    current_year = datetime.now(UTC).year
+    for year_of_birth, count in distributions['year_of_birth'].iteritems():
+        age_distribution[get_age_bucket(year_of_birth, current_year)] += count
 
-        # Fitler by education
-        if not user.profile.level_of_education:
-            education_distribution['unknown'] += 1
+    # Fitler by education
+    for level_of_education, count in distributions['level_of_education'].iteritems():
+        if level_of_education == DemographicsRollup.UNKNOWN:
+            education_distribution['unknown'] += count
+        elif level_of_education in education_distribution:
+            education_distribution[level_of_education] += count
         else:
-            education_distribution[user.profile.level_of_education] += 1
+            education_distribution['other'] += count
 
-        # Filter by gender
-        if not user.profile.gender:
-            gender_distribution['Unknown'] += 1
+    # Filter by gender
+    for gender, count in distributions['gender'].iteritems():
+        if gender == DemographicsRollup.UNKNOWN:
+            gender_distribution['Unknown'] += count
+        elif gender in gender_distribution:
+            gender_distribution[gender] += count
         else:
-            gender_distribution[user.profile.gender] += 1
+            gender_distribution['o'] += count
 
     return age_distribution, education_distribution, gender_distribution, EDUCATION_LABELS
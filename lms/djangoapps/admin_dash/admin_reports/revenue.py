@@ -0,0 +1,83 @@
+from collections import OrderedDict, defaultdict
+from datetime import date
+
+from django.db import connection
+from django.db.models import Sum, F, DecimalField
+
+from shoppingcart.models import PaidCourseRegistration, CourseRegCodeItem
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from admin_dash.models import MonthlyRevenue
+
+FULFILLED_TIME_COLUMN = 'shoppingcart_orderitem.fulfilled_time'
+
+
+def item_revenue(item):
+    """
+    Amount earned by a purchased PaidCourseRegistration or CourseRegCodeItem.
+    """
+    if isinstance(item, CourseRegCodeItem):
+        return item.qty * item.unit_cost
+    return item.unit_cost
+
+
+def compute_monthly_revenue():
+    """
+    Sum the revenue of purchased course items per (month, course_id) with one
+    grouped query per item type.
+    """
+    month_columns = {
+        'year': connection.ops.date_extract_sql('year', FULFILLED_TIME_COLUMN),
+        'month': connection.ops.date_extract_sql('month', FULFILLED_TIME_COLUMN),
+    }
+    sources = (
+        (PaidCourseRegistration, Sum('unit_cost')),
+        (CourseRegCodeItem, Sum(F('qty') * F('unit_cost'), output_field=DecimalField())),
+    )
+    totals = defaultdict(int)
+    for model, amount in sources:
+        rows = model.objects.filter(
+            status='purchased',
+            fulfilled_time__isnull=False
+        ).extra(
+            select=month_columns
+        ).values(
+            'year', 'month', 'course_id'
+        ).annotate(
+            total=amount
+        ).order_by()
+        for row in rows:
+            totals[(date(int(row['year']), int(row['month']), 1), row['course_id'])] += row['total'] or 0
+    return totals
+
+
+def get_revenue_report(start_date=None, end_date=None, orgs=None):
+    """
+    Return the revenue per calendar month and per course between `start_date`
+    and `end_date` (both optional, inclusive at month granularity), of the
+    courses of `orgs` or of all courses.
+
+    The per-month revenue is keyed '1' to '12' and adds up every year in the
+    range; course names and their revenue are returned as parallel lists.
+    """
+    rows = MonthlyRevenue.objects.all()
+    if orgs:
+        rows = rows.filter(course_id__in=CourseOverview.objects.filter(org__in=orgs).values('id'))
+    if start_date is not None:
+        rows = rows.filter(month__gte=start_date.replace(day=1))
+    if end_date is not None:
+        rows = rows.filter(month__lte=end_date)
+
+    # The summary holds one row per course and month, small enough to fold here.
+    month_wise_report = OrderedDict((str(month), 0) for month in range(1, 13))
+    revenue_by_course = OrderedDict()
+    for month, course_id, amount in rows.order_by('course_id', 'month').values_list('month', 'course_id', 'amount'):
+        month_wise_report[str(month.month)] += float(amount)
+        revenue_by_course[course_id] = revenue_by_course.get(course_id, 0) + float(amount)
+
+    overviews = CourseOverview.objects.in_bulk(revenue_by_course.keys())
+    course_list = []
+    for course_id in revenue_by_course:
+        overview = overviews.get(course_id)
+        course_list.append(unicode(overview.display_name) if overview is not None else unicode(course_id))
+
+    return month_wise_report, course_list, revenue_by_course.values()
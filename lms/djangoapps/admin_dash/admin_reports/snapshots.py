@@ -0,0 +1,181 @@
+"""
+Precomputed snapshots of the admin dashboard insight reports.
+
+Every report is a provider registered with `register_report`, returning a
+JSON serializable payload. With ADMIN_DASH_REPORT_SNAPSHOT_INTERVAL_SECONDS
+set, the providers run on that schedule from celery beat, or on demand from
+the "refresh now" action, and the views serve the latest stored snapshot
+instead of computing the report during the request. Until the first
+snapshot of a report is stored, its views serve an empty placeholder
+payload flagged as being built.
+
+Providers take the organizations a site reports on (None for the whole
+platform) and snapshots are stored per scope, so each site's dashboard
+only computes and reads its own data.
+"""
+import copy
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from admin_dash.models import ReportSnapshot
+from admin_dash.helpers import (
+    get_courses, get_num_students, get_num_courses, get_num_instructors, get_scope_key, get_scope_orgs
+)
+from admin_dash.utils import get_last_month
+from admin_dash.admin_reports.traffic import get_traffic_report
+from admin_dash.admin_reports.demographics import get_demographics
+from admin_dash.admin_reports.courses import get_course_stats
+from admin_dash.admin_reports.revenue import get_revenue_report
+
+REFRESH_LOCK_KEY = u'admin_dash.snapshot_refresh.{}.{}'
+REFRESH_LOCK_TIMEOUT = 10 * 60
+
+PROVIDERS = OrderedDict()
+PLACEHOLDERS = {}
+
+
+def register_report(name, placeholder):
+    """
+    Register the decorated function as the provider of report `name`.
+
+    `placeholder` is a payload of the same shape without data, served while
+    the first snapshot of the report is being built.
+    """
+    def decorator(provider):
+        PROVIDERS[name] = provider
+        PLACEHOLDERS[name] = placeholder
+        return provider
+    return decorator
+
+
+def snapshots_enabled():
+    return bool(getattr(settings, 'ADMIN_DASH_REPORT_SNAPSHOT_INTERVAL_SECONDS', 0))
+
+
+def stored_scopes():
+    """
+    Scope keys of the stored snapshots, always including the whole platform.
+    """
+    return sorted(set(ReportSnapshot.objects.values_list('scope', flat=True).distinct()) | {u''})
+
+
+def refresh_snapshot(name, scope=u''):
+    """
+    Compute report `name` for the scope key `scope` and store it as its
+    latest snapshot.
+    """
+    generated_at = timezone.now()
+    payload = PROVIDERS[name](get_scope_orgs(scope))
+    return ReportSnapshot.store(name, scope, json.dumps(payload), generated_at)
+
+
+def request_refresh(name, orgs=None):
+    """
+    Queue the refresh of report `name` for `orgs` unless one is already
+    pending, returns whether a refresh was queued.
+    """
+    scope = get_scope_key(orgs)
+    if not cache.add(REFRESH_LOCK_KEY.format(name, scope), True, REFRESH_LOCK_TIMEOUT):
+        return False
+    from admin_dash.tasks import refresh_report_snapshots
+    refresh_report_snapshots.delay([name], [scope])
+    return True
+
+
+def release_refresh(name, scope=u''):
+    cache.delete(REFRESH_LOCK_KEY.format(name, scope))
+
+
+def get_report(name, orgs=None):
+    """
+    Return the payload of report `name` for `orgs`, when it was generated
+    and whether it is still being built.
+
+    The latest snapshot is served when snapshots are enabled. When none was
+    stored yet its refresh is queued and the placeholder of the report is
+    served meanwhile, with no generation time. Without snapshots the report
+    is computed live and the generation time is None.
+    """
+    if not snapshots_enabled():
+        return PROVIDERS[name](orgs), None, False
+    scope = get_scope_key(orgs)
+    snapshot = ReportSnapshot.latest(name, scope)
+    if snapshot is None:
+        request_refresh(name, orgs)
+        return copy.deepcopy(PLACEHOLDERS[name]), None, True
+    return json.loads(snapshot.payload, object_pairs_hook=OrderedDict), snapshot.generated_at, False
+
+
+@register_report('dashboard', {
+    'num_students': 0,
+    'num_instructors': 0,
+    'num_courses': 0,
+    'start_date_str': '',
+    'end_date_str': '',
+    'traffic_report': {'date_list': [], 'visitors': [], 'content_viewers': []}
+})
+def dashboard_report(orgs):
+    start_date_str, end_date_str = get_last_month()
+    # Visits are not tied to courses, the traffic chart covers the platform.
+    date_list, visitors, content_viewers = get_traffic_report(start_date_str, end_date_str)
+    return {
+        'num_students': get_num_students(orgs),
+        'num_instructors': get_num_instructors(orgs),
+        'num_courses': get_num_courses(orgs),
+        'start_date_str': start_date_str,
+        'end_date_str': end_date_str,
+        'traffic_report': {
+            'date_list': date_list,
+            'visitors': visitors,
+            'content_viewers': content_viewers
+        }
+    }
+
+
+@register_report('demographics', {'age': {}, 'education': {}, 'education_labels': [], 'gender': []})
+def demographics_report(orgs):
+    age, education, gender_dict, education_labels = get_demographics(orgs)
+    return {
+        'age': age,
+        'education': education,
+        'education_labels': education_labels,
+        'gender': [{'name': gender, 'y': count} for gender, count in gender_dict.iteritems()]
+    }
+
+
+@register_report('courses_chart', {
+    'no_of_enrollments': [],
+    'no_of_passed_users': [],
+    'no_of_in_progress_users': [],
+    'courses': []
+})
+def courses_chart_report(orgs):
+    course_list = list(get_courses(orgs))
+    course_stats = get_course_stats([course.id for course in course_list])
+    report = {
+        'no_of_enrollments': [],
+        'no_of_passed_users': [],
+        'no_of_in_progress_users': [],
+        'courses': []
+    }
+    for course in course_list:
+        stats = course_stats[course.id]
+        report['no_of_enrollments'].append(stats['enrollments'])
+        report['no_of_passed_users'].append(stats['passed'])
+        report['no_of_in_progress_users'].append(stats['in_progress'])
+        report['courses'].append(course.display_name)
+    return report
+
+
+@register_report('revenue', {'month_wise_report': {}, 'course_list': [], 'revenue_list': []})
+def revenue_report(orgs):
+    month_wise_report, course_list, revenue_list = get_revenue_report(orgs=orgs)
+    return {
+        'month_wise_report': month_wise_report,
+        'course_list': course_list,
+        'revenue_list': revenue_list
+    }
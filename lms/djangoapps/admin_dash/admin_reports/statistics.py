@@ -0,0 +1,40 @@
+from django.core.cache import cache
+
+from leaderboard.models import LeaderBoard
+from openedx.core.djangoapps.micro_masters.models import Program
+from admin_dash.helpers import get_num_students, get_num_courses, get_num_instructors
+
+CACHE_KEY = u'admin_dash.statistics.{}'
+# Counters are invalidated by signals, the timeout only bounds drift from
+# bulk changes that send none.
+CACHE_TIMEOUT = 24 * 60 * 60
+
+STATISTICS = {
+    'number_of_courses': get_num_courses,
+    'number_of_instructors': get_num_instructors,
+    'number_of_paths': lambda: Program.objects.count(),
+    'students_registered': get_num_students,
+    'certified_users': lambda: LeaderBoard.objects.filter(has_passed=True).count(),
+}
+
+
+def get_statistics(names):
+    """
+    Return {name: count} for the site statistics `names`, computing only
+    the counters missing from the cache.
+    """
+    keys = dict((CACHE_KEY.format(name), name) for name in names)
+    cached = cache.get_many(keys.keys())
+    statistics = dict((keys[key], value) for key, value in cached.iteritems())
+    missing = dict((name, STATISTICS[name]()) for name in names if name not in statistics)
+    if missing:
+        cache.set_many(dict((CACHE_KEY.format(name), value) for name, value in missing.iteritems()), CACHE_TIMEOUT)
+        statistics.update(missing)
+    return statistics
+
+
+def invalidate_statistics(*names):
+    """
+    Drop the cached counters `names` so they are recomputed on next read.
+    """
+    cache.delete_many([CACHE_KEY.format(name) for name in names])
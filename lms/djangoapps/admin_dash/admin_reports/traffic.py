@@ -1,9 +1,7 @@
 import datetime
 from datetime import datetime as datetime_object
 
-from django.db.models import Count
-
-from attendance.models import CampusAttendance, ClassroomAttendance
+from attendance.models import DailyTraffic
 
 
 def get_traffic_report(start_dt_str, end_dt_str):
@@ -11,25 +9,15 @@ def get_traffic_report(start_dt_str, end_dt_str):
     start_date = datetime_object.strptime(start_dt_str, '%d-%m-%Y')
     end_date = datetime_object.strptime(end_dt_str, '%d-%m-%Y')
 
-    campus_attendance = CampusAttendance.objects.filter(
-        date_visited__range=(start_date, end_date)
-    ).values(
-        'date_visited'
-    ).annotate(
-        count=Count('date_visited')
-    ).order_by('date_visited')
-
-    classroom_attendance = ClassroomAttendance.objects.filter(
-        date_visited__range=(start_date, end_date)
+    daily_traffic = list(DailyTraffic.objects.filter(
+        date__range=(start_date, end_date)
     ).values(
-        'date_visited'
-    ).annotate(
-        count=Count('date_visited')
-    ).order_by('date_visited')
+        'date', 'visitors', 'content_viewers'
+    ))
 
     date_list = get_date_in_range(start_date, end_date)
-    visitors = count_by_date(date_list, campus_attendance)
-    content_viewers = count_by_date(date_list, classroom_attendance)
+    visitors = count_by_date(date_list, daily_traffic, 'visitors')
+    content_viewers = count_by_date(date_list, daily_traffic, 'content_viewers')
 
     return date_list, visitors, content_viewers
 
@@ -43,13 +31,13 @@ def get_date_in_range(date1, date2):
     return sorted_date_range
 
 
-def count_by_date(date_list, data_dict):
+def count_by_date(date_list, data_dict, counter):
 
     date_wise_count = []
     attendance = {}
 
     for data in data_dict:
-        attendance[data['date_visited'].strftime("%d-%m-%Y")] = data['count']
+        attendance[data['date'].strftime("%d-%m-%Y")] = data[counter]
 
     for day in date_list:
         date_wise_count.append(attendance.get(day, 0))
@@ -0,0 +1,22 @@
+"""
+Admin Dashboard Application Configuration
+
+Signal handlers are connected here.
+"""
+
+from django.apps import AppConfig
+
+
+class AdminDashConfig(AppConfig):
+    """
+    Application Configuration for Admin Dashboard.
+    """
+    name = u'admin_dash'
+
+    def ready(self):
+        """
+        Connect handlers that keep precomputed reports up to date.
+        """
+        # Can't import models at module level in AppConfigs, and models get
+        # included from the signal handlers
+        from . import signals  # pylint: disable=unused-variable
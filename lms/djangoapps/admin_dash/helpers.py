@@ -1,50 +1,111 @@
 import string
 import re
+import json
+import time
+import base64
 import smtplib
 import logging
+from collections import OrderedDict
+from datetime import datetime
 from boto.exception import BotoServerError
+from dateutil.parser import parse as parse_datetime
+from pytz import UTC
 
 from django.core.mail.message import EmailMessage
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Q, Value, DateTimeField
+from django.db.models.functions import Coalesce
 
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from edxmako.shortcuts import render_to_string
 from course_modes.models import CourseMode
-from student.models import UserProfile
+from student.models import CourseEnrollment, UserProfile
 from student.models import CourseAccessRole
 from opaque_keys.edx.keys import CourseKey
 from shoppingcart.models import Coupon
 from openedx.core.djangoapps.micro_masters.models import ProgramCoupon, Program
+from student_account.views import _local_server_get
 
 log = logging.getLogger("admin_dash")
 
+REGISTRATION_FIELD_URL = '/user_api/v1/account/registration/'
+REGISTRATION_FIELDS_TIMEOUT = 5 * 60
+_registration_fields_cache = {}
+
+STUDENT_SORT_FIELDS = ('username', 'email', 'date_joined', 'last_login')
+STUDENT_DATE_FIELDS = ('date_joined', 'last_login')
+STUDENT_PAGE_SIZE = 50
+STUDENT_MAX_PAGE_SIZE = 200
+COUPON_PAGE_SIZE = 50
+COUPON_MAX_PAGE_SIZE = 200
+# Sort position of users who never logged in.
+NEVER_LOGGED_IN = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def get_report_orgs():
+    """
+    Organizations the admin dashboard of the current site reports on, from
+    its course_org_filter, or None to report on the whole platform.
+    """
+    orgs = configuration_helpers.get_value('course_org_filter')
+    if not orgs:
+        return None
+    if isinstance(orgs, basestring):
+        orgs = [orgs]
+    return sorted(orgs)
+
+
+def get_scope_key(orgs):
+    """
+    Cache and snapshot key part of a report scope, '' for the whole platform.
+
+    The sorted orgs are JSON encoded, so distinct org lists never share a
+    key whatever characters their names contain.
+    """
+    return unicode(json.dumps(sorted(orgs), separators=(',', ':'))) if orgs else u''
+
 
-def get_num_students():
-    return User.objects.filter(is_active=True).count()
+def get_scope_orgs(scope_key):
+    return json.loads(scope_key) if scope_key else None
 
 
-def get_courses():
-    return CourseOverview.objects.all()
+def get_num_students(orgs=None):
+    return get_users(orgs).filter(is_active=True).count()
 
 
-def get_num_courses():
-    courses = get_courses()
-    return len(courses)
+def get_users(orgs=None):
+    """
+    All users, or only the users enrolled in a course of `orgs`.
+    """
+    users = User.objects.all()
+    if orgs:
+        users = users.filter(
+            id__in=CourseEnrollment.objects.filter(course_id__in=get_courses(orgs).values('id')).values('user_id')
+        )
+    return users
 
 
-def get_num_instructors():
-    instructors = []
-    courses = get_courses()
-    for course in courses:
-        team_members = CourseAccessRole.objects.filter(course_id=course.id)
-        for member in team_members:
-            if member.user not in instructors:
-                instructors.append(member.user)
+def get_courses(orgs=None):
+    courses = CourseOverview.objects.all()
+    if orgs:
+        courses = courses.filter(org__in=orgs)
+    return courses
 
-    return len(instructors)
+
+def get_num_courses(orgs=None):
+    return get_courses(orgs).count()
+
+
+def get_num_instructors(orgs=None):
+    """
+    Number of distinct users holding a role in any existing course.
+    """
+    return CourseAccessRole.objects.filter(
+        course_id__in=get_courses(orgs).values('id')
+    ).values('user').distinct().count()
 
 
 def get_course_overview(course_id):
@@ -146,9 +207,36 @@ def get_image_url(status):
     return url
 
 
-def get_coupons():
-    coupons = Coupon.objects.all()
-    return coupons
+def _coupons_page(coupons, query, cursor, page_size):
+    """
+    Returns one page of `coupons`, newest first, and the cursor of the next
+    one, None on the last page.
+
+    Pages are selected by keyset on id and filtered on the indexed code, so
+    every page costs the same single query whatever the number of coupons.
+    """
+    if query:
+        coupons = coupons.filter(code__startswith=query)
+    if cursor:
+        try:
+            coupons = coupons.filter(id__lt=int(cursor))
+        except ValueError:
+            pass
+    coupons = coupons.order_by('-id')
+    page_size = max(1, min(page_size, COUPON_MAX_PAGE_SIZE))
+    rows = list(coupons[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = rows[-1].id
+    return rows, next_cursor
+
+
+def get_coupons(query='', cursor=None, page_size=COUPON_PAGE_SIZE, orgs=None):
+    coupons = Coupon.objects.select_related('course_overview', 'created_by')
+    if orgs:
+        coupons = coupons.filter(course_id__in=get_courses(orgs).values('id'))
+    return _coupons_page(coupons, query, cursor, page_size)
 
 
 def update_price(course_id, course_price):
@@ -193,9 +281,8 @@ def get_num_programs():
     return programs
 
 
-def get_program_coupons():
-    coupons = ProgramCoupon.objects.all()
-    return coupons
+def get_program_coupons(query='', cursor=None, page_size=COUPON_PAGE_SIZE):
+    return _coupons_page(ProgramCoupon.objects.select_related('program'), query, cursor, page_size)
 
 
 def validate_program_coupon_details(details):
@@ -242,3 +329,95 @@ def program_price_update(program_id, program_price):
             'success': False,
             'message': 'Invalid Key'
         }
+
+
+def get_registration_fields(request):
+    """
+    Returns the registration form field descriptions of the current site.
+
+    The form only changes with site configuration, so it is kept in
+    process memory for a few minutes instead of being rebuilt per request.
+    """
+    site = request.get_host()
+    cached = _registration_fields_cache.get(site)
+    if cached is None or time.time() - cached[0] > REGISTRATION_FIELDS_TIMEOUT:
+        fields = json.loads(_local_server_get(REGISTRATION_FIELD_URL, request.session))['fields']
+        cached = _registration_fields_cache[site] = (time.time(), fields)
+    return cached[1]
+
+
+def _encode_students_cursor(sort_value, user_id):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([sort_value, user_id]))
+
+
+def _decode_students_cursor(cursor, sort):
+    try:
+        sort_value, user_id = json.loads(base64.urlsafe_b64decode(str(cursor)))
+        if sort in STUDENT_DATE_FIELDS:
+            sort_value = parse_datetime(sort_value)
+        return sort_value, int(user_id)
+    except (TypeError, ValueError, UnicodeError):
+        return None
+
+
+def get_students_page(sort='username', descending=False, query='', cursor=None, page_size=STUDENT_PAGE_SIZE,
+                      orgs=None):
+    """
+    Returns one page of the student directory and the cursor of the next one.
+
+    Pages are selected by keyset on (sort field, id) rather than by offset,
+    so every page costs the same single query whatever its position. With
+    `orgs` only the users enrolled in their courses are listed.
+    """
+    if sort not in STUDENT_SORT_FIELDS:
+        sort = 'username'
+    page_size = max(1, min(page_size, STUDENT_MAX_PAGE_SIZE))
+
+    users = get_users(orgs)
+    if query:
+        users = users.filter(Q(username__startswith=query) | Q(email__startswith=query))
+
+    sort_key = sort
+    if sort == 'last_login':
+        users = users.annotate(
+            last_login_sort=Coalesce('last_login', Value(NEVER_LOGGED_IN), output_field=DateTimeField())
+        )
+        sort_key = 'last_login_sort'
+
+    position = _decode_students_cursor(cursor, sort) if cursor else None
+    if position is not None:
+        sort_value, user_id = position
+        lookup = 'lt' if descending else 'gt'
+        users = users.filter(
+            Q(**{'{}__{}'.format(sort_key, lookup): sort_value}) |
+            Q(**{sort_key: sort_value, 'id__{}'.format(lookup): user_id})
+        )
+
+    fields = ['id', 'username', 'email', 'date_joined', 'last_login',
+              'is_superuser', 'is_staff', 'is_active', 'profile__name']
+    if sort_key not in fields:
+        fields.append(sort_key)
+    direction = '-' if descending else ''
+    rows = list(users.order_by(direction + sort_key, direction + 'id').values(*fields)[:page_size + 1])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = _encode_students_cursor(rows[-1][sort_key], rows[-1]['id'])
+
+    students = OrderedDict()
+    for row in rows:
+        details = OrderedDict()
+        details['name'] = row['profile__name']
+        details['email'] = row['email']
+        details['date_joined'] = row['date_joined'].strftime("%d/%m/%Y")
+        details['last_login'] = row['last_login'].strftime(
+            "%d/%m/%Y") if row['last_login'] is not None else 'No Data'
+        details['is_superuser'] = row['is_superuser']
+        details['is_staff'] = row['is_staff']
+        details['is_active'] = row['is_active']
+        details['user_id'] = row['id']
+        students[row['username']] = details
+    return students, next_cursor
@@ -0,0 +1,26 @@
+"""
+Management command to rebuild the admin dashboard demographics rollup.
+"""
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand
+
+from admin_dash.models import DemographicsRollup
+
+
+class Command(BaseCommand):
+    """
+    Recount the age, education and gender distribution of active users.
+
+    The rollup is filled by a migration and then kept up to date from
+    profile and user changes; this is only needed to repair it.
+
+    Example:
+
+        ./manage.py lms rebuild_demographics_rollup --settings=aws
+    """
+    help = dedent(__doc__)
+
+    def handle(self, *args, **options):
+        DemographicsRollup.rebuild()
+        self.stdout.write(u'Rebuilt {} demographics rollup rows.'.format(DemographicsRollup.objects.count()))
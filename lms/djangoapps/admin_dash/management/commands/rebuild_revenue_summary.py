@@ -0,0 +1,28 @@
+"""
+Management command to rebuild the monthly revenue summary from order items.
+"""
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand
+
+from admin_dash.admin_reports.revenue import compute_monthly_revenue
+from admin_dash.models import MonthlyRevenue
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the per-course monthly revenue summary used by the revenue report.
+
+    The summary is filled by a migration and then updated when course items
+    are purchased or refunded; this is only needed to repair it.
+
+    Example:
+
+        ./manage.py lms rebuild_revenue_summary --settings=aws
+    """
+    help = dedent(__doc__)
+
+    def handle(self, *args, **options):
+        totals = compute_monthly_revenue()
+        MonthlyRevenue.rebuild(totals)
+        self.stdout.write(u'Rebuilt {} monthly revenue rows.'.format(len(totals)))
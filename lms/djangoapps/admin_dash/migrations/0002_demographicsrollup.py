@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dash', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DemographicsRollup',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, verbose_name='created', editable=False)),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, verbose_name='modified', editable=False)),
+                ('dimension', models.CharField(max_length=32)),
+                ('value', models.CharField(max_length=32, blank=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Demographics Rollup',
+                'verbose_name_plural': 'Demographics Rollup',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='demographicsrollup',
+            unique_together=set([('dimension', 'value')]),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+import openedx.core.djangoapps.xmodule_django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dash', '0002_demographicsrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRevenue',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, verbose_name='created', editable=False)),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, verbose_name='modified', editable=False)),
+                ('month', models.DateField(help_text='First day of the month.')),
+                ('course_id', openedx.core.djangoapps.xmodule_django.models.CourseKeyField(max_length=255)),
+                ('amount', models.DecimalField(default=0, max_digits=30, decimal_places=2)),
+            ],
+            options={
+                'verbose_name': 'Monthly Revenue',
+                'verbose_name_plural': 'Monthly Revenue',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='monthlyrevenue',
+            unique_together=set([('month', 'course_id'),]),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dash', '0003_monthlyrevenue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportSnapshot',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('report', models.CharField(max_length=64)),
+                ('version', models.PositiveIntegerField()),
+                ('payload', models.TextField()),
+                ('generated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Report Snapshot',
+                'verbose_name_plural': 'Report Snapshots',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='reportsnapshot',
+            unique_together=set([('report', 'version')]),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dash', '0004_reportsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportsnapshot',
+            name='scope',
+            field=models.CharField(default='', max_length=255, blank=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='reportsnapshot',
+            unique_together=set([('report', 'scope', 'version')]),
+        ),
+    ]
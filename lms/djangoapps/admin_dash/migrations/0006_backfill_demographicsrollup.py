@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_demographics(apps, schema_editor):
+    """
+    Count the existing active profiles, the rollup is only updated
+    incrementally afterwards.
+    """
+    DemographicsRollup = apps.get_model('admin_dash', 'DemographicsRollup')
+    UserProfile = apps.get_model('student', 'UserProfile')
+    counts = defaultdict(int)
+    rows = UserProfile.objects.filter(user__is_active=True).values(
+        'year_of_birth', 'level_of_education', 'gender'
+    ).annotate(count=Count('id')).order_by()
+    for row in rows:
+        year_of_birth = row['year_of_birth']
+        counts[('year_of_birth', unicode(year_of_birth) if year_of_birth is not None else '')] += row['count']
+        counts[('level_of_education', row['level_of_education'] or '')] += row['count']
+        counts[('gender', row['gender'] or '')] += row['count']
+
+    DemographicsRollup.objects.all().delete()
+    DemographicsRollup.objects.bulk_create([
+        DemographicsRollup(dimension=dimension, value=value, count=count)
+        for (dimension, value), count in counts.iteritems()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dash', '0005_reportsnapshot_scope'),
+        ('student', '0009_auto_20170714_0517'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_demographics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from collections import defaultdict
+
+from django.db import migrations
+
+
+def backfill_revenue(apps, schema_editor):
+    """
+    Sum the revenue of the course items purchased so far, the summary is
+    only updated incrementally afterwards.
+    """
+    MonthlyRevenue = apps.get_model('admin_dash', 'MonthlyRevenue')
+    totals = defaultdict(int)
+    for model_name in ('PaidCourseRegistration', 'CourseRegCodeItem'):
+        model = apps.get_model('shoppingcart', model_name)
+        items = model.objects.filter(
+            status='purchased', fulfilled_time__isnull=False
+        ).values_list('fulfilled_time', 'course_id', 'qty', 'unit_cost')
+        for fulfilled_time, course_id, qty, unit_cost in items.iterator():
+            amount = qty * unit_cost if model_name == 'CourseRegCodeItem' else unit_cost
+            totals[(fulfilled_time.date().replace(day=1), course_id)] += amount
+
+    MonthlyRevenue.objects.all().delete()
+    MonthlyRevenue.objects.bulk_create([
+        MonthlyRevenue(month=month, course_id=course_id, amount=amount)
+        for (month, course_id), amount in totals.iteritems()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dash', '0006_backfill_demographicsrollup'),
+        ('shoppingcart', '0003_auto_20151217_0958'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_revenue, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dash', '0007_backfill_monthlyrevenue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursestats',
+            name='stale',
+            field=models.BooleanField(default=False),
+        ),
+    ]
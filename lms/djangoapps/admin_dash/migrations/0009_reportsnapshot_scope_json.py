@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import json
+
+from django.db import migrations
+
+
+def encode_scopes(apps, schema_editor):
+    """
+    Rewrite the '+' joined org scopes of the stored snapshots as JSON lists.
+    """
+    ReportSnapshot = apps.get_model('admin_dash', 'ReportSnapshot')
+    scopes = ReportSnapshot.objects.exclude(scope='').values_list('scope', flat=True).distinct()
+    for scope in list(scopes):
+        if scope.startswith('['):
+            continue
+        ReportSnapshot.objects.filter(scope=scope).update(
+            scope=json.dumps(sorted(scope.split('+')), separators=(',', ':'))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dash', '0008_coursestats_stale'),
+    ]
+
+    operations = [
+        migrations.RunPython(encode_scopes, migrations.RunPython.noop),
+    ]
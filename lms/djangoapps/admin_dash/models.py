@@ -0,0 +1,270 @@
+"""
+Django models for precomputed admin dashboard reports.
+"""
+from collections import defaultdict
+
+from django.db import models, transaction, IntegrityError
+from django.db.models import Count, F
+from model_utils.models import TimeStampedModel
+
+from student.models import UserProfile
+from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
+
+
+class CourseStats(TimeStampedModel):
+    """
+    Enrollment and progress counters of a course, flagged stale when its
+    enrollments or leaderboard rows change and refreshed on next read.
+    """
+    course_id = CourseKeyField(max_length=255, unique=True)
+    enrollments = models.IntegerField(default=0)
+    passed = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    stale = models.BooleanField(default=False)
+
+    class Meta:
+        app_label = 'admin_dash'
+        verbose_name = 'Course Stats'
+        verbose_name_plural = 'Course Stats'
+
+    def __unicode__(self):
+        return unicode(self.course_id)
+
+    def __repr__(self):
+        return self.__unicode__()
+
+    @classmethod
+    def store(cls, stats):
+        """
+        Save `stats`, a dict of {course_key: counters dict}, as CourseStats rows.
+        """
+        existing = set(cls.objects.filter(course_id__in=stats.keys()).values_list('course_id', flat=True))
+        for course_id in existing:
+            cls.objects.filter(course_id=course_id).update(**stats[course_id])
+        cls.objects.bulk_create([
+            cls(course_id=course_id, **counters)
+            for course_id, counters in stats.iteritems()
+            if course_id not in existing
+        ])
+
+
+class DemographicsRollup(TimeStampedModel):
+    """
+    Number of active users per value of a demographic profile field.
+
+    Ages are derived from year_of_birth when the report is read, so stored
+    counts never go stale as years pass.
+    """
+    DIMENSIONS = ('year_of_birth', 'level_of_education', 'gender')
+    UNKNOWN = u''
+
+    dimension = models.CharField(max_length=32)
+    value = models.CharField(max_length=32, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        app_label = 'admin_dash'
+        verbose_name = 'Demographics Rollup'
+        verbose_name_plural = 'Demographics Rollup'
+        unique_together = (('dimension', 'value'),)
+
+    def __unicode__(self):
+        return u'{}={}: {}'.format(self.dimension, self.value, self.count)
+
+    def __repr__(self):
+        return self.__unicode__()
+
+    @classmethod
+    def values_of(cls, year_of_birth, level_of_education, gender):
+        """
+        Return the rollup value of each dimension for one profile.
+        """
+        return {
+            'year_of_birth': unicode(year_of_birth) if year_of_birth is not None else cls.UNKNOWN,
+            'level_of_education': level_of_education or cls.UNKNOWN,
+            'gender': gender or cls.UNKNOWN,
+        }
+
+    @classmethod
+    def apply_change(cls, before, after):
+        """
+        Move one user from the `before` to the `after` values, either may be
+        None when the user is not counted (inactive or without a profile).
+        """
+        for dimension in cls.DIMENSIONS:
+            old_value = before[dimension] if before else None
+            new_value = after[dimension] if after else None
+            if old_value == new_value:
+                continue
+            if old_value is not None:
+                cls._add(dimension, old_value, -1)
+            if new_value is not None:
+                cls._add(dimension, new_value, 1)
+
+    @classmethod
+    def _add(cls, dimension, value, delta):
+        rows = cls.objects.filter(dimension=dimension, value=value)
+        if delta < 0:
+            # Users missing from the rollup are never removed below zero.
+            rows.filter(count__gte=-delta).update(count=F('count') + delta)
+            return
+        if rows.update(count=F('count') + delta):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(dimension=dimension, value=value, count=delta)
+        except IntegrityError:
+            rows.update(count=F('count') + delta)
+
+    @classmethod
+    def count(cls, profiles):
+        """
+        Return {(dimension, value): count} over `profiles` with a single grouped query.
+        """
+        counts = defaultdict(int)
+        rows = profiles.values(
+            'year_of_birth', 'level_of_education', 'gender'
+        ).annotate(
+            count=Count('id')
+        )
+        for row in rows:
+            values = cls.values_of(row['year_of_birth'], row['level_of_education'], row['gender'])
+            for dimension, value in values.iteritems():
+                counts[(dimension, value)] += row['count']
+        return counts
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recount every dimension over active profiles.
+        """
+        counts = cls.count(UserProfile.objects.filter(user__is_active=True))
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create([
+                cls(dimension=dimension, value=value, count=count)
+                for (dimension, value), count in counts.iteritems()
+            ])
+
+    @classmethod
+    def distributions(cls, counts=None):
+        """
+        Return {dimension: {value: count}} for all dimensions, from the stored
+        rollup or from `counts` as returned by `count`.
+        """
+        if counts is None:
+            counts = dict(
+                ((dimension, value), count)
+                for dimension, value, count in cls.objects.values_list('dimension', 'value', 'count')
+            )
+        distributions = dict((dimension, {}) for dimension in cls.DIMENSIONS)
+        for (dimension, value), count in counts.iteritems():
+            distributions[dimension][value] = count
+        return distributions
+
+
+class MonthlyRevenue(TimeStampedModel):
+    """
+    Revenue of purchased course seats and registration codes per course and
+    calendar month (UTC), updated when order items are fulfilled or refunded.
+    """
+    month = models.DateField(help_text='First day of the month.')
+    course_id = CourseKeyField(max_length=255)
+    amount = models.DecimalField(default=0, decimal_places=2, max_digits=30)
+
+    class Meta:
+        app_label = 'admin_dash'
+        verbose_name = 'Monthly Revenue'
+        verbose_name_plural = 'Monthly Revenue'
+        unique_together = (('month', 'course_id'),)
+
+    def __unicode__(self):
+        return u'{} {}: {}'.format(self.month.strftime('%Y-%m'), self.course_id, self.amount)
+
+    def __repr__(self):
+        return self.__unicode__()
+
+    @classmethod
+    def add(cls, month, course_id, amount):
+        """
+        Add `amount` (negative for refunds) to the revenue of a course in a month.
+        """
+        month = month.replace(day=1)
+        rows = cls.objects.filter(month=month, course_id=course_id)
+        if rows.update(amount=F('amount') + amount):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(month=month, course_id=course_id, amount=amount)
+        except IntegrityError:
+            rows.update(amount=F('amount') + amount)
+
+    @classmethod
+    def rebuild(cls, totals):
+        """
+        Replace all rows with `totals`, a dict of {(month, course_id): amount}.
+        """
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create([
+                cls(month=month, course_id=course_id, amount=amount)
+                for (month, course_id), amount in totals.iteritems()
+            ])
+
+
+class ReportSnapshot(models.Model):
+    """
+    A precomputed payload of an admin dashboard report, stored as JSON with
+    a version incremented on every refresh.
+    """
+    report = models.CharField(max_length=64)
+    # Organizations the report covers, '' for the whole platform.
+    scope = models.CharField(max_length=255, blank=True, default='')
+    version = models.PositiveIntegerField()
+    payload = models.TextField()
+    generated_at = models.DateTimeField()
+
+    # Number of snapshots kept per report.
+    HISTORY = 10
+
+    class Meta:
+        app_label = 'admin_dash'
+        verbose_name = 'Report Snapshot'
+        verbose_name_plural = 'Report Snapshots'
+        unique_together = (('report', 'scope', 'version'),)
+
+    def __unicode__(self):
+        return u'{} [{}] v{}'.format(self.report, self.scope, self.version)
+
+    def __repr__(self):
+        return self.__unicode__()
+
+    @classmethod
+    def latest(cls, report, scope=''):
+        return cls.objects.filter(report=report, scope=scope).order_by('-version').first()
+
+    @classmethod
+    def store(cls, report, scope, payload, generated_at):
+        """
+        Save `payload` as the next version of `report` in `scope`, dropping
+        the oldest snapshots beyond HISTORY.
+
+        Refreshes racing for the same version, which locking cannot prevent
+        for the first one, return the snapshot stored by the winner.
+        """
+        snapshots = cls.objects.filter(report=report, scope=scope)
+        try:
+            with transaction.atomic():
+                last = snapshots.select_for_update().order_by('-version').first()
+                snapshot = cls.objects.create(
+                    report=report,
+                    scope=scope,
+                    version=last.version + 1 if last else 1,
+                    payload=payload,
+                    generated_at=generated_at
+                )
+        except IntegrityError:
+            return cls.latest(report, scope)
+        snapshots.filter(version__lte=snapshot.version - cls.HISTORY).delete()
+        return snapshot
@@ -0,0 +1,156 @@
+"""
+Signal handlers keeping precomputed admin dashboard reports up to date.
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from student.models import ENROLL_STATUS_CHANGE, UserProfile, CourseAccessRole
+from shoppingcart.models import PaidCourseRegistration, CourseRegCodeItem
+from leaderboard.signals.signals import LEADERBOARD_UPDATED
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from openedx.core.djangoapps.micro_masters.models import Program
+
+from .admin_reports.courses import mark_course_stats_stale
+from .admin_reports.revenue import item_revenue
+from .admin_reports.statistics import invalidate_statistics
+from .models import DemographicsRollup, MonthlyRevenue
+
+
+@receiver(ENROLL_STATUS_CHANGE)
+def _listen_for_enrollment_change(sender, course_id, **kwargs):  # pylint: disable=unused-argument
+    mark_course_stats_stale([course_id])
+
+
+@receiver(LEADERBOARD_UPDATED)
+def _listen_for_leaderboard_update(sender, course_ids, passed_changed=True,  # pylint: disable=unused-argument
+                                   **kwargs):
+    mark_course_stats_stale(course_ids)
+    # Only a learner passing or failing a course changes the certified users.
+    if passed_changed:
+        invalidate_statistics('certified_users')
+
+
+@receiver(post_save, sender=CourseOverview)
+@receiver(post_delete, sender=CourseOverview)
+def _invalidate_course_statistics(sender, **kwargs):  # pylint: disable=unused-argument
+    invalidate_statistics('number_of_courses', 'number_of_instructors')
+
+
+@receiver(post_save, sender=CourseAccessRole)
+@receiver(post_delete, sender=CourseAccessRole)
+def _invalidate_instructor_statistics(sender, **kwargs):  # pylint: disable=unused-argument
+    invalidate_statistics('number_of_instructors')
+
+
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+def _invalidate_program_statistics(sender, **kwargs):  # pylint: disable=unused-argument
+    invalidate_statistics('number_of_paths')
+
+
+def _profile_demographics(profile, is_active):
+    """
+    Return the rollup values of `profile`, or None if it is not counted.
+    """
+    if profile is None or not is_active:
+        return None
+    return DemographicsRollup.values_of(profile.year_of_birth, profile.level_of_education, profile.gender)
+
+
+@receiver(pre_save, sender=UserProfile)
+def _remember_profile_demographics(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    instance._demographics_before = None  # pylint: disable=protected-access
+    if instance.pk:
+        old = UserProfile.objects.filter(pk=instance.pk).values(
+            'year_of_birth', 'level_of_education', 'gender', 'user__is_active'
+        ).first()
+        if old and old['user__is_active']:
+            instance._demographics_before = DemographicsRollup.values_of(  # pylint: disable=protected-access
+                old['year_of_birth'], old['level_of_education'], old['gender']
+            )
+
+
+@receiver(post_save, sender=UserProfile)
+def _update_profile_demographics(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    DemographicsRollup.apply_change(
+        getattr(instance, '_demographics_before', None),
+        _profile_demographics(instance, instance.user.is_active)
+    )
+
+
+@receiver(post_delete, sender=UserProfile)
+def _remove_profile_demographics(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    try:
+        is_active = instance.user.is_active
+    except User.DoesNotExist:
+        is_active = True
+    DemographicsRollup.apply_change(_profile_demographics(instance, is_active), None)
+
+
+@receiver(pre_save, sender=User)
+def _remember_user_activation(sender, instance, update_fields=None, **kwargs):  # pylint: disable=unused-argument
+    instance._was_active = None  # pylint: disable=protected-access
+    if instance.pk and (update_fields is None or 'is_active' in update_fields):
+        instance._was_active = User.objects.filter(  # pylint: disable=protected-access
+            pk=instance.pk
+        ).values_list('is_active', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def _update_user_activation_demographics(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    was_active = getattr(instance, '_was_active', None)
+    if was_active is None or was_active == instance.is_active:
+        return
+    try:
+        profile = UserProfile.objects.get(user=instance)
+    except UserProfile.DoesNotExist:
+        return
+    DemographicsRollup.apply_change(
+        _profile_demographics(profile, was_active),
+        _profile_demographics(profile, instance.is_active)
+    )
+
+
+def _purchased_revenue(item):
+    """
+    Return (month, course_id, amount) counted for `item`, or None if it is not purchased.
+    """
+    if item is None or item.status != 'purchased' or item.fulfilled_time is None:
+        return None
+    return item.fulfilled_time.date(), item.course_id, item_revenue(item)
+
+
+@receiver(pre_save, sender=PaidCourseRegistration)
+@receiver(pre_save, sender=CourseRegCodeItem)
+def _remember_item_revenue(sender, instance, **kwargs):
+    instance._revenue_before = None  # pylint: disable=protected-access
+    if instance.pk:
+        instance._revenue_before = _purchased_revenue(  # pylint: disable=protected-access
+            sender.objects.filter(pk=instance.pk).first()
+        )
+
+
+@receiver(post_save, sender=PaidCourseRegistration)
+@receiver(post_save, sender=CourseRegCodeItem)
+def _update_monthly_revenue(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    before = getattr(instance, '_revenue_before', None)
+    after = _purchased_revenue(instance)
+    if before == after:
+        return
+    if before is not None:
+        MonthlyRevenue.add(before[0], before[1], -before[2])
+    if after is not None:
+        MonthlyRevenue.add(*after)
+
+
+@receiver(post_save, sender=User)
+def _invalidate_student_statistics(sender, instance, created=False, **kwargs):  # pylint: disable=unused-argument
+    was_active = getattr(instance, '_was_active', None)
+    if created or (was_active is not None and was_active != instance.is_active):
+        invalidate_statistics('students_registered')
+
+
+@receiver(post_delete, sender=User)
+def _invalidate_deleted_student_statistics(sender, **kwargs):  # pylint: disable=unused-argument
+    invalidate_statistics('students_registered')
@@ -0,0 +1,31 @@
+"""
+Asynchronous tasks for the admin dashboard.
+"""
+from logging import getLogger
+
+from celery.task import task  # pylint: disable=import-error,no-name-in-module
+
+from admin_dash.admin_reports import snapshots
+
+log = getLogger(__name__)
+
+
+@task(ignore_result=True)
+def refresh_report_snapshots(names=None, scopes=None):
+    """
+    Store a new snapshot of the reports `names` for the scope keys `scopes`,
+    all registered reports of every scope with snapshots by default.
+    """
+    for scope in scopes or snapshots.stored_scopes():
+        for name in names or snapshots.PROVIDERS.keys():
+            try:
+                snapshot = snapshots.refresh_snapshot(name, scope)
+            except Exception:  # pylint: disable=broad-except
+                # One failing report must not keep the others stale.
+                log.exception(u'Admin dashboard: failed refreshing the %s report of scope "%s".', name, scope)
+            else:
+                log.info(
+                    u'Admin dashboard: stored %s report snapshot v%d of scope "%s".', name, snapshot.version, scope
+                )
+            finally:
+                snapshots.release_refresh(name, scope)
@@ -8,9 +8,11 @@ urlpatterns = patterns(
     url(r'^demographics/', 'demographics', name='demographics'),
     url(r'^courses-chart/', 'courses_chart', name='courses-chart'),
     url(r'^revenue-report/', 'revenue_report', name='revenue-report'),
+    url(r'^refresh-report/(?P<report>\w+)/$', 'refresh_report_snapshot', name='refresh-report-snapshot'),
     url(r'^site-content/$', 'site_content', name='site-content'),
     url(r'^add_static_content/$', 'add_static_content', name='add_static_content'),
     url(r'^student-details/$', 'student_details', name='student-details'),
+    url(r'^student-details/data/$', 'student_details_data', name='student-details-data'),
     url(r'^update-user/$', 'update_user', name='update-user'),
     url(r'^update-user/(?P<user>[\w.@+-]+)/$', 'update_user', name='update-user'),
     url(r'^create-user/$', 'create_user', name='create-user'),
@@ -19,11 +21,13 @@ urlpatterns = patterns(
     url(r'^update-course-price/', 'update_course_price', name='update-course-price'),
     url(r'^delete-course/', 'delete_course', name='delete-course'),
     url(r'^view-offers/', 'view_coupons', name='view-offers'),
+    url(r'^coupon-details/data/$', 'coupon_details_data', name='coupon-details-data'),
     url(r'^new-coupon/', 'new_coupon', name='new-coupon'),
     url(r'^update-coupon/$', 'update_coupon', name='update-coupon'),
     url(r'^update-coupon/(?P<coupon_id>[\w.@+-]+)/$', 'update_coupon', name='update-coupon'),
     url(r'^delete-coupon/', 'delete_coupon', name='delete-coupon'),
     url(r'^program-offers/', 'program_coupons', name='program-offers'),
+    url(r'^program-coupon-details/data/$', 'program_coupon_details_data', name='program-coupon-details-data'),
     url(r'^new-program-coupon/', 'new_program_coupon', name='new-program-coupon'),
     url(r'^update-program-coupon/$', 'update_program_coupon', name='update-program-coupon'),
     url(r'^update-program-coupon/(?P<coupon_id>[\w.@+-]+)/$', 'update_program_coupon', name='update-program-coupon'),
@@ -33,6 +37,7 @@ urlpatterns = patterns(
     url(r'^program/new/$', 'create_program', name='create-program'),
     url(r'^program/edit/(?P<pk>\d+)/$', 'update_program', name='update-program'),
     url(r'^program/delete/(?P<pk>\d+)/$', 'program_delete', name='program-delete'),
+    url(r'^program/enroll/(?P<pk>\d+)/$', 'program_enroll_users', name='program-enroll-users'),
 
     url(r'^subject/$', 'show_subject', name='show-subjects'),
     url(r'^subject/new/$', 'add_subject', name='add-subject'),
@@ -1,10 +1,11 @@
+import re
 import json
 import requests
 from collections import OrderedDict
-from datetime import datetime
+from datetime import date, datetime
 
 from django.db import transaction
-from django.db.models import Sum
+from django.db.models import Sum, Q
 from django.http import JsonResponse
 from django.http import Http404
 from django.core.exceptions import (
@@ -38,28 +39,19 @@ from openedx.core.djangoapps.site_configuration import helpers as configuration_
 from lms.djangoapps.grades.new.course_grade import CourseGradeFactory
 from student.models import CourseEnrollment
 from student.views import create_account_with_params
-from student_account.views import _local_server_get
 
 from static_pages.models import StaticPage
 from courseware.courses import (
     get_courses,
     sort_by_start_date,
-    sort_by_announcement,
-    get_course
+    sort_by_announcement
 )
-from shoppingcart.models import (
-    PaidCourseRegistration,
-    CourseRegCodeItem,
-    Coupon
-)
-from leaderboard.models import LeaderBoard
+from shoppingcart.models import Coupon
 from admin_dash.admin_reports.traffic import get_traffic_report
-from admin_dash.admin_reports.demographics import get_demographics
+from admin_dash.admin_reports.revenue import get_revenue_report
+from admin_dash.admin_reports import snapshots
 from cms.djangoapps.contentstore.utils import delete_course_and_groups
 from .helpers import (
-    get_num_students,
-    get_num_courses,
-    get_num_instructors,
     get_course_overview,
     get_course_price,
     user_other_settings,
@@ -72,7 +64,12 @@ from .helpers import (
     get_program_coupons,
     validate_program_coupon_details,
     get_programe_price,
-    program_price_update
+    program_price_update,
+    get_registration_fields,
+    get_students_page,
+    get_report_orgs,
+    STUDENT_PAGE_SIZE,
+    COUPON_PAGE_SIZE
 )
 from .utils import get_last_month
 from .decorators import site_administrator_only, site_manager
@@ -97,6 +94,19 @@ STATIC_PAGES = {'About': 'about',
                 'Blog': 'blog'}
 
 
+def _report_context(report):
+    """
+    Context of an insight report page: the report payload, when it was
+    generated (None when computed live or being built), whether it is being
+    built and the url refreshing it.
+    """
+    context, generated_at, building = snapshots.get_report(report, get_report_orgs())
+    context['generated_at'] = generated_at
+    context['building'] = building
+    context['refresh_url'] = reverse('refresh-report-snapshot', args=[report]) if generated_at else None
+    return context
+
+
 @login_required
 @site_manager
 # @site_administrator_only
@@ -104,30 +114,7 @@ def show_dashboard(request):
     """
     This view shows admin dashboard.
     """
-
-    # Get all students, courses and instructor count
-    num_students = get_num_students()
-    num_instructors = get_num_instructors()
-    num_courses = get_num_courses()
-
-    # Get traffic report data
-    default_start_date_str, default_end_date_str = get_last_month()
-    date_list, visitors, content_viewers = get_traffic_report(
-        default_start_date_str, default_end_date_str)
-    context = {}
-    context = {
-        'num_students': num_students,
-        'num_instructors': num_instructors,
-        'num_courses': num_courses,
-        'start_date_str': default_start_date_str,
-        'end_date_str': default_end_date_str,
-        'traffic_report': {
-            'date_list': date_list,
-            'visitors': visitors,
-            'content_viewers': content_viewers
-        }
-
-    }
+    context = _report_context('dashboard')
     return render_to_response("admin_dash/insights/traffic.html", context)
 
 
@@ -161,19 +148,7 @@ def demographics(request):
     """
     This view update demographic report at admin dashboard.
     """
-    gender_list = []
-    age, education, gender_dict, education_labels = get_demographics()
-    for gender in gender_dict:
-        temp_dict = {}
-        temp_dict['name'] = gender
-        temp_dict['y'] = gender_dict[gender]
-        gender_list.append(temp_dict)
-    context = {
-        'age': age,
-        'education': education,
-        'education_labels': education_labels,
-        'gender': gender_list
-    }
+    context = _report_context('demographics')
     return render_to_response("admin_dash/insights/demographics.html", context)
 
 
@@ -184,33 +159,7 @@ def courses_chart(request):
     """
     This view update coures enrollment report at admin dashboard.
     """
-    users = User.objects.all()
-    no_of_passed_users = []
-    no_of_enrollments = []
-    courses = []
-    course_list = get_courses(request.user)
-    for course in course_list:
-        passed_users = 0
-        passing_grade = course.lowest_passing_grade
-        course = get_course(course.id, depth=None)
-        enrollments = CourseEnrollment.objects.filter(course_id=course.id)
-        no_of_enrollments.append(len(enrollments))
-        for user in users:
-            try:
-                leaderboard = LeaderBoard.objects.get(
-                    student=user, course_id=course.id)
-                user_grade = (leaderboard.points) / 100
-            except:
-                user_grade = 0.0
-            if user_grade >= float(passing_grade):
-                passed_users += 1
-        no_of_passed_users.append(passed_users)
-        courses.append(str(course.display_name))
-    context = {
-        'no_of_enrollments': no_of_enrollments,
-        'no_of_passed_users': no_of_passed_users,
-        'courses': courses
-    }
+    context = _report_context('courses_chart')
     return render_to_response('admin_dash/insights/courses_chart.html', context)
 
 
@@ -220,105 +169,145 @@ def courses_chart(request):
 def revenue_report(request):
     """
     This view update revenue report at admin dashboard.
+
+    Accepts an optional `year`, or a `start_date` and `end_date` formatted
+    as dd-mm-yyyy, to restrict the report; by default all revenue is shown.
     """
-    month_wise_report = OrderedDict([
-        ('1', 0),
-        ('2', 0),
-        ('3', 0),
-        ('4', 0),
-        ('5', 0),
-        ('6', 0),
-        ('7', 0),
-        ('8', 0),
-        ('9', 0),
-        ('10', 0),
-        ('11', 0),
-        ('12', 0)
-    ])
-    revenue_dict = OrderedDict()
-    course_list = []
-    single_paid_courses = PaidCourseRegistration.objects.filter(
-        status='purchased')
-    multiple_paid_courses = CourseRegCodeItem.objects.filter(
-        status='purchased')
-    for course in single_paid_courses:
-        course_price = float(course.unit_cost)
-        month_wise_report[str(course.fulfilled_time.month)] += course_price
-        if course.course_id in revenue_dict:
-            revenue_dict[course.course_id] += course_price
+    start_date = end_date = None
+    year = request.GET.get('year', '')
+    try:
+        if year:
+            start_date = date(int(year), 1, 1)
+            end_date = date(int(year), 12, 31)
         else:
-            revenue_dict[course.course_id] = course_price
+            if request.GET.get('start_date'):
+                start_date = datetime.strptime(request.GET['start_date'], '%d-%m-%Y').date()
+            if request.GET.get('end_date'):
+                end_date = datetime.strptime(request.GET['end_date'], '%d-%m-%Y').date()
+    except ValueError:
+        return JsonResponse(status=400, data={
+            'success': False,
+            'message': 'Invalid report dates.'
+        })
 
-    for course in multiple_paid_courses:
-        course_price = float(course.qty * course.unit_cost)
-        month_wise_report[str(course.fulfilled_time.month)] += course_price
-        if course.course_id in revenue_dict:
-            revenue_dict[course.course_id] += course_price
-        else:
-            revenue_dict[course.course_id] = course_price
+    if start_date is None and end_date is None:
+        context = _report_context('revenue')
+    else:
+        # Restricted reports read the monthly summary directly.
+        month_wise_report, course_list, revenue_list = get_revenue_report(start_date, end_date, get_report_orgs())
+        context = {
+            'month_wise_report': month_wise_report,
+            'course_list': course_list,
+            'revenue_list': revenue_list,
+            'generated_at': None,
+            'building': False,
+            'refresh_url': None
+        }
+    context.update({
+        'year': year,
+        'start_date_str': start_date.strftime('%d-%m-%Y') if start_date else '',
+        'end_date_str': end_date.strftime('%d-%m-%Y') if end_date else ''
+    })
+    return render_to_response("admin_dash/insights/revenue_report.html", context)
 
-    revenue_list = revenue_dict.values()
-    for course in revenue_dict.keys():
-        course_overview = get_course_overview(course)
-        course_name = str(
-            course_overview.display_name) if course_overview is not None else str(course)
-        course_list.append(course_name)
 
-    context = {
-        'month_wise_report': month_wise_report,
-        'course_list': course_list,
-        'revenue_list': revenue_list
+@require_POST
+@login_required
+@site_manager
+def refresh_report_snapshot(request, report):
+    """
+    Queues the recomputation of the snapshot of an insight report.
+    """
+    if report not in snapshots.PROVIDERS:
+        return JsonResponse(status=400, data={
+            'success': False,
+            'message': 'Unknown report.'
+        })
+    return JsonResponse({
+        'success': True,
+        'queued': snapshots.request_refresh(report, get_report_orgs())
+    })
+
+
+def _next_page_url(request, next_cursor):
+    """
+    URL of the page following the current one of a keyset paginated
+    listing, None on its last page.
+    """
+    if next_cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = next_cursor
+    return u'{}?{}'.format(request.path, params.urlencode())
+
+
+def _students_page_args(request):
+    try:
+        page_size = int(request.GET.get('page_size', STUDENT_PAGE_SIZE))
+    except ValueError:
+        page_size = STUDENT_PAGE_SIZE
+    return {
+        'sort': request.GET.get('sort', 'username'),
+        'descending': request.GET.get('order', 'asc') == 'desc',
+        'query': request.GET.get('q', '').strip(),
+        'cursor': request.GET.get('cursor'),
+        'page_size': page_size
     }
-    return render_to_response("admin_dash/insights/revenue_report.html", context)
 
 
 @login_required
 @site_administrator_only
 def student_details(request, **kwargs):
     """
-    Fetches all the user registered on Site.
+    Displays one page of the users registered on the Site.
+
+    Accepts the same parameters as student_details_data; next_page_url
+    links to the following page.
     """
     DETAILS_TO_DISPLAY = ['Username', 'Name', 'Email', 'Date Joined', 'Last Login', 'Admin',
                           'Instructor', 'Active', 'Delete?']
     NO_SORT_COLUMNS = ['Admin', 'Instructor', 'Active', 'Delete?']
-    REGISTRATION_FIELD_URL = '/user_api/v1/account/registration/'
     COMMON_FIELD_TYPE = ['email', 'text', 'password', 'checkbox']
     REQUIRED_FIELD_LABEL = [unicode('Email'), unicode('Full name'), unicode('Public username'),
                             unicode('Password'), unicode('State')]
     context = {}
-    users_id = {}
-    students = OrderedDict()
-    users = User.objects.all()
-    for user in users:
-        details = OrderedDict()
-        details['name'] = user.profile.name
-        details['email'] = user.email
-        details['date_joined'] = user.date_joined.strftime("%d/%m/%Y")
-        details['last_login'] = user.last_login.strftime(
-            "%d/%m/%Y") if user.last_login is not None else 'No Data'
-        details['is_superuser'] = user.is_superuser
-        details['is_staff'] = user.is_staff
-        details['is_active'] = user.is_active
-        students[user.username] = details
-        users_id[user.username] = user.id
+    students, next_cursor = get_students_page(orgs=get_report_orgs(), **_students_page_args(request))
     context['students'] = students
-    context['users_id'] = users_id
+    context['users_id'] = dict((username, details['user_id']) for username, details in students.items())
+    context['students_url'] = reverse('student-details-data')
+    context['next_cursor'] = next_cursor
+    context['next_page_url'] = _next_page_url(request, next_cursor)
     context['details_to_display'] = DETAILS_TO_DISPLAY
     context['common_field_type'] = COMMON_FIELD_TYPE
     context['required_fields'] = REQUIRED_FIELD_LABEL
     context['no_sort_columns'] = NO_SORT_COLUMNS
-    context['resitration_fields'] = json.loads(_local_server_get(
-        REGISTRATION_FIELD_URL, request.session))['fields']
+    context['resitration_fields'] = get_registration_fields(request)
     return render_to_response('admin_dash/management/student.html', context)
 
 
+@login_required
+@site_administrator_only
+def student_details_data(request):
+    """
+    Returns one page of registered users as JSON.
+
+    Accepts `sort` (username, email, date_joined or last_login), `order`
+    (asc or desc), `q` (username or email prefix), `page_size` and the
+    `cursor` returned with the previous page.
+    """
+    students, next_cursor = get_students_page(orgs=get_report_orgs(), **_students_page_args(request))
+    return JsonResponse({
+        'students': [dict(details, username=username) for username, details in students.items()],
+        'next_cursor': next_cursor
+    })
+
+
 @login_required
 @site_administrator_only
 def update_user(request, user=None):
     """
     Updates user details.
     """
-    REGISTRATION_FIELD_URL = '/user_api/v1/account/registration/'
     SELECT_FIELDS = ['gender', 'year_of_birth', 'level_of_education']
     MANUAL_UPDTE_FIELDS = ['checkbox']
     if request.method == "GET":
@@ -337,8 +326,7 @@ def update_user(request, user=None):
             'user_id': user.id,
             'site_manager': user.profile.site_manager
         }
-        resitration_fields = json.loads(_local_server_get(
-            REGISTRATION_FIELD_URL, request.session))['fields']
+        resitration_fields = get_registration_fields(request)
         for field in resitration_fields:
             option_list = []
             if field['name'] in SELECT_FIELDS:
@@ -568,25 +556,14 @@ def delete_course(request):
         })
 
 
-@login_required
-@site_administrator_only
-def view_coupons(request):
-    """
-    Display all the coupons that are available for Courses.
-    """
-    COUPON_LABELS = ['Code', 'Course Name', 'Description', 'Discount(%)', 'Created By', 'Created Date',
-                     'Expiration Date', 'Active', 'Delete?']
-    NO_SORT_COLUMNS = ['Description', 'Active', 'Delete?']
-    coupon_details = []
+def _coupon_details(coupons):
     coupon_active_image_url = get_image_url('active')
     course_inactive_image_url = get_image_url('inactive')
-    course_list = get_courses(request.user)
-    coupons = get_coupons()
+    coupon_details = []
     for coupon in coupons:
         temp_dict = OrderedDict()
         temp_dict['code'] = coupon.code
-        course_overview = get_course_overview(coupon.course_id)
-        temp_dict['course_name'] = course_overview.display_name
+        temp_dict['course_name'] = coupon.course_overview.display_name
         temp_dict['description'] = coupon.description
         temp_dict['percentage_discount'] = coupon.percentage_discount
         temp_dict['created_by'] = coupon.created_by.username
@@ -598,15 +575,63 @@ def view_coupons(request):
             'status'] = coupon_active_image_url if coupon.is_active is True else course_inactive_image_url
         temp_dict['coupon_id'] = coupon.id
         coupon_details.append(temp_dict)
+    return coupon_details
+
+
+def _coupons_page_args(request):
+    try:
+        page_size = int(request.GET.get('page_size', COUPON_PAGE_SIZE))
+    except ValueError:
+        page_size = COUPON_PAGE_SIZE
+    return {
+        'query': request.GET.get('q', '').strip(),
+        'cursor': request.GET.get('cursor'),
+        'page_size': page_size
+    }
+
+
+@login_required
+@site_administrator_only
+def view_coupons(request):
+    """
+    Display one page of the coupons that are available for Courses.
+
+    Accepts the same parameters as coupon_details_data; next_page_url
+    links to the following page.
+    """
+    COUPON_LABELS = ['Code', 'Course Name', 'Description', 'Discount(%)', 'Created By', 'Created Date',
+                     'Expiration Date', 'Active', 'Delete?']
+    NO_SORT_COLUMNS = ['Description', 'Active', 'Delete?']
+    course_list = get_courses(request.user)
+    coupons, next_cursor = get_coupons(orgs=get_report_orgs(), **_coupons_page_args(request))
     context = {
-        'coupon_details': coupon_details,
+        'coupon_details': _coupon_details(coupons),
         'labels': COUPON_LABELS,
         'courses': course_list,
-        'no_sort_columns': NO_SORT_COLUMNS
+        'no_sort_columns': NO_SORT_COLUMNS,
+        'coupons_url': reverse('coupon-details-data'),
+        'next_cursor': next_cursor,
+        'next_page_url': _next_page_url(request, next_cursor)
     }
     return render_to_response("admin_dash/offers/coupons.html", context)
 
 
+@login_required
+@site_administrator_only
+def coupon_details_data(request):
+    """
+    Returns one page of course coupons as JSON, newest first.
+
+    Accepts `q` (code prefix), `page_size` and the `cursor` returned with
+    the previous page.
+    """
+    coupons, next_cursor = get_coupons(orgs=get_report_orgs(), **_coupons_page_args(request))
+    return JsonResponse({
+        'coupons': _coupon_details(coupons),
+        'next_cursor': next_cursor
+    })
+
+
 @login_required
 @require_POST
 @site_administrator_only
@@ -739,20 +764,10 @@ def delete_coupon(request):
             'saveChangeId': save_change_button_id
         })
 
-@login_required
-@site_administrator_only
-def program_coupons(request):
-    """
-    Display all the coupons that are available for Courses.
-    """
-    COUPON_LABELS = ['Code', 'Program Name', 'Description', 'Discount(%)', 'Created Date',
-                     'Expiration Date', 'Active', 'Delete?']
-    NO_SORT_COLUMNS = ['Description', 'Active', 'Delete?']
-    coupon_details = []
+def _program_coupon_details(coupons):
     coupon_active_image_url = get_image_url('active')
     coupon_inactive_image_url = get_image_url('inactive')
-    program_list = get_num_programs()
-    coupons = get_program_coupons()
+    coupon_details = []
     for coupon in coupons:
         temp_dict = OrderedDict()
         temp_dict['code'] = coupon.code
@@ -765,16 +780,50 @@ def program_coupons(request):
         temp_dict['status'] = coupon_active_image_url if coupon.is_active is True else coupon_inactive_image_url
         temp_dict['coupon_id'] = coupon.id
         coupon_details.append(temp_dict)
+    return coupon_details
+
+
+@login_required
+@site_administrator_only
+def program_coupons(request):
+    """
+    Display one page of the coupons that are available for Programs.
+
+    Accepts the same parameters as program_coupon_details_data;
+    next_page_url links to the following page.
+    """
+    COUPON_LABELS = ['Code', 'Program Name', 'Description', 'Discount(%)', 'Created Date',
+                     'Expiration Date', 'Active', 'Delete?']
+    NO_SORT_COLUMNS = ['Description', 'Active', 'Delete?']
+    program_list = get_num_programs()
+    coupons, next_cursor = get_program_coupons(**_coupons_page_args(request))
 
     context = {
-        'coupon_details': coupon_details,
+        'coupon_details': _program_coupon_details(coupons),
         'labels': COUPON_LABELS,
         'programs': program_list,
-        'no_sort_columns': NO_SORT_COLUMNS
+        'no_sort_columns': NO_SORT_COLUMNS,
+        'coupons_url': reverse('program-coupon-details-data'),
+        'next_cursor': next_cursor,
+        'next_page_url': _next_page_url(request, next_cursor)
     }
     return render_to_response("admin_dash/offers/program-coupons.html", context)
 
 
+@login_required
+@site_administrator_only
+def program_coupon_details_data(request):
+    """
+    Returns one page of program coupons as JSON, newest first.
+
+    Accepts `q` (code prefix), `page_size` and the `cursor` returned with
+    the previous page.
+    """
+    coupons, next_cursor = get_program_coupons(**_coupons_page_args(request))
+    return JsonResponse({
+        'coupons': _program_coupon_details(coupons),
+        'next_cursor': next_cursor
+    })
 
 
 @login_required
@@ -991,6 +1040,36 @@ def program_delete(request, pk):
     return redirect(reverse('show-programs'))
 
 
+@login_required
+@site_administrator_only
+@require_POST
+def program_enroll_users(request, pk):
+    """
+    Enroll a cohort of users in a program.
+
+    `users` holds usernames or emails separated by commas or whitespace.
+    Repeating a request is harmless, the course enrollments are completed
+    in the background.
+    """
+    program = get_object_or_404(Program, pk=pk)
+    identifiers = set(re.split(r'[\s,]+', request.POST.get('users', '').strip())) - {''}
+    if not identifiers:
+        return JsonResponse(status=400, data={
+            'success': False,
+            'message': 'No users given.'
+        })
+
+    users = list(User.objects.filter(Q(username__in=identifiers) | Q(email__in=identifiers)))
+    found = set(user.username for user in users) | set(user.email for user in users)
+    enrolled = ProgramEnrollment.bulk_enroll(program, users)
+    return JsonResponse(status=200, data={
+        'success': True,
+        'enrolled': enrolled,
+        'already_enrolled': len(users) - enrolled,
+        'not_found': sorted(identifiers - found)
+    })
+
+
 @login_required
 @site_administrator_only
 def show_subject(request):
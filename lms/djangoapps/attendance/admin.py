@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import CampusAttendance, ClassroomAttendance
+from .models import CampusAttendance, ClassroomAttendance, DailyTraffic
 
 
 class CampusAttendanceAdmin(admin.ModelAdmin):
@@ -12,3 +12,10 @@ class ClassroomAttendanceAdmin(admin.ModelAdmin):
 
 admin.site.register(CampusAttendance, CampusAttendanceAdmin)
 admin.site.register(ClassroomAttendance, ClassroomAttendanceAdmin)
+
+
+class DailyTrafficAdmin(admin.ModelAdmin):
+    list_display = ['date', 'visitors', 'content_viewers']
+
+
+admin.site.register(DailyTraffic, DailyTrafficAdmin)
@@ -0,0 +1,40 @@
+"""
+Management command to fill the daily traffic counters from raw attendance rows.
+"""
+from datetime import datetime
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.models import DailyTraffic
+
+
+class Command(BaseCommand):
+    """
+    Recount the daily traffic counters of every day that still has raw
+    attendance rows, optionally limited to a date range (dd-mm-yyyy).
+
+    The counters are filled by a migration and then updated as attendance
+    is recorded; this is only needed to repair them.
+
+    Example:
+
+        ./manage.py lms backfill_daily_traffic --start-date 01-01-2017 --settings=aws
+    """
+    help = dedent(__doc__)
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help='First day to recount, as dd-mm-yyyy.')
+        parser.add_argument('--end-date', help='Last day to recount, as dd-mm-yyyy.')
+
+    def handle(self, *args, **options):
+        try:
+            start_date, end_date = [
+                datetime.strptime(options[name], '%d-%m-%Y').date() if options[name] else None
+                for name in ('start_date', 'end_date')
+            ]
+        except ValueError:
+            raise CommandError(u'Dates must be formatted as dd-mm-yyyy.')
+
+        days = DailyTraffic.rebuild(start_date, end_date)
+        self.stdout.write(u'Recounted daily traffic of {} days.'.format(days))
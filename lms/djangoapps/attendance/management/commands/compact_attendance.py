@@ -0,0 +1,37 @@
+"""
+Management command to delete old raw attendance rows.
+"""
+from textwrap import dedent
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.models import compact_attendance
+
+
+class Command(BaseCommand):
+    """
+    Delete campus and classroom attendance rows older than the retention
+    period, after counting their days in the daily traffic counters.
+
+    Defaults to ATTENDANCE_RAW_RETENTION_DAYS.
+
+    Example:
+
+        ./manage.py lms compact_attendance --keep-days 90 --settings=aws
+    """
+    help = dedent(__doc__)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=getattr(settings, 'ATTENDANCE_RAW_RETENTION_DAYS', None),
+            help='Number of days of raw attendance rows to keep.'
+        )
+
+    def handle(self, *args, **options):
+        if options['keep_days'] is None or options['keep_days'] < 1:
+            raise CommandError(u'Set --keep-days or ATTENDANCE_RAW_RETENTION_DAYS to a positive number of days.')
+        deleted = compact_attendance(options['keep_days'])
+        self.stdout.write(u'Deleted {} raw attendance rows.'.format(deleted))
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import datetime
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampusAttendance',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('ip', models.CharField(max_length=100)),
+                ('date_visited', models.DateField(default=datetime.date.today)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ClassroomAttendance',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('user', models.IntegerField()),
+                ('date_visited', models.DateField(default=datetime.date.today)),
+            ],
+        ),
+    ]
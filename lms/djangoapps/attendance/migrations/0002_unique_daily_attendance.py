@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def remove_duplicate_visits(apps, schema_editor):
+    """
+    Keep the first row of every visitor and day, duplicates came from
+    concurrent requests racing past the exists() check.
+    """
+    for model_name, key in (('CampusAttendance', 'ip'), ('ClassroomAttendance', 'user')):
+        model = apps.get_model('attendance', model_name)
+        duplicates = model.objects.values(key, 'date_visited').annotate(
+            visits=Count('id'), first_id=Min('id')
+        ).filter(visits__gt=1).order_by()
+        for row in duplicates:
+            model.objects.filter(
+                **{key: row[key], 'date_visited': row['date_visited']}
+            ).exclude(id=row['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_visits, reverse_code=migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='campusattendance',
+            unique_together=set([('ip', 'date_visited')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='classroomattendance',
+            unique_together=set([('user', 'date_visited')]),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_unique_daily_attendance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTraffic',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('date', models.DateField(unique=True)),
+                ('visitors', models.PositiveIntegerField(default=0)),
+                ('content_viewers', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_daily_traffic(apps, schema_editor):
+    """
+    Count the visitors and content viewers of the days recorded so far, the
+    counters are only updated incrementally afterwards.
+    """
+    DailyTraffic = apps.get_model('attendance', 'DailyTraffic')
+    days = defaultdict(lambda: {'visitors': 0, 'content_viewers': 0})
+    for model_name, counter in (('CampusAttendance', 'visitors'), ('ClassroomAttendance', 'content_viewers')):
+        model = apps.get_model('attendance', model_name)
+        for row in model.objects.values('date_visited').annotate(count=Count('id')).order_by():
+            days[row['date_visited']][counter] = row['count']
+
+    DailyTraffic.objects.all().delete()
+    DailyTraffic.objects.bulk_create([DailyTraffic(date=day, **counters) for day, counters in days.iteritems()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_dailytraffic'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_daily_traffic, migrations.RunPython.noop),
+    ]
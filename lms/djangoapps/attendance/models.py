@@ -1,12 +1,88 @@
 import datetime
-from django.db import models
+from collections import defaultdict
+
+from django.db import models, transaction, IntegrityError
 
 
 class CampusAttendance(models.Model):
     ip = models.CharField(max_length=100)
     date_visited = models.DateField(default=datetime.date.today)
 
+    class Meta(object):
+        unique_together = (('ip', 'date_visited'),)
+
 
 class ClassroomAttendance(models.Model):
     user = models.IntegerField()
     date_visited = models.DateField(default=datetime.date.today)
+
+    class Meta(object):
+        unique_together = (('user', 'date_visited'),)
+
+
+class DailyTraffic(models.Model):
+    """
+    Number of distinct anonymous visitors and logged in content viewers per
+    day, kept alongside the raw attendance rows so that reports and raw row
+    compaction do not depend on them.
+    """
+    date = models.DateField(unique=True)
+    visitors = models.PositiveIntegerField(default=0)
+    content_viewers = models.PositiveIntegerField(default=0)
+
+    def __unicode__(self):
+        return u'{}: {} visitors, {} content viewers'.format(self.date, self.visitors, self.content_viewers)
+
+    @classmethod
+    def add(cls, day, visitors=0, content_viewers=0):
+        """
+        Add newly recorded visitors and content viewers to the counters of `day`.
+        """
+        counters = {
+            'visitors': models.F('visitors') + visitors,
+            'content_viewers': models.F('content_viewers') + content_viewers,
+        }
+        if cls.objects.filter(date=day).update(**counters):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(date=day, visitors=visitors, content_viewers=content_viewers)
+        except IntegrityError:
+            cls.objects.filter(date=day).update(**counters)
+
+    @classmethod
+    def rebuild(cls, start_date=None, end_date=None):
+        """
+        Recount the days that still have raw attendance rows between
+        `start_date` and `end_date` (both optional), returns the number of days.
+        """
+        days = defaultdict(lambda: {'visitors': 0, 'content_viewers': 0})
+        for model, counter in ((CampusAttendance, 'visitors'), (ClassroomAttendance, 'content_viewers')):
+            rows = model.objects.all()
+            if start_date is not None:
+                rows = rows.filter(date_visited__gte=start_date)
+            if end_date is not None:
+                rows = rows.filter(date_visited__lte=end_date)
+            for row in rows.values('date_visited').annotate(count=models.Count('id')).order_by():
+                days[row['date_visited']][counter] = row['count']
+
+        with transaction.atomic():
+            cls.objects.filter(date__in=days.keys()).delete()
+            cls.objects.bulk_create([cls(date=day, **counters) for day, counters in days.iteritems()])
+        return len(days)
+
+
+def compact_attendance(keep_days):
+    """
+    Delete raw attendance rows older than `keep_days` days once their days
+    are counted in DailyTraffic, returns the number of rows deleted.
+    """
+    cutoff = datetime.date.today() - datetime.timedelta(days=keep_days)
+    deleted = 0
+    with transaction.atomic():
+        DailyTraffic.rebuild(end_date=cutoff - datetime.timedelta(days=1))
+        for model in (CampusAttendance, ClassroomAttendance):
+            rows = model.objects.filter(date_visited__lt=cutoff)
+            deleted += rows.count()
+            rows.delete()
+    return deleted
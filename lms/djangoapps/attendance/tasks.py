@@ -0,0 +1,29 @@
+"""
+Asynchronous tasks for attendance tracking.
+"""
+from logging import getLogger
+
+from celery.task import task  # pylint: disable=import-error,no-name-in-module
+from django.conf import settings
+
+from . import models, tracker
+
+log = getLogger(__name__)
+
+
+@task(ignore_result=True)
+def flush_attendance():
+    """
+    Write buffered attendance sightings to the database.
+    """
+    read = tracker.flush()
+    log.info(u'Attendance: flushed %d buffered sightings.', read)
+
+
+@task(ignore_result=True)
+def compact_attendance():
+    """
+    Delete raw attendance rows older than ATTENDANCE_RAW_RETENTION_DAYS.
+    """
+    deleted = models.compact_attendance(settings.ATTENDANCE_RAW_RETENTION_DAYS)
+    log.info(u'Attendance: compacted %d raw rows.', deleted)
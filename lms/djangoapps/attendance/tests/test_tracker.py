@@ -0,0 +1,44 @@
+"""
+Tests for the attendance tracker.
+"""
+import datetime
+
+from django.test.utils import override_settings
+
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+
+from .. import tracker
+from ..models import CampusAttendance, ClassroomAttendance, DailyTraffic
+
+
+class RecordVisitTest(CacheIsolationTestCase):
+    """
+    Tests that first sightings of the day are recorded once.
+    """
+    ENABLED_CACHES = ['default']
+
+    def assert_traffic(self, visitors, content_viewers):
+        traffic = DailyTraffic.objects.get(date=datetime.date.today())
+        self.assertEqual((traffic.visitors, traffic.content_viewers), (visitors, content_viewers))
+
+    def record_visits(self):
+        for key in ('10.0.0.1', '10.0.0.2', '10.0.0.1'):
+            tracker.record_visit(tracker.CAMPUS, key)
+        tracker.record_visit(tracker.CLASSROOM, 7)
+
+    def test_direct_writes(self):
+        self.record_visits()
+        self.assertEqual(CampusAttendance.objects.count(), 2)
+        self.assertEqual(ClassroomAttendance.objects.count(), 1)
+        self.assert_traffic(2, 1)
+
+    @override_settings(ATTENDANCE_FLUSH_INTERVAL_SECONDS=60)
+    def test_buffered_writes(self):
+        self.record_visits()
+        self.assertFalse(CampusAttendance.objects.exists())
+
+        self.assertEqual(tracker.flush(), 3)
+        self.assertEqual(CampusAttendance.objects.count(), 2)
+        self.assertEqual(ClassroomAttendance.objects.count(), 1)
+        self.assert_traffic(2, 1)
+        self.assertEqual(tracker.flush(), 0)
@@ -0,0 +1,110 @@
+"""
+Cache-backed attendance tracking.
+
+Every visitor (user id when logged in, IP address otherwise) is remembered
+in the cache for the day it was first seen, so repeat visits cost a single
+cache lookup. First sightings are either written right away or, when
+ATTENDANCE_FLUSH_INTERVAL_SECONDS is set, buffered in numbered cache slots
+and written in bulk by the periodic flush_attendance task.
+"""
+import datetime
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from util.cache_buffer import CacheSlotBuffer
+
+from .models import CampusAttendance, ClassroomAttendance, DailyTraffic
+
+log = logging.getLogger(__name__)
+
+CAMPUS = 'campus'
+CLASSROOM = 'classroom'
+
+# Attendance model, visitor key field and DailyTraffic counter of each kind of visit.
+MODELS = {
+    CAMPUS: (CampusAttendance, 'ip', 'visitors'),
+    CLASSROOM: (ClassroomAttendance, 'user', 'content_viewers'),
+}
+
+CACHE_KEY_PREFIX = 'attendance.tracker'
+
+# Seen markers include the date, they only need to outlive the day.
+SEEN_TIMEOUT = 24 * 60 * 60
+SLOT_TIMEOUT = 24 * 60 * 60
+FLUSH_BATCH_SIZE = 1000
+
+SLOTS = CacheSlotBuffer(CACHE_KEY_PREFIX, SLOT_TIMEOUT, FLUSH_BATCH_SIZE)
+
+
+def flush_interval():
+    """
+    Number of seconds between flushes of buffered sightings, 0 disables buffering.
+    """
+    return getattr(settings, 'ATTENDANCE_FLUSH_INTERVAL_SECONDS', 0)
+
+
+def _seen_key(kind, key, day):
+    return u'{}.seen.{}.{}.{}'.format(CACHE_KEY_PREFIX, kind, day.isoformat(), key)
+
+
+def record_visit(kind, key):
+    """
+    Record that visitor `key` was seen today, at most once per day.
+    """
+    today = datetime.date.today()
+    if not cache.add(_seen_key(kind, key, today), True, SEEN_TIMEOUT):
+        return
+
+    # Without buffering, or when the slot sequence was evicted, write right away.
+    if flush_interval() <= 0 or not SLOTS.append((kind, key, today)):
+        _write_visits({(kind, today): [key]})
+
+
+def flush():
+    """
+    Write every buffered sighting to the database, returns the number of sightings read.
+    """
+    return SLOTS.flush(_write_entries)
+
+
+def _write_entries(entries):
+    """
+    Group the (kind, key, day) sightings of `entries` by (kind, day) and
+    write them, returns the number of sightings.
+    """
+    visits = defaultdict(list)
+    for kind, key, day in entries:
+        visits[(kind, day)].append(key)
+    _write_visits(visits)
+    return len(entries)
+
+
+def _write_visits(visits):
+    """
+    Insert the missing attendance rows of `visits`, a dict of
+    {(kind, day): [visitor keys]}, and count them in DailyTraffic.
+    """
+    for (kind, day), keys in visits.iteritems():
+        model, key_field, counter = MODELS[kind]
+        keys = set(keys)
+        existing = set(model.objects.filter(
+            date_visited=day, **{key_field + '__in': keys}
+        ).values_list(key_field, flat=True))
+        new_rows = [model(date_visited=day, **{key_field: key}) for key in keys - existing]
+        if not new_rows:
+            continue
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(new_rows)
+            created = len(new_rows)
+        except IntegrityError:
+            # Another process recorded some of these visitors in the meantime.
+            created = 0
+            for row in new_rows:
+                _, is_new = model.objects.get_or_create(date_visited=day, **{key_field: getattr(row, key_field)})
+                created += is_new
+        DailyTraffic.add(day, **{counter: created})
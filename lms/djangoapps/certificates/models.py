@@ -500,13 +500,24 @@ def certificate_status_for_student(student, course_id):
     If the student has been graded, the dictionary also contains their
     grade for the course with the key "grade".
     '''
+    try:
+        generated_certificate = GeneratedCertificate.objects.get(  # pylint: disable=no-member
+            user=student, course_id=course_id)
+    except GeneratedCertificate.DoesNotExist:
+        generated_certificate = None
+    return certificate_status(generated_certificate)
+
+
+def certificate_status(generated_certificate):
+    """
+    Returns the status dictionary of `certificate_status_for_student` for
+    an already fetched GeneratedCertificate, or for no certificate if None.
+    """
     # Import here instead of top of file since this module gets imported before
     # the course_modes app is loaded, resulting in a Django deprecation warning.
     from course_modes.models import CourseMode
 
-    try:
-        generated_certificate = GeneratedCertificate.objects.get(  # pylint: disable=no-member
-            user=student, course_id=course_id)
+    if generated_certificate:
         cert_status = {
             'status': generated_certificate.status,
             'mode': generated_certificate.mode,
@@ -516,7 +527,7 @@ def certificate_status_for_student(student, course_id):
             cert_status['grade'] = generated_certificate.grade
 
         if generated_certificate.mode == 'audit':
-            course_mode_slugs = [mode.slug for mode in CourseMode.modes_for_course(course_id)]
+            course_mode_slugs = [mode.slug for mode in CourseMode.modes_for_course(generated_certificate.course_id)]
             # Short term fix to make sure old audit users with certs still see their certs
             # only do this if there if no honor mode
             if 'honor' not in course_mode_slugs:
@@ -528,14 +539,15 @@ def certificate_status_for_student(student, course_id):
 
         return cert_status
 
-    except GeneratedCertificate.DoesNotExist:
-        pass
     return {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor, 'uuid': None}
 
 
-def certificate_info_for_user(user, course_id, grade, user_is_whitelisted=None):
+def certificate_info_for_user(user, course_id, grade, user_is_whitelisted=None, user_certificate_status=None):
     """
     Returns the certificate info for a user for grade report.
+
+    The whitelisting and the certificate status of the user are looked up
+    unless given, as when they were read in bulk for the whole report.
     """
     if user_is_whitelisted is None:
         user_is_whitelisted = CertificateWhitelist.objects.filter(
@@ -547,11 +559,12 @@ def certificate_info_for_user(user, course_id, grade, user_is_whitelisted=None):
     eligible_for_certificate = 'Y' if (user_is_whitelisted or grade is not None) and user.profile.allow_certificate \
         else 'N'
 
-    certificate_status = certificate_status_for_student(user, course_id)
-    certificate_generated = certificate_status['status'] == CertificateStatuses.downloadable
+    if user_certificate_status is None:
+        user_certificate_status = certificate_status_for_student(user, course_id)
+    certificate_generated = user_certificate_status['status'] == CertificateStatuses.downloadable
     if certificate_generated:
         certificate_is_delivered = 'Y'
-        certificate_type = certificate_status['mode']
+        certificate_type = user_certificate_status['mode']
 
     return [eligible_for_certificate, certificate_is_delivered, certificate_type]
 
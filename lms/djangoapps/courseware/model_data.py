@@ -989,6 +989,30 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users_and_locations(cls, course_id, user_ids, scorable_locations):
+        """
+        Create a ScoresClient for each of the given users, keyed by user id,
+        with data for the given locations pre-fetched in a single query.
+        """
+        clients = {}
+        for user_id in user_ids:
+            clients[user_id] = cls(course_id, user_id)
+            clients[user_id]._has_fetched = True  # pylint: disable=protected-access
+
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=list(clients),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total in scores_qset.values_list(
+                'student_id', 'module_state_key', 'grade', 'max_grade'
+        ):
+            clients[user_id]._locations_to_scores[  # pylint: disable=protected-access
+                UsageKey.from_string(location).map_into_course(course_id)
+            ] = cls.Score(correct, total)
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
@@ -327,6 +327,20 @@ class PersistentSubsectionGrade(TimeStampedModel):
             course_id=course_key,
         )
 
+    @classmethod
+    def bulk_read_grades_for_users(cls, user_ids, course_key):
+        """
+        Reads all grades for the given users and course with a single query.
+
+        Arguments:
+            user_ids: The users associated with the desired grades
+            course_key: The course identifier for the desired grades
+        """
+        return cls.objects.select_related('visible_blocks').filter(
+            user_id__in=user_ids,
+            course_id=course_key,
+        )
+
     @classmethod
     def update_or_create_grade(cls, **params):
         """
@@ -520,6 +534,17 @@ class PersistentCourseGrade(TimeStampedModel):
         """
         return cls.objects.get(user_id=user_id, course_id=course_id)
 
+    @classmethod
+    def bulk_read_course_grades(cls, user_ids, course_id):
+        """
+        Reads the grades of the given users in a course with a single query.
+
+        Arguments:
+            user_ids: The users associated with the desired grades
+            course_id: The id of the course associated with the desired grades
+        """
+        return cls.objects.filter(user_id__in=user_ids, course_id=course_id)
+
     @classmethod
     def update_or_create_course_grade(cls, user_id, course_id, **kwargs):
         """
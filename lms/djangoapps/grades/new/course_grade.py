@@ -12,11 +12,14 @@ from lazy import lazy
 
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.grades.config.models import PersistentGradesEnabledFlag
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED
+from util.query import batches
 from xmodule import block_metadata_utils
 
 from ..models import PersistentCourseGrade
-from .subsection_grade import SubsectionGradeFactory
+from .grade_batch import GradeBatch
+from .subsection_grade import SubsectionGrade, SubsectionGradeFactory
 from ..transformer import GradesTransformer
 
 
@@ -27,7 +30,7 @@ class CourseGrade(object):
     """
     Course Grade class
     """
-    def __init__(self, student, course, course_structure):
+    def __init__(self, student, course, course_structure, grade_data=None):
         self.student = student
         self.course = course
         self.course_version = getattr(course, 'course_version', None)
@@ -35,7 +38,9 @@ class CourseGrade(object):
         self.course_structure = course_structure
         self._percent = None
         self._letter_grade = None
-        self._subsection_grade_factory = SubsectionGradeFactory(self.student, self.course, self.course_structure)
+        self._subsection_grade_factory = SubsectionGradeFactory(
+            self.student, self.course, self.course_structure, grade_data,
+        )
 
     @lazy
     def graded_subsections_by_format(self):
@@ -89,20 +94,22 @@ class CourseGrade(object):
         chapter_grades = []
         for chapter_key in self.course_structure.get_children(self.course.location):
             chapter = self.course_structure[chapter_key]
-            chapter_subsection_grades = []
-            children = self.course_structure.get_children(chapter_key)
-            for subsection_key in children:
-                chapter_subsection_grades.append(
-                    self._subsection_grade_factory.create(self.course_structure[subsection_key], read_only=True)
-                )
-
             chapter_grades.append({
                 'display_name': block_metadata_utils.display_name_with_default_escaped(chapter),
                 'url_name': block_metadata_utils.url_name_for_block(chapter),
-                'sections': chapter_subsection_grades
+                'sections': self._get_subsection_grades(chapter_key),
             })
         return chapter_grades
 
+    def _get_subsection_grades(self, chapter_key):
+        """
+        Returns the subsection grades of the given chapter.
+        """
+        return [
+            self._subsection_grade_factory.create(self.course_structure[subsection_key], read_only=True)
+            for subsection_key in self.course_structure.get_children(chapter_key)
+        ]
+
     @property
     def percent(self):
         """
@@ -215,19 +222,25 @@ class CourseGrade(object):
         )
 
     @classmethod
-    def load_persisted_grade(cls, user, course, course_structure):
+    def load_persisted_grade(cls, user, course, course_structure, grade_data=None):
         """
         Initializes a CourseGrade object, filling its members with persisted values from the database.
 
         If the grading policy is out of date, recomputes the grade.
 
         If no persisted values are found, returns None.
+        The persisted values prefetched in grade_data are used, if given.
         """
-        try:
-            persistent_grade = PersistentCourseGrade.read_course_grade(user.id, course.id)
-        except PersistentCourseGrade.DoesNotExist:
-            return None
-        course_grade = CourseGrade(user, course, course_structure)
+        if grade_data:
+            persistent_grade = grade_data.course_grade
+            if persistent_grade is None:
+                return None
+        else:
+            try:
+                persistent_grade = PersistentCourseGrade.read_course_grade(user.id, course.id)
+            except PersistentCourseGrade.DoesNotExist:
+                return None
+        course_grade = CourseGrade(user, course, course_structure, grade_data)
 
         current_grading_policy_hash = course_grade.get_grading_policy_hash(course.location, course_structure)
         if current_grading_policy_hash != persistent_grade.grading_policy_hash:
@@ -319,29 +332,105 @@ class CourseGrade(object):
         ))
 
 
+class TrustedPersistedCourseGrade(CourseGrade):
+    """
+    A CourseGrade read from the persisted course and subsection grades of
+    a student, without building the student's course structure nor
+    recomputing anything.
+
+    The course-wide collected block structure is used in place of the
+    student's course structure, and only the subsections the student has
+    persisted grades for are graded. These are the subsections that were
+    visible to the student when the grade was computed.
+    """
+    def __init__(self, student, course, collected_block_structure, grade_data):
+        super(TrustedPersistedCourseGrade, self).__init__(student, course, collected_block_structure, grade_data)
+        self._grade_data = grade_data
+
+    @classmethod
+    def load(cls, student, course, collected_block_structure, grade_data):
+        """
+        Returns the TrustedPersistedCourseGrade of the student, from the
+        persisted grades prefetched in grade_data (a StudentGradeData).
+
+        Returns None if the course grade or the subsection grades are
+        missing, or were not computed for the current version and grading
+        policy of the course. Courses without versions (old mongo courses)
+        can't be checked and always return None.
+        """
+        course_version = getattr(course, 'course_version', None)
+        persistent_grade = grade_data.course_grade
+        if not course_version or persistent_grade is None or not grade_data.subsection_grades:
+            return None
+
+        course_version = unicode(course_version)
+        if persistent_grade.course_version != course_version:
+            return None
+        if persistent_grade.grading_policy_hash != cls.get_grading_policy_hash(
+                course.location, collected_block_structure
+        ):
+            return None
+        if any(grade.course_version != course_version for grade in grade_data.subsection_grades.itervalues()):
+            return None
+
+        course_grade = cls(student, course, collected_block_structure, grade_data)
+        course_grade._percent = persistent_grade.percent_grade  # pylint: disable=protected-access
+        course_grade._letter_grade = persistent_grade.letter_grade  # pylint: disable=protected-access
+        course_grade.course_edited_timestamp = persistent_grade.course_edited_timestamp
+        course_grade._log_event(log.debug, u"load_trusted_persisted_grade")  # pylint: disable=protected-access
+        return course_grade
+
+    def _get_subsection_grades(self, chapter_key):
+        """
+        Returns the subsection grades of the given chapter, loaded from the
+        persisted subsection grades of the student.
+        """
+        subsection_grades = self._grade_data.subsection_grades
+        return [
+            SubsectionGrade(self.course_structure[subsection_key]).init_from_model(
+                self.student,
+                subsection_grades[subsection_key],
+                self.course_structure,
+                self._grade_data.submissions_scores,
+                self._grade_data.csm_scores,
+            )
+            for subsection_key in self.course_structure.get_children(chapter_key)
+            if subsection_key in subsection_grades
+        ]
+
+
 class CourseGradeFactory(object):
     """
     Factory class to create Course Grade objects
     """
-    def create(self, student, course, read_only=True):
+    # Number of students whose scores and grades are loaded together by iter.
+    BATCH_SIZE = 100
+
+    def create(self, student, course, read_only=True, collected_block_structure=None, grade_data=None):
         """
         Returns the CourseGrade object for the given student and course.
 
         If read_only is True, doesn't save any updates to the grades.
         Raises a PermissionDenied if the user does not have course access.
+
+        The course's collected_block_structure and the student's prefetched
+        grade_data (a StudentGradeData) can optionally be provided, if
+        already available, for optimization.
         """
-        course_structure = get_course_blocks(student, course.location)
+        course_structure = get_course_blocks(
+            student, course.location, collected_block_structure=collected_block_structure,
+        )
         # if user does not have access to this course, throw an exception
         if not self._user_has_access_to_course(course_structure):
             raise PermissionDenied("User does not have access to this course")
         return (
-            self._get_saved_grade(student, course, course_structure) or
-            self._compute_and_update_grade(student, course, course_structure, read_only)
+            self._get_saved_grade(student, course, course_structure, grade_data) or
+            self._compute_and_update_grade(student, course, course_structure, read_only, grade_data)
         )
 
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'err_msg'])
 
-    def iter(self, course, students):
+    def iter(self, course, students, batch_size=None, trust_persisted=False):
         """
         Given a course and an iterable of students (User), yield a GradeResult
         for every student enrolled in the course.  GradeResult is a named tuple of:
@@ -350,25 +439,71 @@ class CourseGradeFactory(object):
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
-        """
-        for student in students:
-            with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=[u'action:{}'.format(course.id)]):
-
-                try:
-                    course_grade = CourseGradeFactory().create(student, course)
-                    yield self.GradeResult(student, course_grade, "")
-
-                except Exception as exc:  # pylint: disable=broad-except
-                    # Keep marching on even if this student couldn't be graded for
-                    # some reason, but log it for future reference.
-                    log.exception(
-                        'Cannot grade student %s (%s) in course %s because of exception: %s',
-                        student.username,
-                        student.id,
-                        course.id,
-                        exc.message
-                    )
-                    yield self.GradeResult(student, None, exc.message)
+
+        Students are graded in batches of batch_size (BATCH_SIZE by default),
+        sharing the collected course structure, and with the scores and
+        persisted grades of each batch loaded in bulk.
+
+        If trust_persisted is True, the persisted grades that are up to
+        date with the course are read as they are (see
+        TrustedPersistedCourseGrade), and only the students without such
+        grades are graded. This is meant for reports, the grades read this
+        way do not reflect changes to the course access of the students
+        since they were persisted. The proportion of grades read from the
+        persisted grades is logged and reported to datadog.
+        """
+        collected_block_structure = get_course_in_cache(course.id)
+        trust_persisted = trust_persisted and PersistentGradesEnabledFlag.feature_enabled(course.id)
+        persisted_hits = persisted_misses = 0
+        for batch in batches(students, batch_size or self.BATCH_SIZE):
+            grade_batch = GradeBatch(course, batch, collected_block_structure)
+            for student in batch:
+                with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=[u'action:{}'.format(course.id)]):
+
+                    try:
+                        grade_data = grade_batch.for_student(student)
+                        course_grade = None
+                        if trust_persisted:
+                            course_grade = TrustedPersistedCourseGrade.load(
+                                student, course, collected_block_structure, grade_data,
+                            )
+                            if course_grade:
+                                persisted_hits += 1
+                            else:
+                                persisted_misses += 1
+                            dog_stats_api.increment(
+                                'lms.grades.CourseGradeFactory.iter.persisted_grade',
+                                tags=[u'course:{}'.format(course.id), u'hit:{}'.format(bool(course_grade))],
+                            )
+                        if not course_grade:
+                            course_grade = CourseGradeFactory().create(
+                                student,
+                                course,
+                                collected_block_structure=collected_block_structure,
+                                grade_data=grade_data,
+                            )
+                        yield self.GradeResult(student, course_grade, "")
+
+                    except Exception as exc:  # pylint: disable=broad-except
+                        # Keep marching on even if this student couldn't be graded for
+                        # some reason, but log it for future reference.
+                        log.exception(
+                            'Cannot grade student %s (%s) in course %s because of exception: %s',
+                            student.username,
+                            student.id,
+                            course.id,
+                            exc.message
+                        )
+                        yield self.GradeResult(student, None, exc.message)
+
+        if trust_persisted:
+            log.info(
+                u'Read %s of %s grades of course %s from trusted persisted grades, %s were recomputed',
+                persisted_hits,
+                persisted_hits + persisted_misses,
+                course.id,
+                persisted_misses,
+            )
 
     def update(self, student, course, course_structure):
         """
@@ -386,7 +521,7 @@ class CourseGradeFactory(object):
 
         return CourseGrade.get_persisted_grade(student, course)
 
-    def _get_saved_grade(self, student, course, course_structure):
+    def _get_saved_grade(self, student, course, course_structure, grade_data=None):
         """
         Returns the saved grade for the given course and student.
         """
@@ -396,16 +531,17 @@ class CourseGradeFactory(object):
         return CourseGrade.load_persisted_grade(
             student,
             course,
-            course_structure
+            course_structure,
+            grade_data,
         )
 
-    def _compute_and_update_grade(self, student, course, course_structure, read_only=False):
+    def _compute_and_update_grade(self, student, course, course_structure, read_only=False, grade_data=None):
         """
         Freshly computes and updates the grade for the student and course.
 
         If read_only is True, doesn't save any updates to the grades.
         """
-        course_grade = CourseGrade(student, course, course_structure)
+        course_grade = CourseGrade(student, course, course_structure, grade_data)
         course_grade.compute_and_update(read_only)
         return course_grade
 
@@ -0,0 +1,109 @@
+"""
+GradeBatch Class
+"""
+from collections import defaultdict, namedtuple
+
+from lazy import lazy
+
+from courseware.model_data import ScoresClient
+from lms.djangoapps.grades.config.models import PersistentGradesEnabledFlag
+from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade
+from lms.djangoapps.grades.scores import possibly_scored
+from student.models import anonymous_id_for_user
+from submissions.models import ScoreSummary
+
+
+# The scores and persisted grades of a single student, as consumed by
+# CourseGrade and SubsectionGradeFactory in place of their per-student queries.
+StudentGradeData = namedtuple(
+    'StudentGradeData', ['submissions_scores', 'csm_scores', 'subsection_grades', 'course_grade']
+)
+
+
+class GradeBatch(object):
+    """
+    Loads the scores and persisted grades of a batch of students in a
+    course with one query per storage, instead of one per student.
+    """
+    def __init__(self, course, students, collected_block_structure):
+        self.course = course
+        self.students = list(students)
+        self.collected_block_structure = collected_block_structure
+        self._persistent_grades_enabled = PersistentGradesEnabledFlag.feature_enabled(course.id)
+
+    def for_student(self, student):
+        """
+        Returns the StudentGradeData of the given student of the batch.
+        """
+        return StudentGradeData(
+            submissions_scores=self._submissions_scores.get(student.id, {}),
+            csm_scores=self._csm_scores[student.id],
+            subsection_grades=dict(self._subsection_grades.get(student.id, {})),
+            course_grade=self._course_grades.get(student.id),
+        )
+
+    @lazy
+    def _user_ids(self):
+        return [student.id for student in self.students]
+
+    @lazy
+    def _csm_scores(self):
+        """
+        Returns a ScoresClient per student, for the scorable locations
+        of the course, populated from the courseware student module.
+        """
+        scorable_locations = [
+            block_key for block_key in self.collected_block_structure if possibly_scored(block_key)
+        ]
+        return ScoresClient.create_for_users_and_locations(self.course.id, self._user_ids, scorable_locations)
+
+    @lazy
+    def _submissions_scores(self):
+        """
+        Returns the scores stored by the Submissions API, as dicts of
+        {item_id: (earned, possible)} keyed by student id.
+        """
+        # The anonymous ids are only computed here, the learners that have
+        # submissions had them saved when submitting.
+        user_ids_by_anonymous_id = {
+            anonymous_id_for_user(student, self.course.id, save=False): student.id
+            for student in self.students
+        }
+        score_summaries = ScoreSummary.objects.filter(
+            student_item__course_id=unicode(self.course.id),
+            student_item__student_id__in=list(user_ids_by_anonymous_id),
+        ).select_related('latest', 'student_item')
+
+        scores = defaultdict(dict)
+        for summary in score_summaries:
+            if not summary.latest.is_hidden():
+                user_id = user_ids_by_anonymous_id[summary.student_item.student_id]
+                scores[user_id][summary.student_item.item_id] = (
+                    summary.latest.points_earned,
+                    summary.latest.points_possible,
+                )
+        return scores
+
+    @lazy
+    def _subsection_grades(self):
+        """
+        Returns the persisted subsection grades, as dicts keyed by
+        subsection usage key, keyed by student id.
+        """
+        grades = defaultdict(dict)
+        if self._persistent_grades_enabled:
+            for record in PersistentSubsectionGrade.bulk_read_grades_for_users(self._user_ids, self.course.id):
+                grades[record.user_id][record.full_usage_key] = record
+        return grades
+
+    @lazy
+    def _course_grades(self):
+        """
+        Returns the persisted course grades keyed by student id.
+        """
+        if not self._persistent_grades_enabled:
+            return {}
+        return {
+            grade.user_id: grade
+            for grade in PersistentCourseGrade.bulk_read_course_grades(self._user_ids, self.course.id)
+        }
@@ -202,13 +202,17 @@ class SubsectionGrade(object):
 class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
+
+    If grade_data (a StudentGradeData) is given, its prefetched scores
+    and persisted grades are used instead of querying them for the student.
     """
-    def __init__(self, student, course, course_structure):
+    def __init__(self, student, course, course_structure, grade_data=None):
         self.student = student
         self.course = course
         self.course_structure = course_structure
+        self._grade_data = grade_data
 
-        self._cached_subsection_grades = None
+        self._cached_subsection_grades = grade_data.subsection_grades if grade_data else None
         self._unsaved_subsection_grades = []
 
     def create(self, subsection, read_only=False):
@@ -283,6 +287,8 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        if self._grade_data:
+            return self._grade_data.csm_scores
         scorable_locations = [block_key for block_key in self.course_structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course.id, self.student.id, scorable_locations)
 
@@ -292,6 +298,8 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        if self._grade_data:
+            return self._grade_data.submissions_scores
         anonymous_user_id = anonymous_id_for_user(self.student, self.course.id)
         return submissions_api.get_scores(unicode(self.course.id), anonymous_user_id)
 
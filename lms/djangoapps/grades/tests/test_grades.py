@@ -8,7 +8,7 @@ from mock import patch
 from nose.plugins.attrib import attr
 
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
-from courseware.model_data import set_score
+from courseware.model_data import ScoresClient, set_score
 from courseware.tests.helpers import LoginEnrollmentTestCase
 
 from lms.djangoapps.course_blocks.api import get_course_blocks
@@ -74,6 +74,21 @@ class TestGradeIteration(SharedModuleStoreTestCase):
             self.assertIsNone(course_grade.letter_grade)
             self.assertEqual(course_grade.percent, 0.0)
 
+    def test_batched_iteration(self):
+        """
+        Students are graded in batches, with the scores of each
+        batch loaded together.
+        """
+        with patch(
+            'lms.djangoapps.grades.new.grade_batch.ScoresClient.create_for_users_and_locations',
+            wraps=ScoresClient.create_for_users_and_locations,
+        ) as mock_create_clients:
+            grade_results = list(CourseGradeFactory().iter(self.course, self.students, batch_size=2))
+
+        self.assertEqual(mock_create_clients.call_count, 3)
+        self.assertEqual([result.student for result in grade_results], self.students)
+        self.assertTrue(all(result.course_grade and not result.err_msg for result in grade_results))
+
     @patch('lms.djangoapps.grades.new.course_grade.CourseGradeFactory.create')
     def test_grading_exception(self, mock_course_grade):
         """Test that we correctly capture exception messages that bubble up from
@@ -235,6 +235,17 @@ class PersistentSubsectionGradeTest(GradesModelTestCase):
         del self.params["course_version"]
         PersistentSubsectionGrade.create_grade(**self.params)
 
+    def test_bulk_read_grades_for_users(self):
+        created_grade = PersistentSubsectionGrade.create_grade(**self.params)
+        self.params["user_id"] = 54321
+        other_grade = PersistentSubsectionGrade.create_grade(**self.params)
+        with self.assertNumQueries(1):
+            read_grades = list(PersistentSubsectionGrade.bulk_read_grades_for_users(
+                [12345, 54321, 99999], self.course_key,
+            ))
+            self.assertEqual(set(read_grades), {created_grade, other_grade})
+            self.assertEqual(read_grades[0].visible_blocks.blocks, self.block_records)
+
     @ddt.data(
         ("user_id", ValidationError),
         ("usage_key", KeyError),
@@ -450,6 +461,16 @@ class PersistentCourseGradesTest(GradesModelTestCase):
         with self.assertRaises(PersistentCourseGrade.DoesNotExist):
             PersistentCourseGrade.read_course_grade(self.params["user_id"], self.params["course_id"])
 
+    def test_bulk_read_course_grades(self):
+        created_grade = PersistentCourseGrade.update_or_create_course_grade(**self.params)
+        self.params["user_id"] = 54321
+        other_grade = PersistentCourseGrade.update_or_create_course_grade(**self.params)
+        with self.assertNumQueries(1):
+            read_grades = set(PersistentCourseGrade.bulk_read_course_grades(
+                [12345, 54321, 99999], self.params["course_id"],
+            ))
+        self.assertEqual(read_grades, {created_grade, other_grade})
+
     def test_update_or_create_event(self):
         with patch('lms.djangoapps.grades.models.tracker') as tracker_mock:
             grade = PersistentCourseGrade.update_or_create_course_grade(**self.params)
@@ -14,18 +14,21 @@ from mock import patch
 import pytz
 
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
+from courseware.model_data import set_score
 from courseware.tests.test_submitting_problems import ProblemSubmissionTestMixin
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
 from openedx.core.djangolib.testing.utils import get_mock_request
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase, SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.utils import TEST_DATA_DIR
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
-from ..models import PersistentSubsectionGrade
+from ..models import PersistentCourseGrade, PersistentSubsectionGrade
 from ..new.course_grade import CourseGradeFactory
 from ..new.subsection_grade import SubsectionGrade, SubsectionGradeFactory
 from .utils import mock_get_score, mock_get_submissions_score
@@ -136,6 +139,24 @@ class TestCourseGradeFactory(GradeTestBase):
         self.assertIsNone(course_grade.letter_grade)
         self.assertEqual(course_grade.percent, 0.0)
 
+    def test_iter_in_batches(self):
+        students = [self.request.user, UserFactory(), UserFactory()]
+        for student in students[1:]:
+            CourseEnrollment.enroll(student, self.course.id)
+        set_score(students[0].id, self.problem.location, 1, 2)
+        set_score(students[1].id, self.problem.location, 2, 2)
+
+        grade_results = list(CourseGradeFactory().iter(self.course, students, batch_size=2))
+        self.assertEqual(
+            [(result.student, result.course_grade.percent, result.err_msg) for result in grade_results],
+            [(students[0], 0.5, ""), (students[1], 1.0, ""), (students[2], 0.0, "")],
+        )
+        for result in grade_results:
+            self.assertEqual(
+                result.course_grade.percent,
+                CourseGradeFactory().create(result.student, self.course).percent,
+            )
+
     def test_get_persisted(self):
         grade_factory = CourseGradeFactory()
         # first, create a grade in the database
@@ -173,6 +194,85 @@ class TestCourseGradeFactory(GradeTestBase):
         self.assertEqual(course_grade.percent, 0.5)
 
 
+class TestTrustedPersistedGrades(SharedModuleStoreTestCase):
+    """
+    Test that CourseGradeFactory.iter reads the persisted grades that are
+    up to date with the course when trusting persisted grades.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestTrustedPersistedGrades, cls).setUpClass()
+        # Only split courses have versions to check the persisted grades against.
+        with modulestore().default_store(ModuleStoreEnum.Type.split):
+            cls.course = CourseFactory.create()
+            chapter = ItemFactory.create(parent=cls.course, category="chapter", display_name="Test Chapter")
+            cls.sequence = ItemFactory.create(
+                parent=chapter,
+                category='sequential',
+                display_name="Test Sequential 1",
+                graded=True,
+                format="Homework"
+            )
+            vertical = ItemFactory.create(parent=cls.sequence, category='vertical', display_name='Test Vertical 1')
+            cls.problem = ItemFactory.create(
+                parent=vertical,
+                category="problem",
+                display_name="Test Problem",
+                data=MultipleChoiceResponseXMLFactory().build_xml(
+                    question_text='The correct answer is Choice 3',
+                    choices=[False, False, True, False],
+                    choice_names=['choice_0', 'choice_1', 'choice_2', 'choice_3']
+                ),
+            )
+        cls.course = modulestore().get_course(cls.course.id)
+
+    def setUp(self):
+        super(TestTrustedPersistedGrades, self).setUp()
+        self.students = [UserFactory(), UserFactory()]
+        for student in self.students:
+            CourseEnrollment.enroll(student, self.course.id)
+        set_score(self.students[0].id, self.problem.location, 1, 2)
+
+    def _iter_trusting_persisted(self):
+        """
+        Returns the grade results of iter when trusting persisted grades,
+        and the number of students whose grades were computed.
+        """
+        with patch(
+            'lms.djangoapps.grades.new.course_grade.get_course_blocks', wraps=get_course_blocks
+        ) as mock_get_course_blocks:
+            grade_results = list(CourseGradeFactory().iter(self.course, self.students, trust_persisted=True))
+        return grade_results, mock_get_course_blocks.call_count
+
+    def test_persisted_grades_are_read(self):
+        expected_grade = CourseGradeFactory().create(self.students[0], self.course, read_only=False)
+
+        grade_results, computed_count = self._iter_trusting_persisted()
+        # Only the student without persisted grades is graded.
+        self.assertEqual(computed_count, 1)
+        self.assertEqual(
+            [result.course_grade.percent for result in grade_results],
+            [expected_grade.percent, CourseGradeFactory().create(self.students[1], self.course).percent],
+        )
+        persisted_grade = grade_results[0].course_grade
+        self.assertEqual(
+            persisted_grade.graded_subsections_by_format['Homework'][self.sequence.location].graded_total,
+            expected_grade.graded_subsections_by_format['Homework'][self.sequence.location].graded_total,
+        )
+        self.assertEqual(persisted_grade.score_for_module(self.problem.location), (1, 2))
+
+    def test_stale_persisted_grades_are_recomputed(self):
+        CourseGradeFactory().create(self.students[0], self.course, read_only=False)
+        PersistentCourseGrade.objects.filter(user_id=self.students[0].id).update(course_version='stale')
+
+        grade_results, computed_count = self._iter_trusting_persisted()
+        self.assertEqual(computed_count, 2)
+        self.assertEqual(
+            [result.course_grade.percent for result in grade_results],
+            [CourseGradeFactory().create(student, self.course).percent for student in self.students],
+        )
+
+
 @ddt.ddt
 class TestSubsectionGradeFactory(ProblemSubmissionTestMixin, GradeTestBase):
     """
@@ -16,21 +16,21 @@ class AbstractEnrollmentReportProvider(object):
     __metaclass__ = abc.ABCMeta
 
     @abc.abstractmethod
-    def get_enrollment_info(self, user, course_id):
+    def get_enrollment_info(self, user, course_id, course_enrollment=None):
         """
         Returns the User Enrollment information.
         """
         raise NotImplementedError()
 
     @abc.abstractmethod
-    def get_user_profile(self, user_id):
+    def get_user_profile(self, user_id, user=None):
         """
         Returns the UserProfile information.
         """
         raise NotImplementedError()
 
     @abc.abstractmethod
-    def get_payment_info(self, user, course_id):
+    def get_payment_info(self, user, course_id, course_enrollment=None):
         """
         Returns the User Payment information.
         """
@@ -44,11 +44,13 @@ class BaseAbstractEnrollmentReportProvider(AbstractEnrollmentReportProvider):
 
     # don't allow instantiation of this class, it must be subclassed
     """
-    def get_user_profile(self, user_id):
+    def get_user_profile(self, user_id, user=None):
         """
         Returns the UserProfile information.
+
+        The user and its profile are fetched unless given.
         """
-        user_info = User.objects.select_related('profile').get(id=user_id)
+        user_info = user or User.objects.select_related('profile').get(id=user_id)
         # extended user profile fields are stored in the user_profile meta column
         meta = {}
         if user_info.profile.meta:
@@ -86,13 +88,13 @@ class BaseAbstractEnrollmentReportProvider(AbstractEnrollmentReportProvider):
         user_data['Country'] = user_info.profile.country
         return user_data
 
-    def get_enrollment_info(self, user, course_id):
+    def get_enrollment_info(self, user, course_id, course_enrollment=None):
         """
         Returns the User Enrollment information.
         """
         raise NotImplementedError()
 
-    def get_payment_info(self, user, course_id):
+    def get_payment_info(self, user, course_id, course_enrollment=None):
         """
         Returns the User Payment information.
         """
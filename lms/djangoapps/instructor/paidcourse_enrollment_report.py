@@ -19,9 +19,11 @@ class PaidCourseEnrollmentReportProvider(BaseAbstractEnrollmentReportProvider):
     The concrete class for all CyberSource Enrollment Reports.
     """
 
-    def get_enrollment_info(self, user, course_id):
+    def get_enrollment_info(self, user, course_id, course_enrollment=None):
         """
         Returns the User Enrollment information.
+
+        The enrollment of the user is fetched unless given.
         """
         course = get_course_by_id(course_id, depth=0)
         is_course_staff = bool(has_access(user, 'staff', course))
@@ -36,7 +38,8 @@ class PaidCourseEnrollmentReportProvider(BaseAbstractEnrollmentReportProvider):
         else:
             enrollment_role = _('Student')
 
-        course_enrollment = CourseEnrollment.get_enrollment(user=user, course_key=course_id)
+        if course_enrollment is None:
+            course_enrollment = CourseEnrollment.get_enrollment(user=user, course_key=course_id)
 
         if is_course_staff:
             enrollment_source = _('Staff')
@@ -78,11 +81,14 @@ class PaidCourseEnrollmentReportProvider(BaseAbstractEnrollmentReportProvider):
         course_enrollment_data['Enrollment Role'] = enrollment_role
         return course_enrollment_data
 
-    def get_payment_info(self, user, course_id):
+    def get_payment_info(self, user, course_id, course_enrollment=None):
         """
         Returns the User Payment information.
+
+        The enrollment of the user is fetched unless given.
         """
-        course_enrollment = CourseEnrollment.get_enrollment(user=user, course_key=course_id)
+        if course_enrollment is None:
+            course_enrollment = CourseEnrollment.get_enrollment(user=user, course_key=course_id)
         paid_course_reg_item = PaidCourseRegistration.get_course_item_for_user_enrollment(
             user=user,
             course_id=course_id,
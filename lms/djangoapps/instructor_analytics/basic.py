@@ -428,6 +428,27 @@ def list_problem_responses(course_key, problem_location):
     ]
 
 
+def iter_problem_responses(course_key, problem_location):
+    """
+    Yield the responses to a given problem like `list_problem_responses`
+    returns them, reading them from the database as they are consumed.
+    """
+    problem_key = UsageKey.from_string(problem_location)
+    # Are we dealing with an "old-style" problem location?
+    if not problem_key.run:
+        problem_key = course_key.make_usage_key_from_deprecated_string(problem_location)
+    if problem_key.course_key != course_key:
+        return
+
+    responses = StudentModule.objects.filter(
+        course_id=course_key,
+        module_state_key=problem_key
+    ).order_by('student').values_list('student__username', 'state')
+
+    for username, state in responses.iterator():
+        yield {'username': username, 'state': state}
+
+
 def course_registration_features(features, registration_codes, csv_type):
     """
     Return list of Course Registration Codes as dictionaries.
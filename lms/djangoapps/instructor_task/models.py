@@ -12,16 +12,21 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+from cStringIO import StringIO
+from gzip import GzipFile
 from uuid import uuid4
 import csv
 import json
 import hashlib
 import os.path
+import shutil
+import tempfile
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.db import models, transaction
+from storages.backends.s3boto import S3BotoStorage
 
 from openedx.core.storage import get_storage
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
@@ -177,9 +182,10 @@ class InstructorTask(models.Model):
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. Reports can be stored at once from their rows, or written row
+    by row to a ReportFile for the sake of memory efficiency.
+
+    With 'GZIP' set in its configuration, the store gzips the reports.
     """
     @classmethod
     def from_config(cls, config_name):
@@ -201,6 +207,7 @@ class ReportStore(object):
                     'querystring_expire': 300,
                     'gzip': True,
                 },
+                gzip=config.get('GZIP', False),
             )
         if storage_type == 'azure':
             return DjangoStorageReportStore(
@@ -208,7 +215,8 @@ class ReportStore(object):
                 storage_kwargs={
                     'container': config['CONTAINER'],
                     'url_expiry_secs': config.get('URL_EXPIRY_SECS', 300)
-                }
+                },
+                gzip=config.get('GZIP', False),
             )
         elif storage_type == 'localfs':
             return DjangoStorageReportStore(
@@ -216,27 +224,135 @@ class ReportStore(object):
                 storage_kwargs={
                     'location': config['ROOT_PATH'],
                 },
+                gzip=config.get('GZIP', False),
             )
         return DjangoStorageReportStore.from_config(config_name)
 
-    def _get_utf8_encoded_rows(self, rows):
+
+class ReportFile(object):
+    """
+    A CSV report being written to the storage of a DjangoStorageReportStore,
+    see `DjangoStorageReportStore.open`.
+
+    Rows are encoded to a buffer of up to REPORT_STORE_MAX_BUFFER_SIZE bytes,
+    which is then written, gzipped if the store compresses its reports, to
+    the storage. S3 storages receive the report as a multipart upload, with
+    other storages it is spooled to a temporary file and saved when closed.
+    Either way the report is only visible in the store once closed, and it
+    is discarded when aborted, or when an error interrupts a `with` block.
+    """
+    def __init__(self, storage, path, gzip=False):
+        self.storage = storage
+        self.path = path
+        self.gzip = gzip
+        self.closed = False
+        self._streaming = isinstance(storage, S3BotoStorage)
+        if self._streaming:
+            self._output = storage.open(path, 'wb')
+        else:
+            self._output = tempfile.TemporaryFile()
+        self._compressor = None
+        self._buffer = StringIO()
+        self._csvwriter = csv.writer(self._buffer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def append_rows(self, rows):
         """
-        Given a list of `rows` containing unicode strings, return a
-        new list of rows with those strings encoded as utf-8 for CSV
-        compatibility.
+        Append `rows`, iterables of unicode strings, to the report.
         """
         for row in rows:
-            yield [unicode(item).encode('utf-8') for item in row]
+            self._csvwriter.writerow([unicode(item).encode('utf-8') for item in row])
+            if self._buffer.tell() >= settings.REPORT_STORE_MAX_BUFFER_SIZE:
+                self._flush()
+
+    def append_file(self, report_file):
+        """
+        Append the content of `report_file`, a stored file written by a
+        ReportFile of the same store, such as a part of this report.
+        """
+        self._flush()
+        # Gzip streams can be concatenated, a compressed part is copied as is
+        # after the compressed rows written so far.
+        self._end_compressed_member()
+        shutil.copyfileobj(report_file, self._output)
+
+    def close(self):
+        """
+        Write the remaining rows and store the report.
+        """
+        if self.closed:
+            return
+        self._flush()
+        self._end_compressed_member()
+        if self._streaming:
+            self._output.close()
+        else:
+            self._output.seek(0)
+            self.storage.save(self.path, File(self._output, name=os.path.basename(self.path)))
+            self._output.close()
+        self.closed = True
+
+    def abort(self):
+        """
+        Discard the report.
+        """
+        if self.closed:
+            return
+        if self._streaming:
+            # S3BotoStorageFile has no public way to cancel its upload; without
+            # one the parts never complete into a stored report either.
+            multipart = getattr(self._output, '_multipart', None)
+            if multipart is not None:
+                multipart.cancel_upload()
+        else:
+            self._output.close()
+        self.closed = True
+
+    def _flush(self):
+        """
+        Write the buffered rows to the output.
+        """
+        data = self._buffer.getvalue()
+        if not data:
+            return
+        if not self.gzip:
+            self._output.write(data)
+        else:
+            if self._compressor is None:
+                self._compressor = GzipFile(
+                    filename=os.path.splitext(os.path.basename(self.path))[0], mode='wb', fileobj=self._output
+                )
+            self._compressor.write(data)
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def _end_compressed_member(self):
+        """
+        Write the end of the gzip stream of the rows written so far, closing
+        the compressor does not close the output.
+        """
+        if self._compressor is not None:
+            self._compressor.close()
+            self._compressor = None
 
 
 class DjangoStorageReportStore(ReportStore):
     """
     ReportStore implementation that delegates to django's storage api.
     """
-    def __init__(self, storage_class=None, storage_kwargs=None):
+    def __init__(self, storage_class=None, storage_kwargs=None, gzip=False):
         if storage_kwargs is None:
             storage_kwargs = {}
         self.storage = get_storage(storage_class, **storage_kwargs)
+        self.gzip = gzip
 
     @classmethod
     def from_config(cls, config_name):
@@ -250,12 +366,14 @@ class DjangoStorageReportStore(ReportStore):
             STORAGE_KWARGS : An optional dict of kwargs to pass to the storage
                              constructor. This can be used to specify a
                              different S3 bucket or root path, for example.
+            GZIP : Whether to gzip the reports, False by default.
 
         Reference the setting name when calling `.from_config`.
         """
         return cls(
             getattr(settings, config_name).get('STORAGE_CLASS'),
             getattr(settings, config_name).get('STORAGE_KWARGS'),
+            getattr(settings, config_name).get('GZIP', False),
         )
 
     def store(self, course_id, filename, buff):
@@ -267,16 +385,53 @@ class DjangoStorageReportStore(ReportStore):
         path = self.path_to(course_id, filename)
         self.storage.save(path, buff)
 
+    def open(self, course_id, filename):
+        """
+        Return a ReportFile to write the CSV report `filename` of a course
+        row by row, which stores it when closed. '.gz' is appended to the
+        filename of gzipped reports.
+        """
+        if self.gzip:
+            filename += '.gz'
+        return ReportFile(self.storage, self.path_to(course_id, filename), self.gzip)
+
     def store_rows(self, course_id, filename, rows):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
         """
-        output_buffer = ContentFile('')
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        with self.open(course_id, filename) as report_file:
+            report_file.append_rows(rows)
+
+    def list_parts(self, course_id, dirname):
+        """
+        Return the filenames of the files stored under `dirname` for a
+        course, sorted by name. The files of a subdirectory are not listed
+        by `links_for`, which makes it suitable for partial reports.
+        """
+        try:
+            _, filenames = self.storage.listdir(self.path_to(course_id, dirname))
+        except OSError:
+            return []
+        return [os.path.join(dirname, filename) for filename in sorted(filenames)]
+
+    def concatenate(self, course_id, filename, part_filenames, header_rows=()):
+        """
+        Store `header_rows` followed by the content of the stored CSV files
+        `part_filenames`, in order, as `filename`. The parts are copied
+        through a ReportFile, so a part is never fully read in memory.
+        """
+        with self.open(course_id, filename) as report_file:
+            report_file.append_rows(header_rows)
+            for part_filename in part_filenames:
+                with self.storage.open(self.path_to(course_id, part_filename)) as part_file:
+                    report_file.append_file(part_file)
+
+    def delete(self, course_id, filename):
+        """
+        Delete the stored file `filename` of a course.
+        """
+        self.storage.delete(self.path_to(course_id, filename))
 
     def links_for(self, course_id):
         """
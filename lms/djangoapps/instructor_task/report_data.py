@@ -0,0 +1,157 @@
+"""
+StudentReportData Class
+"""
+from lazy import lazy
+
+from certificates.models import (
+    CertificateWhitelist,
+    GeneratedCertificate,
+    certificate_info_for_user,
+    certificate_status,
+)
+from lms.djangoapps.teams.models import CourseTeamMembership
+from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
+from openedx.core.djangoapps.course_groups.models import CohortMembership
+from openedx.core.djangoapps.user_api.models import UserCourseTag
+from openedx.core.djangoapps.user_api.partition_schemes import RandomUserPartitionScheme
+from student.models import CourseEnrollment
+from xmodule.partitions.partitions import NoSuchUserPartitionGroupError
+
+
+class StudentReportData(object):
+    """
+    Loads the per-student values of the instructor reports for a batch of
+    students in a course, with one query per kind of value instead of one
+    per student, and serves them by student id.
+
+    The groups of the students are loaded for `experiment_partitions`, the
+    split test partitions of the course.
+    """
+    def __init__(self, course_id, user_ids, experiment_partitions=()):
+        self.course_id = course_id
+        self.user_ids = list(user_ids)
+        self.experiment_partitions = list(experiment_partitions)
+
+    def cohort_name(self, user_id):
+        """
+        Returns the name of the cohort of the student, or '' when none.
+        """
+        return self._cohort_names.get(user_id, '')
+
+    def experiment_group_name(self, user_id, partition):
+        """
+        Returns the name of the group of the student in the given experiment
+        partition, or '' when the student was not assigned one.
+        """
+        group_id = self._experiment_group_ids.get((user_id, RandomUserPartitionScheme.key_for_partition(partition)))
+        if group_id is None:
+            return ''
+        try:
+            return partition.get_group(int(group_id)).name
+        except NoSuchUserPartitionGroupError:
+            return ''
+
+    def team_name(self, user_id):
+        """
+        Returns the name of the team of the student, or '' when none.
+        """
+        return self._team_names.get(user_id, '')
+
+    def enrollment(self, user_id):
+        """
+        Returns the CourseEnrollment of the student, or None.
+        """
+        return self._enrollments.get(user_id)
+
+    def enrollment_mode(self, user_id):
+        """
+        Returns the enrollment mode of the student, or None when not enrolled.
+        """
+        enrollment = self.enrollment(user_id)
+        return enrollment.mode if enrollment else None
+
+    def verification_status(self, student):
+        """
+        Returns the verification status of the student for the grade report.
+        """
+        return SoftwareSecurePhotoVerification.verification_status_for_user(
+            student,
+            self.course_id,
+            self.enrollment_mode(student.id),
+            user_is_verified=student.id in self._verified_user_ids,
+        )
+
+    def certificate_info(self, student, grade):
+        """
+        Returns the certificate info of the student for the grade report.
+        """
+        return certificate_info_for_user(
+            student,
+            self.course_id,
+            grade,
+            user_is_whitelisted=student.id in self._whitelisted_user_ids,
+            user_certificate_status=certificate_status(self._certificates.get(student.id)),
+        )
+
+    @lazy
+    def _cohort_names(self):
+        return dict(
+            CohortMembership.objects.filter(
+                course_id=self.course_id, user_id__in=self.user_ids,
+            ).values_list('user_id', 'course_user_group__name')
+        )
+
+    @lazy
+    def _experiment_group_ids(self):
+        """
+        Returns the experiment groups of the students keyed by (user id, partition key).
+
+        Experiment partitions use the random scheme, which stores the group
+        of a student in a course tag.
+        """
+        if not self.experiment_partitions:
+            return {}
+        tags = UserCourseTag.objects.filter(
+            course_id=self.course_id,
+            user_id__in=self.user_ids,
+            key__in=[
+                RandomUserPartitionScheme.key_for_partition(partition) for partition in self.experiment_partitions
+            ],
+        )
+        return {(tag.user_id, tag.key): tag.value for tag in tags}
+
+    @lazy
+    def _team_names(self):
+        return dict(
+            CourseTeamMembership.objects.filter(
+                team__course_id=self.course_id, user_id__in=self.user_ids,
+            ).values_list('user_id', 'team__name')
+        )
+
+    @lazy
+    def _enrollments(self):
+        return {
+            enrollment.user_id: enrollment
+            for enrollment in CourseEnrollment.objects.filter(course_id=self.course_id, user_id__in=self.user_ids)
+        }
+
+    @lazy
+    def _verified_user_ids(self):
+        return SoftwareSecurePhotoVerification.verified_user_ids(self.user_ids)
+
+    @lazy
+    def _whitelisted_user_ids(self):
+        return set(
+            CertificateWhitelist.objects.filter(
+                course_id=self.course_id, user_id__in=self.user_ids, whitelist=True,
+            ).values_list('user_id', flat=True)
+        )
+
+    @lazy
+    def _certificates(self):
+        return {
+            certificate.user_id: certificate
+            for certificate in GeneratedCertificate.objects.filter(  # pylint: disable=no-member
+                course_id=self.course_id, user_id__in=self.user_ids,
+            )
+        }
@@ -463,10 +463,13 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
         raise DuplicateTaskException(msg)
 
 
-def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0):
+def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0, complete_entry=True):
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
+    If `complete_entry` is False, the parent InstructorTask is left in progress once all its
+    subtasks are done, for the caller to complete it.
+
     Because select_for_update is used to lock the InstructorTask object while it is being updated,
     multiple subtasks updating at the same time may time out while waiting for the lock.
     The actual update operation is surrounded by a try/except/else that permits the update to be
@@ -476,7 +479,7 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
     the attempting of retries has concluded.
     """
     try:
-        _update_subtask_status(entry_id, current_task_id, new_subtask_status)
+        _update_subtask_status(entry_id, current_task_id, new_subtask_status, complete_entry)
     except DatabaseError:
         # If we fail, try again recursively.
         retry_count += 1
@@ -484,7 +487,7 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
             TASK_LOG.info("Retrying to update status for subtask %s of instructor task %d with status %s:  retry %d",
                           current_task_id, entry_id, new_subtask_status, retry_count)
             dog_stats_api.increment('instructor_task.subtask.retry_after_failed_update')
-            update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count)
+            update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count, complete_entry)
         else:
             TASK_LOG.info("Failed to update status after %d retries for subtask %s of instructor task %d with status %s",
                           retry_count, current_task_id, entry_id, new_subtask_status)
@@ -498,7 +501,7 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
 
 
 @transaction.atomic
-def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
+def _update_subtask_status(entry_id, current_task_id, new_subtask_status, complete_entry=True):
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
@@ -518,7 +521,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     subtasks.  'Total' is expected to have been set at the time the subtasks were created.
     The other three counters are incremented depending on the value of `status`.  Once the counters
     for 'succeeded' and 'failed' match the 'total', the subtasks are done and the InstructorTask's
-    "status" is changed to SUCCESS.
+    "status" is changed to SUCCESS, unless `complete_entry` is False.
 
     The "subtasks" field also contains a 'status' key, that contains a dict that stores status
     information for each subtask.  At the moment, the value for each subtask (keyed by its task_id)
@@ -574,7 +577,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         # At present, we mark the task as having succeeded.  In future, we should see
         # if there was a catastrophic failure that occurred, and figure out how to
         # report that here.
-        if num_remaining <= 0:
+        if num_remaining <= 0 and complete_entry:
             entry.task_state = SUCCESS
         entry.subtasks = json.dumps(subtask_dict)
         entry.task_output = InstructorTask.create_output_for_success(task_progress)
@@ -36,6 +36,7 @@ from lms.djangoapps.instructor_task.tasks_helper import (
     delete_problem_module_state,
     upload_problem_responses_csv,
     upload_grades_csv,
+    upload_grades_csv_part,
     upload_problem_grade_report,
     upload_students_csv,
     cohort_students_and_upload,
@@ -176,6 +177,15 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def calculate_grades_csv_part(entry_id, part_index, student_ids, subtask_status_dict):
+    """
+    Grade a chunk of the students of a course as a subtask of
+    `calculate_grades_csv`, storing their part of the grade report.
+    """
+    return upload_grades_csv_part(entry_id, part_index, student_ids, subtask_status_dict)
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     """
@@ -5,19 +5,22 @@ running state of a course.
 """
 import json
 import logging
+import os
 from StringIO import StringIO
 from collections import OrderedDict
 from datetime import datetime
-from itertools import chain
+from itertools import chain, count
 from time import time
 
 import dogstats_wrapper as dog_stats_api
 import re
+import traceback
 import unicodecsv
 from celery import Task, current_task
-from celery.states import SUCCESS, FAILURE
+from celery.states import SUCCESS, FAILURE, READY_STATES
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.files.storage import DefaultStorage
 from django.db import reset_queries
 from django.db.models import Q
@@ -25,20 +28,13 @@ from django.utils.translation import ugettext as _
 from eventtracking import tracker
 from lms.djangoapps.grades.scores import weighted_score
 from lms.djangoapps.instructor.paidcourse_enrollment_report import PaidCourseEnrollmentReportProvider
-from lms.djangoapps.teams.models import CourseTeamMembership
-from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 from pytz import UTC
 from track import contexts
 from xmodule.modulestore.django import modulestore
 from xmodule.split_test_module import get_split_user_partitions
 
 from certificates.api import generate_user_certificates
-from certificates.models import (
-    CertificateWhitelist,
-    certificate_info_for_user,
-    CertificateStatuses,
-    GeneratedCertificate
-)
+from certificates.models import CertificateStatuses, GeneratedCertificate
 from courseware.courses import get_course_by_id, get_problems_in_section
 from lms.djangoapps.grades.context import grading_context_for_course
 from lms.djangoapps.grades.new.course_grade import CourseGradeFactory
@@ -50,7 +46,7 @@ from instructor_analytics.basic import (
     enrolled_students_features,
     get_proctored_exam_results,
     list_may_enroll,
-    list_problem_responses
+    iter_problem_responses
 )
 from instructor_analytics.csvs import format_dictlist
 from shoppingcart.models import (
@@ -59,8 +55,13 @@ from shoppingcart.models import (
 )
 from openassessment.data import OraAggregateData
 from lms.djangoapps.instructor_task.models import ReportStore, InstructorTask, PROGRESS
-from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
-from openedx.core.djangoapps.course_groups.cohorts import get_cohort
+from lms.djangoapps.instructor_task.report_data import StudentReportData
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    update_subtask_status,
+)
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
 from opaque_keys.edx.keys import UsageKey
 from openedx.core.djangoapps.course_groups.cohorts import add_user_to_cohort, is_course_cohorted
@@ -70,6 +71,7 @@ from track.event_transaction_utils import set_event_transaction_type, create_new
 from track.views import task_track
 from util.db import outer_atomic
 from util.file import course_filename_prefix_generator, UniversalNewlineIterator
+from util.query import batches
 from xblock.runtime import KvsFieldData
 
 # define different loggers for use within tasks and on client side
@@ -89,6 +91,15 @@ GRADES_RESCORE_EVENT_TYPE = 'edx.grades.problem.rescored'
 # The setting name used for events when "settings" (account settings, preferences, profile information) change.
 REPORT_REQUESTED_EVENT_NAME = u'edx.instructor.report.requested'
 
+GRADE_REPORT_ERROR_HEADER = ["id", "username", "error_msg"]
+GRADE_REPORT_SUBTASK_ERROR_MSG = u'Grade report subtask failed'
+# Held by the subtask assembling a grade report generated in subtasks.
+GRADE_REPORT_ASSEMBLY_LOCK_KEY = u'instructor_task.grade_report_assembly.{}'
+GRADE_REPORT_ASSEMBLY_LOCK_EXPIRE = 60 * 60 * 24
+
+# The enrollment report reads the enrollments of this many students at once.
+ENROLLMENT_REPORT_BATCH_SIZE = 100
+
 
 class BaseInstructorTask(Task):
     """
@@ -638,6 +649,17 @@ def delete_problem_module_state(xmodule_instance_args, _module_descriptor, stude
     return UPDATE_STATUS_SUCCEEDED
 
 
+def _csv_report_filename(csv_name, course_id, timestamp):
+    """
+    Returns the filename of the CSV report `csv_name` of a course generated at `timestamp`.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+
 def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
     """
     Upload data as a CSV using ReportStore.
@@ -653,18 +675,21 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
         course_id: ID of the course
     """
     report_store = ReportStore.from_config(config_name)
-    report_store.store_rows(
-        course_id,
-        u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-            course_prefix=course_filename_prefix_generator(course_id),
-            csv_name=csv_name,
-            timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-        ),
-        rows
-    )
+    report_store.store_rows(course_id, _csv_report_filename(csv_name, course_id, timestamp), rows)
     tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
 
 
+def open_csv_report(csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
+    """
+    Open a CSV report like the one `upload_csv_to_report_store` uploads,
+    to write it row by row instead of keeping all its rows in memory.
+
+    Returns a ReportFile, which uploads the report when closed.
+    """
+    report_store = ReportStore.from_config(config_name)
+    return report_store.open(course_id, _csv_report_filename(csv_name, course_id, timestamp))
+
+
 def upload_exec_summary_to_store(data_dict, report_name, course_id, generated_at, config_name='FINANCIAL_REPORTS'):
     """
     Upload Executive Summary Html file using ReportStore.
@@ -691,14 +716,18 @@ def upload_exec_summary_to_store(data_dict, report_name, course_id, generated_at
     tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": report_name})
 
 
-def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):  # pylint: disable=too-many-statements
+def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
     """
     For a given `course_id`, generate a grades CSV file for all students that
     are enrolled, and store using a `ReportStore`. Once created, the files can
     be accessed by instantiating another `ReportStore` (via
-    `ReportStore.from_config()`) and calling `link_for()` on it. Writes are
-    buffered, so we'll never write part of a CSV file to S3 -- i.e. any files
-    that are visible in ReportStore will be complete ones.
+    `ReportStore.from_config()`) and calling `link_for()` on it. Rows are
+    written as students are graded, but the report only becomes visible in
+    the ReportStore once complete -- i.e. any files that are visible in
+    ReportStore will be complete ones.
+
+    Courses with more enrolled students than GRADE_REPORT_SUBTASK_THRESHOLD
+    are graded in parallel subtasks instead, see `queue_grade_report_subtasks`.
 
     As we start to add more CSV downloads, it will probably be worthwhile to
     make a more general CSVDoc class instead of building out the rows like we
@@ -707,8 +736,13 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     start_time = time()
     start_date = datetime.now(UTC)
     status_interval = 100
-    enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id)
+    enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id).select_related('profile')
     total_enrolled_students = enrolled_students.count()
+
+    subtask_threshold = settings.GRADE_REPORT_SUBTASK_THRESHOLD
+    if subtask_threshold is not None and total_enrolled_students > subtask_threshold:
+        return queue_grade_report_subtasks(_entry_id, enrolled_students, total_enrolled_students, action_name)
+
     task_progress = TaskProgress(action_name, total_enrolled_students, start_time)
 
     fmt = u'Task: {task_id}, InstructorTask ID: {entry_id}, Course: {course_id}, Input: {task_input}'
@@ -721,21 +755,11 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     TASK_LOG.info(u'%s, Task type: %s, Starting task execution', task_info_string, action_name)
 
     course = get_course_by_id(course_id)
-    course_is_cohorted = is_course_cohorted(course.id)
-    teams_enabled = course.teams_enabled
-    cohorts_header = ['Cohort Name'] if course_is_cohorted else []
-    teams_header = ['Team Name'] if teams_enabled else []
+    report_context = _grade_report_context(course)
 
-    experiment_partitions = get_split_user_partitions(course.user_partitions)
-    group_configs_header = [u'Experiment Group ({})'.format(partition.name) for partition in experiment_partitions]
-
-    certificate_info_header = ['Certificate Eligible', 'Certificate Delivered', 'Certificate Type']
-    certificate_whitelist = CertificateWhitelist.objects.filter(course_id=course_id, whitelist=True)
-    whitelisted_user_ids = [entry.user_id for entry in certificate_whitelist]
-
-    # Loop over all our students and build our CSV lists in memory
-    rows = []
-    err_rows = [["id", "username", "error_msg"]]
+    # Loop over all our students and write their rows to the report as they are
+    # graded, only the error rows are kept in memory
+    err_rows = [GRADE_REPORT_ERROR_HEADER]
     current_step = {'step': 'Calculating Grades'}
 
     student_counter = 0
@@ -747,14 +771,114 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
         total_enrolled_students,
     )
 
-    graded_assignments = _graded_assignments(course_id)
+    with open_csv_report('grade_report', course_id, start_date) as report_file:
+        report_file.append_rows([_grade_report_header(report_context)])
+
+        grade_results = _with_student_report_data(
+            course_id,
+            CourseGradeFactory().iter(
+                course, enrolled_students, trust_persisted=settings.GRADE_REPORT_TRUST_PERSISTED_GRADES,
+            ),
+            report_context['experiment_partitions'],
+        )
+        for student, course_grade, err_msg, report_data in grade_results:
+            # Periodically update task status (this is a cache write)
+            if task_progress.attempted % status_interval == 0:
+                task_progress.update_task_state(extra_meta=current_step)
+            task_progress.attempted += 1
+
+            # Now add a log entry after each student is graded to get a sense
+            # of the task's progress
+            student_counter += 1
+            TASK_LOG.info(
+                u'%s, Task type: %s, Current step: %s, Grade calculation in-progress for students: %s/%s',
+                task_info_string,
+                action_name,
+                current_step,
+                student_counter,
+                total_enrolled_students
+            )
+
+            if not course_grade:
+                # An empty gradeset means we failed to grade a student.
+                task_progress.failed += 1
+                err_rows.append([student.id, student.username, err_msg])
+                continue
+
+            # We were able to successfully grade this student for this course.
+            task_progress.succeeded += 1
+            report_file.append_rows([_grade_report_row(report_context, report_data, student, course_grade)])
+
+        TASK_LOG.info(
+            u'%s, Task type: %s, Current step: %s, Grade calculation completed for students: %s/%s',
+            task_info_string,
+            action_name,
+            current_step,
+            student_counter,
+            total_enrolled_students
+        )
+
+        # By this point, we've written all the rows, the grade report is stored
+        # when closed and the error rows are stuffed into their CSV file.
+        current_step = {'step': 'Uploading CSVs'}
+        task_progress.update_task_state(extra_meta=current_step)
+        TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
+
+    tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": 'grade_report'})
+
+    # If there are any error rows (don't count the header), write them out as well
+    if len(err_rows) > 1:
+        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
+
+    # One last update before we close out...
+    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
+    return task_progress.update_task_state(extra_meta=current_step)
+
+
+def _grade_report_context(course):
+    """
+    Returns a dict of the course-wide values used to build the rows of
+    the grade report of a course.
+    """
+    return {
+        'course': course,
+        'course_is_cohorted': is_course_cohorted(course.id),
+        'teams_enabled': course.teams_enabled,
+        'experiment_partitions': get_split_user_partitions(course.user_partitions),
+        'graded_assignments': _graded_assignments(course.id),
+    }
+
+
+def _with_student_report_data(course_id, grade_results, experiment_partitions=()):
+    """
+    Yields the (student, course_grade, err_msg) results of
+    `CourseGradeFactory.iter` extended with the StudentReportData of the
+    student, loaded for the same batches of students as their grades.
+    """
+    for batch in batches(grade_results, CourseGradeFactory.BATCH_SIZE):
+        report_data = StudentReportData(course_id, [student.id for student, __, __ in batch], experiment_partitions)
+        for student, course_grade, err_msg in batch:
+            yield student, course_grade, err_msg, report_data
+
+
+def _grade_report_header(report_context):
+    """
+    Returns the header row of the grade report.
+    """
     grade_header = []
-    for assignment_info in graded_assignments.itervalues():
+    for assignment_info in report_context['graded_assignments'].itervalues():
         if assignment_info['use_subsection_headers']:
             grade_header.extend(assignment_info['subsection_headers'].itervalues())
         grade_header.append(assignment_info['average_header'])
 
-    rows.append(
+    cohorts_header = ['Cohort Name'] if report_context['course_is_cohorted'] else []
+    group_configs_header = [
+        u'Experiment Group ({})'.format(partition.name) for partition in report_context['experiment_partitions']
+    ]
+    teams_header = ['Team Name'] if report_context['teams_enabled'] else []
+    certificate_info_header = ['Certificate Eligible', 'Certificate Delivered', 'Certificate Type']
+
+    return (
         ["Student ID", "Email", "Username", "Grade"] +
         grade_header +
         cohorts_header +
@@ -764,114 +888,274 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
         certificate_info_header
     )
 
-    for student, course_grade, err_msg in CourseGradeFactory().iter(course, enrolled_students):
-        # Periodically update task status (this is a cache write)
-        if task_progress.attempted % status_interval == 0:
-            task_progress.update_task_state(extra_meta=current_step)
-        task_progress.attempted += 1
 
-        # Now add a log entry after each student is graded to get a sense
-        # of the task's progress
-        student_counter += 1
-        TASK_LOG.info(
-            u'%s, Task type: %s, Current step: %s, Grade calculation in-progress for students: %s/%s',
-            task_info_string,
-            action_name,
-            current_step,
-            student_counter,
-            total_enrolled_students
+def _grade_report_row(report_context, report_data, student, course_grade):
+    """
+    Returns the grade report row of a successfully graded student, with
+    the values read in bulk by the StudentReportData of the student.
+    """
+    cohorts_group_name = []
+    if report_context['course_is_cohorted']:
+        cohorts_group_name.append(report_data.cohort_name(student.id))
+
+    group_configs_group_names = [
+        report_data.experiment_group_name(student.id, partition)
+        for partition in report_context['experiment_partitions']
+    ]
+
+    team_name = []
+    if report_context['teams_enabled']:
+        team_name.append(report_data.team_name(student.id))
+
+    enrollment_mode = report_data.enrollment_mode(student.id)
+    verification_status = report_data.verification_status(student)
+    certificate_info = report_data.certificate_info(student, course_grade.letter_grade)
+
+    grade_results = []
+    for assignment_type, assignment_info in report_context['graded_assignments'].iteritems():
+        for subsection_location in assignment_info['subsection_headers']:
+            try:
+                subsection_grade = course_grade.graded_subsections_by_format[assignment_type][subsection_location]
+            except KeyError:
+                grade_results.append([u'Not Available'])
+            else:
+                if subsection_grade.graded_total.attempted:
+                    grade_results.append(
+                        [subsection_grade.graded_total.earned / subsection_grade.graded_total.possible]
+                    )
+                else:
+                    grade_results.append([u'Not Attempted'])
+        if assignment_info['use_subsection_headers']:
+            assignment_average = course_grade.grade_value['grade_breakdown'].get(assignment_type, {}).get('percent')
+            grade_results.append([assignment_average])
+
+    grade_results = list(chain.from_iterable(grade_results))
+
+    return (
+        [student.id, student.email, student.username, course_grade.percent] +
+        grade_results + cohorts_group_name + group_configs_group_names + team_name +
+        [enrollment_mode] + [verification_status] + certificate_info
+    )
+
+
+def _grade_report_parts_dir(entry_id, csv_name):
+    """
+    Returns the ReportStore directory of the parts of the `csv_name`
+    report generated by the subtasks of an InstructorTask.
+    """
+    return u'{csv_name}_parts_{entry_id}'.format(csv_name=csv_name, entry_id=entry_id)
+
+
+def queue_grade_report_subtasks(entry_id, enrolled_students, total_enrolled_students, action_name):
+    """
+    Split the grade report of a course into subtasks grading
+    GRADE_REPORT_STUDENTS_PER_TASK students each, see `upload_grades_csv_part`.
+
+    Returns the task progress, the subtasks keep the progress of the
+    InstructorTask up to date and the last one to complete assembles the
+    report.
+    """
+    from lms.djangoapps.instructor_task.tasks import calculate_grades_csv_part
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    part_indexes = count(1)
+
+    def _create_grade_report_subtask(student_list, initial_subtask_status):
+        """Creates a subtask to grade a given list of students."""
+        return calculate_grades_csv_part.subtask(
+            (
+                entry_id,
+                next(part_indexes),
+                [student['pk'] for student in student_list],
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+            routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
         )
 
-        if not course_grade:
-            # An empty gradeset means we failed to grade a student.
-            task_progress.failed += 1
-            err_rows.append([student.id, student.username, err_msg])
-            continue
+    return queue_subtasks_for_query(
+        entry,
+        action_name,
+        _create_grade_report_subtask,
+        [enrolled_students.order_by('id')],
+        [],
+        settings.GRADE_REPORT_STUDENTS_PER_TASK,
+        total_enrolled_students,
+    )
 
-        # We were able to successfully grade this student for this course.
-        task_progress.succeeded += 1
 
-        cohorts_group_name = []
-        if course_is_cohorted:
-            group = get_cohort(student, course_id, assign=False)
-            cohorts_group_name.append(group.name if group else '')
+def upload_grades_csv_part(entry_id, part_index, student_ids, subtask_status_dict):
+    """
+    Grade the students `student_ids` of the course of an InstructorTask,
+    and store their rows as part `part_index` of its grade report.
 
-        group_configs_group_names = []
-        for partition in experiment_partitions:
-            group = LmsPartitionService(student, course_id).get_group(partition, assign=False)
-            group_configs_group_names.append(group.name if group else '')
+    If grading fails, an error part listing all the students of the chunk
+    is stored instead, so they are not silently missing from the report.
+    The subtask status is then recorded on the InstructorTask, and the
+    subtask that completes it assembles the parts into the final report.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
 
-        team_name = []
-        if teams_enabled:
-            try:
-                membership = CourseTeamMembership.objects.get(user=student, team__course_id=course_id)
-                team_name.append(membership.team.name)
-            except CourseTeamMembership.DoesNotExist:
-                team_name.append('')
+    entry = InstructorTask.objects.get(pk=entry_id)
+    course_id = entry.course_id
+    try:
+        course = get_course_by_id(course_id)
+        report_context = _grade_report_context(course)
+        students = User.objects.filter(id__in=student_ids).select_related('profile').order_by('id')
 
-        enrollment_mode = CourseEnrollment.enrollment_mode_for_user(student, course_id)[0]
-        verification_status = SoftwareSecurePhotoVerification.verification_status_for_user(
-            student,
+        rows = []
+        err_rows = []
+        grade_results = _with_student_report_data(
             course_id,
-            enrollment_mode
+            CourseGradeFactory().iter(course, students, trust_persisted=settings.GRADE_REPORT_TRUST_PERSISTED_GRADES),
+            report_context['experiment_partitions'],
         )
-        certificate_info = certificate_info_for_user(
-            student,
-            course_id,
-            course_grade.letter_grade,
-            student.id in whitelisted_user_ids
+        for student, course_grade, err_msg, report_data in grade_results:
+            if course_grade:
+                rows.append(_grade_report_row(report_context, report_data, student, course_grade))
+            else:
+                err_rows.append([student.id, student.username, err_msg])
+
+        # The grade report part is stored last, and even when empty: the
+        # assembly checks that every subtask stored a part.
+        report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+        if err_rows:
+            report_store.store_rows(
+                course_id, _grade_report_part_filename(entry_id, 'grade_report_err', part_index), err_rows,
+            )
+        report_store.store_rows(course_id, _grade_report_part_filename(entry_id, 'grade_report', part_index), rows)
+    except Exception:
+        TASK_LOG.exception(
+            u"Grade report subtask %s of instructor task %s: failed unexpectedly!", current_task_id, entry_id
         )
+        _store_failed_grade_report_part(course_id, entry_id, part_index, student_ids)
+        subtask_status.increment(failed=len(student_ids), state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status, complete_entry=False)
+        _assemble_grade_report_when_complete(entry_id)
+        raise
 
-        grade_results = []
-        for assignment_type, assignment_info in graded_assignments.iteritems():
-            for subsection_location in assignment_info['subsection_headers']:
-                try:
-                    subsection_grade = course_grade.graded_subsections_by_format[assignment_type][subsection_location]
-                except KeyError:
-                    grade_results.append([u'Not Available'])
-                else:
-                    if subsection_grade.graded_total.attempted:
-                        grade_results.append(
-                            [subsection_grade.graded_total.earned / subsection_grade.graded_total.possible]
-                        )
-                    else:
-                        grade_results.append([u'Not Attempted'])
-            if assignment_info['use_subsection_headers']:
-                assignment_average = course_grade.grade_value['grade_breakdown'].get(assignment_type, {}).get('percent')
-                grade_results.append([assignment_average])
+    subtask_status.increment(succeeded=len(rows), failed=len(err_rows), state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status, complete_entry=False)
+    _assemble_grade_report_when_complete(entry_id)
+    return subtask_status.to_dict()
+
+
+def _grade_report_part_filename(entry_id, csv_name, part_index):
+    """
+    Returns the ReportStore filename of part `part_index` of the
+    `csv_name` report of an InstructorTask.
+    """
+    return os.path.join(_grade_report_parts_dir(entry_id, csv_name), u'{:05d}.csv'.format(part_index))
 
-        grade_results = list(chain.from_iterable(grade_results))
 
-        rows.append(
-            [student.id, student.email, student.username, course_grade.percent] +
-            grade_results + cohorts_group_name + group_configs_group_names + team_name +
-            [enrollment_mode] + [verification_status] + certificate_info
+def _store_failed_grade_report_part(course_id, entry_id, part_index, student_ids):
+    """
+    Store an error part with a row for each of the students of a failed
+    grade report subtask. If that fails too, the part is missing and the
+    assembly fails the whole report.
+    """
+    try:
+        usernames = dict(User.objects.filter(id__in=student_ids).values_list('id', 'username'))
+        ReportStore.from_config('GRADES_DOWNLOAD').store_rows(
+            course_id,
+            _grade_report_part_filename(entry_id, 'grade_report_err', part_index),
+            [
+                [student_id, usernames.get(student_id, u''), GRADE_REPORT_SUBTASK_ERROR_MSG]
+                for student_id in student_ids
+            ],
+        )
+    except Exception:  # pylint: disable=broad-except
+        TASK_LOG.exception(
+            u"Grade report part %s of instructor task %s: could not store its error rows", part_index, entry_id
         )
 
-    TASK_LOG.info(
-        u'%s, Task type: %s, Current step: %s, Grade calculation completed for students: %s/%s',
-        task_info_string,
-        action_name,
-        current_step,
-        student_counter,
-        total_enrolled_students
-    )
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
-    current_step = {'step': 'Uploading CSVs'}
-    task_progress.update_task_state(extra_meta=current_step)
-    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
+class GradeReportPartsMissing(Exception):
+    """
+    Raised when subtasks of a grade report did not store their part.
+    """
+    pass
 
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
 
-    # If there are any error rows (don't count the header), write them out as well
-    if len(err_rows) > 1:
-        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
+def _assemble_grade_report_when_complete(entry_id):
+    """
+    Assemble the grade report of an InstructorTask once all its subtasks
+    completed. Only the first subtask to see it complete does it.
 
-    # One last update before we close out...
-    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
-    return task_progress.update_task_state(extra_meta=current_step)
+    The InstructorTask is only marked as SUCCESS once the report is
+    stored. It is marked as FAILURE if the assembly fails, or if a part is
+    missing, as the report would lack the students of that part.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_dict = json.loads(entry.subtasks)
+    if entry.task_state in READY_STATES or subtask_dict['succeeded'] + subtask_dict['failed'] < subtask_dict['total']:
+        return
+    lock_key = GRADE_REPORT_ASSEMBLY_LOCK_KEY.format(entry_id)
+    if not cache.add(lock_key, True, GRADE_REPORT_ASSEMBLY_LOCK_EXPIRE):
+        return
+
+    try:
+        # Another subtask may have assembled the report between the check
+        # above and taking the lock, and deleted its parts.
+        entry = InstructorTask.objects.get(pk=entry_id)
+        if entry.task_state in READY_STATES:
+            return
+        # The lock may expire during a long assembly, only one outcome is stored.
+        unfinished_entry = InstructorTask.objects.filter(pk=entry_id).exclude(task_state__in=READY_STATES)
+        try:
+            _assemble_grade_report(entry, subtask_dict['total'])
+        except Exception as exc:  # pylint: disable=broad-except
+            TASK_LOG.exception(u"Grade report of instructor task %s could not be assembled", entry_id)
+            unfinished_entry.update(
+                task_state=FAILURE,
+                task_output=InstructorTask.create_output_for_failure(exc, traceback.format_exc()),
+            )
+        else:
+            unfinished_entry.update(task_state=SUCCESS)
+            TASK_LOG.info(u"Grade report of instructor task %s assembled", entry_id)
+    finally:
+        cache.delete(lock_key)
+
+
+def _assemble_grade_report(entry, num_parts):
+    """
+    Concatenate the `num_parts` parts stored by the subtasks of an
+    InstructorTask into its grade report, and its error report if any.
+    """
+    course = get_course_by_id(entry.course_id)
+    report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+    timestamp = entry.created or datetime.now(UTC)
+    headers = OrderedDict([
+        ('grade_report', _grade_report_header(_grade_report_context(course))),
+        ('grade_report_err', GRADE_REPORT_ERROR_HEADER),
+    ])
+    part_filenames = OrderedDict(
+        (csv_name, report_store.list_parts(entry.course_id, _grade_report_parts_dir(entry.id, csv_name)))
+        for csv_name in headers
+    )
+    # Every subtask stores a grade report part, or an error part if it failed.
+    stored_parts = set(
+        os.path.basename(part_filename) for filenames in part_filenames.itervalues() for part_filename in filenames
+    )
+    if len(stored_parts) < num_parts:
+        raise GradeReportPartsMissing(
+            u"{} of the {} parts of the grade report are missing".format(num_parts - len(stored_parts), num_parts)
+        )
+
+    for csv_name, header in headers.iteritems():
+        if not part_filenames[csv_name] and csv_name == 'grade_report_err':
+            continue
+        report_store.concatenate(
+            entry.course_id,
+            _csv_report_filename(csv_name, entry.course_id, timestamp),
+            part_filenames[csv_name],
+            [header],
+        )
+        for part_filename in part_filenames[csv_name]:
+            report_store.delete(entry.course_id, part_filename)
+        tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
 
 
 def _graded_assignments(course_key):
@@ -943,24 +1227,22 @@ def upload_problem_responses_csv(_xmodule_instance_args, _entry_id, course_id, t
     current_step = {'step': 'Calculating students answers to problem'}
     task_progress.update_task_state(extra_meta=current_step)
 
-    # Compute result table and format it
+    # Write the responses to the report as they are read
     problem_location = task_input.get('problem_location')
-    student_data = list_problem_responses(course_id, problem_location)
+    csv_name = 'student_state_from_{}'.format(re.sub(r'[:/]', '_', problem_location))
     features = ['username', 'state']
-    header, rows = format_dictlist(student_data, features)
-
-    task_progress.attempted = task_progress.succeeded = len(rows)
-    task_progress.skipped = task_progress.total - task_progress.attempted
+    with open_csv_report(csv_name, course_id, start_date) as report_file:
+        report_file.append_rows([features])
+        for response in iter_problem_responses(course_id, problem_location):
+            report_file.append_rows([[response[feature] for feature in features]])
+            task_progress.attempted += 1
 
-    rows.insert(0, header)
+        task_progress.succeeded = task_progress.attempted
+        task_progress.skipped = task_progress.total - task_progress.attempted
 
-    current_step = {'step': 'Uploading CSV'}
-    task_progress.update_task_state(extra_meta=current_step)
-
-    # Perform the upload
-    problem_location = re.sub(r'[:/]', '_', problem_location)
-    csv_name = 'student_state_from_{}'.format(problem_location)
-    upload_csv_to_report_store(rows, csv_name, course_id, start_date)
+        current_step = {'step': 'Uploading CSV'}
+        task_progress.update_task_state(extra_meta=current_step)
+    tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
 
     return task_progress.update_task_state(extra_meta=current_step)
 
@@ -983,45 +1265,55 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
 
     graded_scorable_blocks = _graded_scorable_blocks_to_header(course_id)
 
-    # Just generate the static fields for now.
-    rows = [list(header_row.values()) + ['Grade'] + list(chain.from_iterable(graded_scorable_blocks.values()))]
+    # Just generate the static fields for now. The rows of the graded students
+    # are written to the report as they are graded.
+    header = list(header_row.values()) + ['Grade'] + list(chain.from_iterable(graded_scorable_blocks.values()))
     error_rows = [list(header_row.values()) + ['error_msg']]
     current_step = {'step': 'Calculating Grades'}
 
     course = get_course_by_id(course_id)
-    for student, course_grade, err_msg in CourseGradeFactory().iter(course, enrolled_students):
-        student_fields = [getattr(student, field_name) for field_name in header_row]
-        task_progress.attempted += 1
+    with open_csv_report('problem_grade_report', course_id, start_date) as report_file:
+        report_file.append_rows([header])
+        grade_results = CourseGradeFactory().iter(
+            course, enrolled_students, trust_persisted=settings.GRADE_REPORT_TRUST_PERSISTED_GRADES,
+        )
+        for student, course_grade, err_msg in grade_results:
+            student_fields = [getattr(student, field_name) for field_name in header_row]
+            task_progress.attempted += 1
 
-        if not course_grade:
-            # There was an error grading this student.
-            if not err_msg:
-                err_msg = u'Unknown error'
-            error_rows.append(student_fields + [err_msg])
-            task_progress.failed += 1
-            continue
+            if not course_grade:
+                # There was an error grading this student.
+                if not err_msg:
+                    err_msg = u'Unknown error'
+                error_rows.append(student_fields + [err_msg])
+                task_progress.failed += 1
+                continue
 
-        earned_possible_values = []
-        for block_location in graded_scorable_blocks:
-            try:
-                problem_score = course_grade.locations_to_scores[block_location]
-            except KeyError:
-                earned_possible_values.append([u'Not Available', u'Not Available'])
-            else:
-                if problem_score.attempted:
-                    earned_possible_values.append([problem_score.earned, problem_score.possible])
+            earned_possible_values = []
+            for block_location in graded_scorable_blocks:
+                try:
+                    problem_score = course_grade.locations_to_scores[block_location]
+                except KeyError:
+                    earned_possible_values.append([u'Not Available', u'Not Available'])
                 else:
-                    earned_possible_values.append([u'Not Attempted', problem_score.possible])
-
-        rows.append(student_fields + [course_grade.percent] + list(chain.from_iterable(earned_possible_values)))
+                    if problem_score.attempted:
+                        earned_possible_values.append([problem_score.earned, problem_score.possible])
+                    else:
+                        earned_possible_values.append([u'Not Attempted', problem_score.possible])
 
-        task_progress.succeeded += 1
-        if task_progress.attempted % status_interval == 0:
-            task_progress.update_task_state(extra_meta=current_step)
+            report_file.append_rows(
+                [student_fields + [course_grade.percent] + list(chain.from_iterable(earned_possible_values))]
+            )
 
-    # Perform the upload if any students have been successfully graded
-    if len(rows) > 1:
-        upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
+            task_progress.succeeded += 1
+            if task_progress.attempted % status_interval == 0:
+                task_progress.update_task_state(extra_meta=current_step)
+
+        # Only keep the report if any students have been successfully graded
+        if not task_progress.succeeded:
+            report_file.abort()
+    if task_progress.succeeded:
+        tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": 'problem_grade_report'})
     # If there are any error rows, write them out as well
     if len(error_rows) > 1:
         upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
@@ -1071,7 +1363,7 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
     start_time = time()
     start_date = datetime.now(UTC)
     status_interval = 100
-    students_in_course = CourseEnrollment.objects.enrolled_and_dropped_out_users(course_id)
+    students_in_course = CourseEnrollment.objects.enrolled_and_dropped_out_users(course_id).select_related('profile')
     task_progress = TaskProgress(action_name, students_in_course.count(), start_time)
 
     fmt = u'Task: {task_id}, InstructorTask ID: {entry_id}, Course: {course_id}, Input: {task_input}'
@@ -1083,8 +1375,7 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
     )
     TASK_LOG.info(u'%s, Task type: %s, Starting task execution', task_info_string, action_name)
 
-    # Loop over all our students and build our CSV lists in memory
-    rows = []
+    # Loop over all our students and write their rows to the report
     header = None
     current_step = {'step': 'Gathering Profile Information'}
     enrollment_report_provider = PaidCourseEnrollmentReportProvider()
@@ -1098,68 +1389,77 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
         total_students
     )
 
-    for student in students_in_course:
-        # Periodically update task status (this is a cache write)
-        if task_progress.attempted % status_interval == 0:
-            task_progress.update_task_state(extra_meta=current_step)
-        task_progress.attempted += 1
+    with open_csv_report('enrollment_report', course_id, start_date, config_name='FINANCIAL_REPORTS') as report_file:
+        for students in batches(students_in_course, ENROLLMENT_REPORT_BATCH_SIZE):
+            report_data = StudentReportData(course_id, [student.id for student in students])
+            for student in students:
+                # Periodically update task status (this is a cache write)
+                if task_progress.attempted % status_interval == 0:
+                    task_progress.update_task_state(extra_meta=current_step)
+                task_progress.attempted += 1
+
+                # Now add a log entry after certain intervals to get a hint that task is in progress
+                student_counter += 1
+                if student_counter % 100 == 0:
+                    TASK_LOG.info(
+                        u'%s, Task type: %s, Current step: %s, '
+                        u'gathering enrollment profile for students in progress: %s/%s',
+                        task_info_string,
+                        action_name,
+                        current_step,
+                        student_counter,
+                        total_students
+                    )
 
-        # Now add a log entry after certain intervals to get a hint that task is in progress
-        student_counter += 1
-        if student_counter % 100 == 0:
-            TASK_LOG.info(
-                u'%s, Task type: %s, Current step: %s, gathering enrollment profile for students in progress: %s/%s',
-                task_info_string,
-                action_name,
-                current_step,
-                student_counter,
-                total_students
-            )
+                course_enrollment = report_data.enrollment(student.id)
+                user_data = enrollment_report_provider.get_user_profile(student.id, user=student)
+                course_enrollment_data = enrollment_report_provider.get_enrollment_info(
+                    student, course_id, course_enrollment=course_enrollment
+                )
+                payment_data = enrollment_report_provider.get_payment_info(
+                    student, course_id, course_enrollment=course_enrollment
+                )
 
-        user_data = enrollment_report_provider.get_user_profile(student.id)
-        course_enrollment_data = enrollment_report_provider.get_enrollment_info(student, course_id)
-        payment_data = enrollment_report_provider.get_payment_info(student, course_id)
-
-        # display name map for the column headers
-        enrollment_report_headers = {
-            'User ID': _('User ID'),
-            'Username': _('Username'),
-            'Full Name': _('Full Name'),
-            'First Name': _('First Name'),
-            'Last Name': _('Last Name'),
-            'Company Name': _('Company Name'),
-            'Title': _('Title'),
-            'Language': _('Language'),
-            'Year of Birth': _('Year of Birth'),
-            'Gender': _('Gender'),
-            'Level of Education': _('Level of Education'),
-            'Mailing Address': _('Mailing Address'),
-            'Goals': _('Goals'),
-            'City': _('City'),
-            'Country': _('Country'),
-            'Enrollment Date': _('Enrollment Date'),
-            'Currently Enrolled': _('Currently Enrolled'),
-            'Enrollment Source': _('Enrollment Source'),
-            'Manual (Un)Enrollment Reason': _('Manual (Un)Enrollment Reason'),
-            'Enrollment Role': _('Enrollment Role'),
-            'List Price': _('List Price'),
-            'Payment Amount': _('Payment Amount'),
-            'Coupon Codes Used': _('Coupon Codes Used'),
-            'Registration Code Used': _('Registration Code Used'),
-            'Payment Status': _('Payment Status'),
-            'Transaction Reference Number': _('Transaction Reference Number')
-        }
+                # display name map for the column headers
+                enrollment_report_headers = {
+                    'User ID': _('User ID'),
+                    'Username': _('Username'),
+                    'Full Name': _('Full Name'),
+                    'First Name': _('First Name'),
+                    'Last Name': _('Last Name'),
+                    'Company Name': _('Company Name'),
+                    'Title': _('Title'),
+                    'Language': _('Language'),
+                    'Year of Birth': _('Year of Birth'),
+                    'Gender': _('Gender'),
+                    'Level of Education': _('Level of Education'),
+                    'Mailing Address': _('Mailing Address'),
+                    'Goals': _('Goals'),
+                    'City': _('City'),
+                    'Country': _('Country'),
+                    'Enrollment Date': _('Enrollment Date'),
+                    'Currently Enrolled': _('Currently Enrolled'),
+                    'Enrollment Source': _('Enrollment Source'),
+                    'Manual (Un)Enrollment Reason': _('Manual (Un)Enrollment Reason'),
+                    'Enrollment Role': _('Enrollment Role'),
+                    'List Price': _('List Price'),
+                    'Payment Amount': _('Payment Amount'),
+                    'Coupon Codes Used': _('Coupon Codes Used'),
+                    'Registration Code Used': _('Registration Code Used'),
+                    'Payment Status': _('Payment Status'),
+                    'Transaction Reference Number': _('Transaction Reference Number')
+                }
 
-        if not header:
-            header = user_data.keys() + course_enrollment_data.keys() + payment_data.keys()
-            display_headers = []
-            for header_element in header:
-                # translate header into a localizable display string
-                display_headers.append(enrollment_report_headers.get(header_element, header_element))
-            rows.append(display_headers)
+                if not header:
+                    header = user_data.keys() + course_enrollment_data.keys() + payment_data.keys()
+                    display_headers = []
+                    for header_element in header:
+                        # translate header into a localizable display string
+                        display_headers.append(enrollment_report_headers.get(header_element, header_element))
+                    report_file.append_rows([display_headers])
 
-        rows.append(user_data.values() + course_enrollment_data.values() + payment_data.values())
-        task_progress.succeeded += 1
+                report_file.append_rows([user_data.values() + course_enrollment_data.values() + payment_data.values()])
+                task_progress.succeeded += 1
 
     TASK_LOG.info(
         u'%s, Task type: %s, Current step: %s, Detailed enrollment report generated for students: %s/%s',
@@ -1170,13 +1470,11 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
         total_students
     )
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
+    # By this point, the rows were written and the report uploaded when closed.
     current_step = {'step': 'Uploading CSVs'}
     task_progress.update_task_state(extra_meta=current_step)
     TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
-
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'enrollment_report', course_id, start_date, config_name='FINANCIAL_REPORTS')
+    tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": 'enrollment_report'})
 
     # One last update before we close out...
     TASK_LOG.info(u'%s, Task type: %s, Finalizing detailed enrollment task', task_info_string, action_name)
@@ -1706,7 +2004,6 @@ def upload_ora2_data(
 
     try:
         header, datarows = OraAggregateData.collect_ora2_data(course_id)
-        rows = [header] + [row for row in datarows]
     # Update progress to failed regardless of error type
     except Exception:  # pylint: disable=broad-except
         TASK_LOG.exception('Failed to get ORA data.')
@@ -1727,7 +2024,10 @@ def upload_ora2_data(
     )
     task_progress.update_task_state(extra_meta=curr_step)
 
-    upload_csv_to_report_store(rows, 'ORA_data', course_id, start_date)
+    with open_csv_report('ORA_data', course_id, start_date) as report_file:
+        report_file.append_rows([header])
+        report_file.append_rows(datarows)
+    tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": 'ORA_data'})
 
     curr_step = {'step': 'Finalizing ORA data report'}
     task_progress.update_task_state(extra_meta=curr_step)
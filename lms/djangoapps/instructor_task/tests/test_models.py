@@ -3,6 +3,7 @@ Tests for instructor_task/models.py.
 """
 import copy
 from cStringIO import StringIO
+from gzip import GzipFile
 import time
 
 import boto
@@ -49,6 +50,74 @@ class ReportStoreTestMixin(object):
             ['new_file', 'middle_file', 'old_file']
         )
 
+    def test_concatenate_parts(self):
+        """
+        Test that ReportStore.concatenate() stores the header rows followed
+        by the parts listed by ReportStore.list_parts(), which are not
+        listed by ReportStore.links_for().
+        """
+        report_store = self.create_report_store()
+        report_store.store_rows(self.course_id, 'parts/00002.csv', [['c', '3']])
+        report_store.store_rows(self.course_id, 'parts/00001.csv', [['a', '1'], ['b', '2']])
+        self.assertEqual(report_store.links_for(self.course_id), [])
+
+        part_filenames = report_store.list_parts(self.course_id, 'parts')
+        self.assertEqual(part_filenames, ['parts/00001.csv', 'parts/00002.csv'])
+        report_store.concatenate(self.course_id, 'report.csv', part_filenames, [['name', 'value']])
+        for part_filename in part_filenames:
+            report_store.delete(self.course_id, part_filename)
+
+        self.assertEqual([link[0] for link in report_store.links_for(self.course_id)], ['report.csv'])
+        self.assertEqual(report_store.list_parts(self.course_id, 'parts'), [])
+        with report_store.storage.open(report_store.path_to(self.course_id, 'report.csv')) as report_file:
+            self.assertEqual(report_file.read(), 'name,value\r\na,1\r\nb,2\r\nc,3\r\n')
+
+    @override_settings(REPORT_STORE_MAX_BUFFER_SIZE=4)
+    def test_open_writes_rows(self):
+        """
+        Test that the rows appended to the ReportFile returned by
+        ReportStore.open() are only visible once it is closed.
+        """
+        report_store = self.create_report_store()
+        with report_store.open(self.course_id, 'report.csv') as report_file:
+            report_file.append_rows([['name', 'value']])
+            report_file.append_rows([['a', '1'], ['b', '2']])
+            self.assertEqual(report_store.links_for(self.course_id), [])
+
+        self.assertEqual([link[0] for link in report_store.links_for(self.course_id)], ['report.csv'])
+        with report_store.storage.open(report_store.path_to(self.course_id, 'report.csv')) as report_file:
+            self.assertEqual(report_file.read(), 'name,value\r\na,1\r\nb,2\r\n')
+
+    def test_open_discards_report_on_error(self):
+        """
+        Test that a report interrupted by an error is not stored.
+        """
+        report_store = self.create_report_store()
+        with self.assertRaises(ValueError):
+            with report_store.open(self.course_id, 'report.csv') as report_file:
+                report_file.append_rows([['name', 'value']])
+                raise ValueError
+        self.assertEqual(report_store.links_for(self.course_id), [])
+
+    @override_settings(REPORT_STORE_MAX_BUFFER_SIZE=4)
+    def test_gzipped_report(self):
+        """
+        Test that the reports of a gzipping store, including the ones
+        concatenated from parts, are gzipped.
+        """
+        report_store = self.create_report_store()
+        report_store.gzip = True
+        report_store.store_rows(self.course_id, 'parts/00001.csv', [['a', '1'], ['b', '2']])
+        report_store.store_rows(self.course_id, 'parts/00002.csv', [['c', '3']])
+        report_store.concatenate(
+            self.course_id, 'report.csv', report_store.list_parts(self.course_id, 'parts'), [['name', 'value']]
+        )
+
+        self.assertEqual([link[0] for link in report_store.links_for(self.course_id)], ['report.csv.gz'])
+        with report_store.storage.open(report_store.path_to(self.course_id, 'report.csv.gz')) as report_file:
+            content = GzipFile(fileobj=StringIO(report_file.read()), mode='rb').read()
+        self.assertEqual(content, 'name,value\r\na,1\r\nb,2\r\nc,3\r\n')
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
@@ -0,0 +1,74 @@
+"""
+Tests for instructor_task/report_data.py.
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from certificates.models import CertificateStatuses
+from certificates.tests.factories import CertificateWhitelistFactory, GeneratedCertificateFactory
+from lms.djangoapps.instructor_task.report_data import StudentReportData
+from lms.djangoapps.verify_student.tests.factories import SoftwareSecurePhotoVerificationFactory
+from opaque_keys.edx.locator import CourseLocator
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
+import openedx.core.djangoapps.user_api.course_tag.api as course_tag_api
+from openedx.core.djangoapps.user_api.partition_schemes import RandomUserPartitionScheme
+from student.tests.factories import CourseEnrollmentFactory, UserFactory
+from teams.tests.factories import CourseTeamFactory, CourseTeamMembershipFactory
+from xmodule.partitions.partitions import Group, UserPartition
+
+
+class StudentReportDataTest(TestCase):
+    """
+    Tests for the per-student report values read in bulk by StudentReportData.
+    """
+    def setUp(self):
+        super(StudentReportDataTest, self).setUp()
+        self.course_id = CourseLocator(org="testx", course="coursex", run="runx")
+        self.partition = UserPartition(
+            0, 'Experiment', 'An experiment', [Group(0, 'Group A'), Group(1, 'Group B')], scheme_id='random'
+        )
+
+        self.verified_user, self.honor_user, self.unenrolled_user = [UserFactory() for __ in range(3)]
+        CourseEnrollmentFactory(user=self.verified_user, course_id=self.course_id, mode='verified')
+        CourseEnrollmentFactory(user=self.honor_user, course_id=self.course_id, mode='honor')
+
+        CohortFactory(course_id=self.course_id, name='Cohort A', users=[self.verified_user])
+        team = CourseTeamFactory(course_id=self.course_id, name='Team A')
+        CourseTeamMembershipFactory(team=team, user=self.honor_user)
+        course_tag_api.set_course_tag(
+            self.honor_user, self.course_id, RandomUserPartitionScheme.key_for_partition(self.partition), 1
+        )
+
+        SoftwareSecurePhotoVerificationFactory(user=self.verified_user, status='approved')
+        GeneratedCertificateFactory(
+            user=self.verified_user,
+            course_id=self.course_id,
+            status=CertificateStatuses.downloadable,
+            mode='verified',
+        )
+        CertificateWhitelistFactory(user=self.honor_user, course_id=self.course_id, whitelist=True)
+
+    def test_report_values(self):
+        users = list(User.objects.select_related('profile').order_by('id').filter(
+            id__in=[self.verified_user.id, self.honor_user.id, self.unenrolled_user.id]
+        ))
+        verified_user, honor_user, unenrolled_user = users
+        report_data = StudentReportData(self.course_id, [user.id for user in users], [self.partition])
+
+        # One query for each of cohorts, experiment groups, teams, enrollments,
+        # verifications, whitelist and certificates, whatever the number of students.
+        with self.assertNumQueries(7):
+            self.assertEqual(report_data.cohort_name(verified_user.id), 'Cohort A')
+            self.assertEqual(report_data.cohort_name(honor_user.id), '')
+            self.assertEqual(report_data.experiment_group_name(verified_user.id, self.partition), '')
+            self.assertEqual(report_data.experiment_group_name(honor_user.id, self.partition), 'Group B')
+            self.assertEqual(report_data.team_name(verified_user.id), '')
+            self.assertEqual(report_data.team_name(honor_user.id), 'Team A')
+            self.assertEqual(report_data.enrollment_mode(verified_user.id), 'verified')
+            self.assertEqual(report_data.enrollment_mode(honor_user.id), 'honor')
+            self.assertIsNone(report_data.enrollment_mode(unenrolled_user.id))
+            self.assertEqual(report_data.verification_status(verified_user), 'ID Verified')
+            self.assertEqual(report_data.verification_status(honor_user), 'N/A')
+            self.assertEqual(report_data.certificate_info(verified_user, 'Pass'), ['Y', 'Y', 'verified'])
+            self.assertEqual(report_data.certificate_info(honor_user, None), ['Y', 'N', 'N/A'])
+            self.assertEqual(report_data.certificate_info(unenrolled_user, None), ['N', 'N', 'N/A'])
@@ -8,6 +8,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 from datetime import datetime
@@ -19,6 +20,8 @@ from mock import Mock, patch, MagicMock
 from nose.plugins.attrib import attr
 import tempfile
 import unicodecsv
+from celery.states import FAILURE, SUCCESS
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
 
@@ -48,8 +51,10 @@ from student.models import CourseEnrollment, CourseEnrollmentAllowed, ManualEnro
 from lms.djangoapps.verify_student.tests.factories import SoftwareSecurePhotoVerificationFactory
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.partitions.partitions import Group, UserPartition
-from lms.djangoapps.instructor_task.models import ReportStore
+from lms.djangoapps.instructor_task.models import InstructorTask, PROGRESS, ReportStore
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from survey.models import SurveyForm, SurveyAnswer
+from lms.djangoapps.instructor_task import tasks_helper
 from lms.djangoapps.instructor_task.tasks_helper import (
     cohort_students_and_upload,
     upload_problem_responses_csv,
@@ -130,6 +135,119 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
         self.assertTrue(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
 
+    @override_settings(GRADE_REPORT_SUBTASK_THRESHOLD=1, GRADE_REPORT_STUDENTS_PER_TASK=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper._get_current_task')
+    def test_grading_in_subtasks(self, _mock_current_task):
+        """
+        Test that the grade report of a course above the subtask threshold
+        is assembled from the parts graded by its subtasks.
+        """
+        students = [self.create_student(u'student{}'.format(index)) for index in range(5)]
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_type='grade_course')
+        upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5}, json.loads(entry.task_output)
+        )
+        self.assertEqual(json.loads(entry.subtasks)['succeeded'], 3)
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+        self.verify_rows_in_csv(
+            [{'Username': student.username, 'Grade': '0.0'} for student in students],
+            ignore_other_columns=True,
+        )
+
+    def _read_report_rows(self, csv_name):
+        """
+        Returns the rows of the `csv_name` report of the course.
+        """
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        filenames = [link[0] for link in report_store.links_for(self.course.id) if link[0].startswith(csv_name + '_')]
+        self.assertEqual(len(filenames), 1)
+        with report_store.storage.open(report_store.path_to(self.course.id, filenames[0])) as csv_file:
+            return list(unicodecsv.DictReader(csv_file))
+
+    @override_settings(GRADE_REPORT_SUBTASK_THRESHOLD=1, GRADE_REPORT_STUDENTS_PER_TASK=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper._get_current_task')
+    def test_failed_subtask_students_are_reported(self, _mock_current_task):
+        """
+        Test that the students of a failed grade report subtask are listed
+        in the error report instead of missing from the report.
+        """
+        students = [self.create_student(u'student{}'.format(index)) for index in range(5)]
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_type='grade_course')
+        grade_report_row = tasks_helper._grade_report_row
+
+        def _failing_grade_report_row(report_context, report_data, student, course_grade):
+            """Fails the subtask of the third student."""
+            if student == students[2]:
+                raise Exception('Failed')
+            return grade_report_row(report_context, report_data, student, course_grade)
+
+        with patch(
+            'lms.djangoapps.instructor_task.tasks_helper._grade_report_row', side_effect=_failing_grade_report_row
+        ):
+            upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 3, 'failed': 2}, json.loads(entry.task_output))
+        self.assertEqual(
+            [row['Username'] for row in self._read_report_rows('grade_report')],
+            [students[index].username for index in (0, 1, 4)],
+        )
+        self.assertEqual(
+            [row['username'] for row in self._read_report_rows('grade_report_err')],
+            [students[index].username for index in (2, 3)],
+        )
+
+    @override_settings(GRADE_REPORT_SUBTASK_THRESHOLD=1, GRADE_REPORT_STUDENTS_PER_TASK=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper._get_current_task')
+    @patch('lms.djangoapps.instructor_task.tasks_helper._store_failed_grade_report_part')
+    @patch('lms.djangoapps.instructor_task.tasks_helper._grade_report_row', side_effect=Exception('Failed'))
+    def test_missing_part_fails_report(self, _mock_grade_report_row, _mock_store_failed_part, _mock_current_task):
+        """
+        Test that a grade report missing the part of a subtask is not
+        assembled, and that its task is marked as failed.
+        """
+        for index in range(3):
+            self.create_student(u'student{}'.format(index))
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_type='grade_course')
+        upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(json.loads(entry.task_output)['exception'], 'GradeReportPartsMissing')
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(report_store.links_for(self.course.id), [])
+        # The assembly lock is released.
+        self.assertIsNone(cache.get(tasks_helper.GRADE_REPORT_ASSEMBLY_LOCK_KEY.format(entry.id)))
+
+    @override_settings(GRADE_REPORT_SUBTASK_THRESHOLD=1, GRADE_REPORT_STUDENTS_PER_TASK=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper._get_current_task')
+    def test_late_subtask_keeps_assembled_report(self, _mock_current_task):
+        """
+        Test that a subtask which saw the report complete before another one
+        assembled it does not assemble it again once it gets the lock.
+        """
+        for index in range(3):
+            self.create_student(u'student{}'.format(index))
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_type='grade_course')
+        upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+
+        stale_entry = InstructorTask.objects.get(pk=entry.id)
+        stale_entry.task_state = PROGRESS
+        with patch.object(InstructorTask.objects, 'get', side_effect=[stale_entry, entry]):
+            tasks_helper._assemble_grade_report_when_complete(entry.id)  # pylint: disable=protected-access
+
+        self.assertEqual(InstructorTask.objects.get(pk=entry.id).task_state, SUCCESS)
+        self.assertIsNone(cache.get(tasks_helper.GRADE_REPORT_ASSEMBLY_LOCK_KEY.format(entry.id)))
+
     def test_cohort_data_in_grading(self):
         """
         Test that cohort data is included in grades csv if cohort configuration is enabled for course.
@@ -361,7 +479,7 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskCourseTestCase):
     def test_success(self):
         task_input = {'problem_location': ''}
         with patch('lms.djangoapps.instructor_task.tasks_helper._get_current_task'):
-            with patch('lms.djangoapps.instructor_task.tasks_helper.list_problem_responses') as patched_data_source:
+            with patch('lms.djangoapps.instructor_task.tasks_helper.iter_problem_responses') as patched_data_source:
                 patched_data_source.return_value = [
                     {'username': 'user0', 'state': u'state0'},
                     {'username': 'user1', 'state': u'state1'},
@@ -2335,15 +2453,14 @@ class TestInstructorOra2Report(SharedModuleStoreTestCase):
             ) as mock_collect_data:
                 mock_collect_data.return_value = (test_header, test_rows)
 
-                with patch(
-                    'lms.djangoapps.instructor_task.models.DjangoStorageReportStore.store_rows'
-                ) as mock_store_rows:
-                    return_val = upload_ora2_data(None, None, self.course.id, None, 'generated')
+                return_val = upload_ora2_data(None, None, self.course.id, None, 'generated')
 
-                    # pylint: disable=maybe-no-member
-                    timestamp_str = datetime.now(UTC).strftime('%Y-%m-%d-%H%M')
-                    course_id_string = urllib.quote(self.course.id.to_deprecated_string().replace('/', '_'))
-                    filename = u'{}_ORA_data_{}.csv'.format(course_id_string, timestamp_str)
+                # pylint: disable=maybe-no-member
+                timestamp_str = datetime.now(UTC).strftime('%Y-%m-%d-%H%M')
+                course_id_string = urllib.quote(self.course.id.to_deprecated_string().replace('/', '_'))
+                filename = u'{}_ORA_data_{}.csv'.format(course_id_string, timestamp_str)
 
-                    self.assertEqual(return_val, UPDATE_STATUS_SUCCEEDED)
-                    mock_store_rows.assert_called_once_with(self.course.id, filename, [test_header] + test_rows)
+                self.assertEqual(return_val, UPDATE_STATUS_SUCCEEDED)
+                report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+                with report_store.storage.open(report_store.path_to(self.course.id, filename)) as csv_file:
+                    self.assertEqual(list(unicodecsv.reader(csv_file)), [test_header] + test_rows)
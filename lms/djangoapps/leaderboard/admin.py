@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import LeaderBoard
+from .models import LeaderBoard, LeaderBoardRank
 
 
 @admin.register(LeaderBoard)
@@ -10,3 +10,10 @@ class LeaderBoardAdmin(admin.ModelAdmin):
     class Meta:
         verbose_name = "Leaderboard"
         verbose_name_plural = "Leaderboard"
+
+
+@admin.register(LeaderBoardRank)
+class LeaderBoardRankAdmin(admin.ModelAdmin):
+    list_display = ['scope', 'student', 'points']
+    search_fields = ['scope', 'student__username']
+    raw_id_fields = ['student']
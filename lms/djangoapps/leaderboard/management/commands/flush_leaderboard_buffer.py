@@ -0,0 +1,37 @@
+"""
+Management command to drain the leaderboard write buffer.
+"""
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand
+
+from leaderboard import write_buffer
+
+
+class Command(BaseCommand):
+    """
+    Write every buffered leaderboard update to the database.
+
+    Use --stats to only print the buffered, coalesced and written counters.
+
+    Example:
+
+        ./manage.py lms flush_leaderboard_buffer --settings=aws
+    """
+    help = dedent(__doc__)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            default=False,
+            help='Print buffer counters without flushing.'
+        )
+
+    def handle(self, *args, **options):
+        if not options['stats']:
+            written = write_buffer.flush()
+            self.stdout.write(u'Flushed {} leaderboard rows.'.format(written))
+
+        for name, value in sorted(write_buffer.get_counters().items()):
+            self.stdout.write(u'{}: {}'.format(name, value))
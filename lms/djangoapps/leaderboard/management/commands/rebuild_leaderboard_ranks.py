@@ -0,0 +1,65 @@
+"""
+Management command to rebuild the leaderboard rank index from LeaderBoard rows.
+"""
+from collections import defaultdict
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from leaderboard.models import LeaderBoard, LeaderBoardRank
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the global, per-course and per-org leaderboard rank index.
+
+    Only needed once after installing the index, or to repair it; regular
+    updates are applied incrementally when course grades change.
+
+    Example:
+
+        ./manage.py lms rebuild_leaderboard_ranks --settings=aws
+    """
+    help = dedent(__doc__)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rank rows inserted per query.'
+        )
+
+    def handle(self, *args, **options):
+        course_points = defaultdict(float)
+        org_of_course = {}
+        rows = LeaderBoard.objects.exclude(points__isnull=True).values_list('student_id', 'course_id', 'points')
+        for student_id, course_id, points in rows.iterator():
+            course_points[(student_id, course_id)] += points
+            if course_id not in org_of_course:
+                try:
+                    org_of_course[course_id] = CourseKey.from_string(course_id).org
+                except InvalidKeyError:
+                    org_of_course[course_id] = None
+
+        scope_points = defaultdict(float)
+        for (student_id, course_id), points in course_points.iteritems():
+            scope_points[(LeaderBoardRank.course_scope(course_id), student_id)] = points
+            scope_points[(LeaderBoardRank.GLOBAL_SCOPE, student_id)] += points
+            if org_of_course[course_id]:
+                scope_points[(LeaderBoardRank.org_scope(org_of_course[course_id]), student_id)] += points
+
+        with transaction.atomic():
+            LeaderBoardRank.objects.all().delete()
+            LeaderBoardRank.objects.bulk_create(
+                [
+                    LeaderBoardRank(scope=scope, student_id=student_id, points=points)
+                    for (scope, student_id), points in scope_points.iteritems()
+                ],
+                batch_size=options['batch_size']
+            )
+
+        self.stdout.write(u'Rebuilt {} leaderboard rank rows.'.format(len(scope_points)))
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+from django.conf import settings
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('leaderboard', '0002_auto_20170714_0730'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderBoardRank',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, verbose_name='created', editable=False)),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, verbose_name='modified', editable=False)),
+                ('scope', models.CharField(max_length=255)),
+                ('points', models.FloatField(default=0.0)),
+                ('student', models.ForeignKey(to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Rank',
+                'verbose_name_plural': 'Leaderboard Ranks',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='leaderboardrank',
+            unique_together=set([('scope', 'student')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='leaderboardrank',
+            index_together=set([('scope', 'points')]),
+        ),
+    ]
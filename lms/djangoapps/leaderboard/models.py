@@ -1,4 +1,7 @@
-from django.db import models
+from collections import defaultdict
+
+from django.db import models, transaction, IntegrityError
+from django.db.models import Case, F, FloatField, Value, When
 from django.contrib.auth.models import User
 from model_utils.models import TimeStampedModel
 
@@ -20,3 +23,164 @@ class LeaderBoard(TimeStampedModel):
 
     def __repr__(self):
         return self.__unicode__()
+
+
+class LeaderBoardRank(TimeStampedModel):
+    """
+    Ordered score index per scope, kept up to date from LeaderBoard writes.
+
+    A scope is either the global board, a single course or an organization.
+    Rows are indexed on (scope, points) so top-N and rank reads are index
+    range scans and every update touches a constant number of rows.
+    """
+    GLOBAL_SCOPE = u'global'
+
+    scope = models.CharField(max_length=255)
+    student = models.ForeignKey(User)
+    points = models.FloatField(default=0.0)
+
+    class Meta:
+        app_label = "leaderboard"
+        verbose_name = 'Leaderboard Rank'
+        verbose_name_plural = 'Leaderboard Ranks'
+        unique_together = (('scope', 'student'),)
+        index_together = (('scope', 'points'),)
+
+    def __unicode__(self):
+        return u'{scope}: {username}'.format(scope=self.scope, username=self.student.username)
+
+    def __repr__(self):
+        return self.__unicode__()
+
+    @classmethod
+    def course_scope(cls, course_id):
+        return u'course:{}'.format(course_id)
+
+    @classmethod
+    def org_scope(cls, org):
+        return u'org:{}'.format(org)
+
+    @classmethod
+    def update_course_points(cls, student_id, course_key, old_points, new_points):
+        """
+        Apply a change of a student's course points to every scope it feeds.
+
+        The course scope holds the course points, the global and org scopes
+        hold the sum over courses so they only receive the delta.
+        """
+        old_points = old_points or 0.0
+        new_points = new_points or 0.0
+        cls._set_points(cls.course_scope(course_key), student_id, new_points)
+        delta = new_points - old_points
+        if delta:
+            cls._add_points(cls.GLOBAL_SCOPE, student_id, delta)
+            cls._add_points(cls.org_scope(course_key.org), student_id, delta)
+
+    @classmethod
+    def bulk_update_course_points(cls, changes):
+        """
+        Apply `changes`, (student_id, course_key, old_points, new_points)
+        tuples of distinct (student, course) pairs, as update_course_points
+        does, with a bulk update and a bulk insert per kind of scope.
+        """
+        course_points = {}
+        deltas = defaultdict(float)
+        for student_id, course_key, old_points, new_points in changes:
+            old_points = old_points or 0.0
+            new_points = new_points or 0.0
+            course_points[(cls.course_scope(course_key), student_id)] = new_points
+            delta = new_points - old_points
+            if delta:
+                deltas[(cls.GLOBAL_SCOPE, student_id)] += delta
+                deltas[(cls.org_scope(course_key.org), student_id)] += delta
+        cls._bulk_upsert(course_points, increment=False)
+        cls._bulk_upsert(deltas, increment=True)
+
+    @classmethod
+    def _bulk_upsert(cls, points, increment):
+        """
+        Set the points of the rows of `points`, a dict of
+        {(scope, student_id): points}, or add to them when `increment`.
+        Missing rows are created; if some are created concurrently, they
+        fall back to _upsert.
+        """
+        if not points:
+            return
+        existing = {}
+        rows = cls.objects.filter(
+            scope__in=set(scope for scope, _ in points),
+            student_id__in=set(student_id for _, student_id in points)
+        ).values_list('id', 'scope', 'student_id')
+        for row_id, scope, student_id in rows:
+            if (scope, student_id) in points:
+                existing[(scope, student_id)] = row_id
+
+        if existing:
+            new_points = Case(
+                *[When(pk=row_id, then=Value(points[key])) for key, row_id in existing.iteritems()],
+                output_field=FloatField()
+            )
+            cls.objects.filter(pk__in=existing.values()).update(
+                points=F('points') + new_points if increment else new_points
+            )
+
+        missing = [key for key in points if key not in existing]
+        if not missing:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.bulk_create([
+                    cls(scope=scope, student_id=student_id, points=points[(scope, student_id)])
+                    for scope, student_id in missing
+                ])
+        except IntegrityError:
+            for scope, student_id in missing:
+                value = points[(scope, student_id)]
+                cls._upsert(scope, student_id, F('points') + value if increment else value, value)
+
+    @classmethod
+    def _set_points(cls, scope, student_id, points):
+        cls._upsert(scope, student_id, points, points)
+
+    @classmethod
+    def _add_points(cls, scope, student_id, delta):
+        cls._upsert(scope, student_id, F('points') + delta, delta)
+
+    @classmethod
+    def _upsert(cls, scope, student_id, points, initial_points):
+        """
+        Update the points of a row to `points`, creating it with
+        `initial_points` if missing. A concurrent create of the same row
+        fails in its own savepoint and is retried as an update.
+        """
+        rows = cls.objects.filter(scope=scope, student_id=student_id)
+        if rows.update(points=points):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(scope=scope, student_id=student_id, points=initial_points)
+        except IntegrityError:
+            rows.update(points=points)
+
+    @classmethod
+    def top(cls, scope, limit=10):
+        """
+        Return the `limit` best ranked rows of a scope, highest points first.
+        """
+        return cls.objects.filter(
+            scope=scope,
+            points__gt=0
+        ).select_related('student').order_by('-points')[:limit]
+
+    @classmethod
+    def rank_of(cls, scope, user):
+        """
+        Return the 1-based rank of a user in a scope, or None if unranked.
+        """
+        try:
+            points = cls.objects.values_list('points', flat=True).get(scope=scope, student=user)
+        except cls.DoesNotExist:
+            return None
+        if points <= 0:
+            return None
+        return cls.objects.filter(scope=scope, points__gt=points).count() + 1
@@ -1,7 +1,10 @@
+from django.db import transaction
 from django.dispatch import receiver
 from lms.djangoapps.grades.signals.signals import COURSE_GRADE_CHANGED
 
-from leaderboard.models import LeaderBoard
+from leaderboard import write_buffer
+from leaderboard.models import LeaderBoard, LeaderBoardRank
+from leaderboard.signals.signals import LEADERBOARD_UPDATED
 
 
 @receiver(COURSE_GRADE_CHANGED)
@@ -11,11 +14,25 @@ def update_leaderboard(**kwargs):
     grade = kwargs.get("grade")
     points = grade.percent * 100
     passing_grade = course.lowest_passing_grade * 100
+    has_passed = True if points >= passing_grade else False
 
-    leaderboard, _created = LeaderBoard.objects.get_or_create(
-        student=user,
-        course_id=course.id
-    )
-    leaderboard.points = points
-    leaderboard.has_passed = True if points >= passing_grade else False
-    leaderboard.save()
+    if write_buffer.is_enabled():
+        write_buffer.enqueue(user.id, course.id, points, has_passed)
+        return
+
+    with transaction.atomic():
+        # Concurrent grade changes of the learner in the course wait for the
+        # row lock, so each one applies its delta to the ranks exactly once.
+        leaderboard, created = LeaderBoard.objects.select_for_update().get_or_create(
+            student=user,
+            course_id=course.id
+        )
+        old_points = leaderboard.points
+        passed_changed = leaderboard.has_passed != has_passed
+        if not created and old_points == points and not passed_changed:
+            return
+        leaderboard.points = points
+        leaderboard.has_passed = has_passed
+        leaderboard.save()
+        LeaderBoardRank.update_course_points(user.id, course.id, old_points, points)
+    LEADERBOARD_UPDATED.send(sender=None, course_ids=[unicode(course.id)], passed_changed=passed_changed)
@@ -0,0 +1,14 @@
+"""
+Leaderboard related signals.
+"""
+from django.dispatch import Signal
+
+
+# Signal that indicates that LeaderBoard rows of one or more courses were
+# written, either directly or by a flush of the write buffer.
+LEADERBOARD_UPDATED = Signal(
+    providing_args=[
+        'course_ids',  # list of course id strings
+        'passed_changed',  # whether the has_passed flag of a learner changed
+    ]
+)
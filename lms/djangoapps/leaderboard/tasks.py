@@ -0,0 +1,20 @@
+"""
+Asynchronous tasks for the leaderboard.
+"""
+from logging import getLogger
+
+from celery.task import task  # pylint: disable=import-error,no-name-in-module
+from django.conf import settings
+
+from . import write_buffer
+
+log = getLogger(__name__)
+
+
+@task(routing_key=settings.RECALCULATE_GRADES_ROUTING_KEY)
+def flush_leaderboard_buffer():
+    """
+    Write buffered leaderboard updates to the database.
+    """
+    written = write_buffer.flush()
+    log.info(u'Leaderboard: flushed %d buffered rows.', written)
@@ -0,0 +1,44 @@
+"""
+Tests for the leaderboard grade change handler.
+"""
+from django.test import TestCase
+from mock import Mock, patch
+
+from opaque_keys.edx.locator import CourseLocator
+from student.tests.factories import UserFactory
+
+from ..models import LeaderBoard, LeaderBoardRank
+from ..signals.handlers import update_leaderboard
+
+
+@patch('leaderboard.signals.handlers.LEADERBOARD_UPDATED.send')
+class UpdateLeaderboardTest(TestCase):
+    """
+    Tests that grade changes are applied to the leaderboard and its ranks once.
+    """
+    def setUp(self):
+        super(UpdateLeaderboardTest, self).setUp()
+        self.user = UserFactory()
+        self.course = Mock(id=CourseLocator('testx', 'course', 'run'), lowest_passing_grade=0.5)
+
+    def change_grade(self, percent):
+        update_leaderboard(user=self.user, course=self.course, grade=Mock(percent=percent))
+
+    def test_grade_changes(self, mock_send):
+        self.change_grade(0.4)
+        self.change_grade(0.6)
+
+        row = LeaderBoard.objects.get(student=self.user, course_id=unicode(self.course.id))
+        self.assertEqual((row.points, row.has_passed), (60, True))
+        for scope in (LeaderBoardRank.GLOBAL_SCOPE, LeaderBoardRank.course_scope(self.course.id)):
+            self.assertEqual(LeaderBoardRank.objects.get(scope=scope, student=self.user).points, 60)
+        self.assertEqual(
+            [call[1]['passed_changed'] for call in mock_send.call_args_list],
+            [False, True]
+        )
+
+    def test_unchanged_grade_is_skipped(self, mock_send):
+        self.change_grade(0.6)
+        self.change_grade(0.6)
+        self.assertEqual(mock_send.call_count, 1)
+        self.assertEqual(LeaderBoardRank.objects.get(scope=LeaderBoardRank.GLOBAL_SCOPE, student=self.user).points, 60)
@@ -0,0 +1,70 @@
+"""
+Tests for the leaderboard write buffer.
+"""
+from django.test.utils import override_settings
+from mock import patch
+
+from opaque_keys.edx.locator import CourseLocator
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from student.tests.factories import UserFactory
+
+from .. import write_buffer
+from ..models import LeaderBoard, LeaderBoardRank
+
+
+@override_settings(LEADERBOARD_WRITE_BUFFER_SECONDS=60)
+@patch('leaderboard.tasks.flush_leaderboard_buffer.apply_async')
+class WriteBufferTest(CacheIsolationTestCase):
+    """
+    Tests that buffered grade changes reach the leaderboard and its ranks.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(WriteBufferTest, self).setUp()
+        self.course_keys = [CourseLocator('testx', 'course{}'.format(index), 'run') for index in range(2)]
+        self.users = [UserFactory(), UserFactory()]
+
+    def assert_points(self, scope, user, points):
+        self.assertEqual(LeaderBoardRank.objects.get(scope=scope, student=user).points, points)
+
+    def test_flush(self, mock_schedule):
+        user, other_user = self.users
+        write_buffer.enqueue(user.id, self.course_keys[0], 10, False)
+        write_buffer.enqueue(user.id, self.course_keys[0], 20, False)
+        write_buffer.enqueue(user.id, self.course_keys[1], 30, True)
+        write_buffer.enqueue(other_user.id, self.course_keys[0], 40, True)
+        mock_schedule.assert_called_once_with(countdown=60)
+
+        self.assertEqual(write_buffer.flush(), 3)
+        self.assertEqual(write_buffer.get_counters(), {'buffered': 3, 'coalesced': 1, 'written': 3})
+        row = LeaderBoard.objects.get(student=user, course_id=unicode(self.course_keys[0]))
+        self.assertEqual((row.points, row.has_passed), (20, False))
+        self.assert_points(LeaderBoardRank.course_scope(self.course_keys[0]), user, 20)
+        self.assert_points(LeaderBoardRank.course_scope(self.course_keys[0]), other_user, 40)
+        self.assert_points(LeaderBoardRank.GLOBAL_SCOPE, user, 50)
+        self.assert_points(LeaderBoardRank.org_scope('testx'), user, 50)
+
+    def test_existing_rows_are_updated(self, _mock_schedule):
+        user = self.users[0]
+        for course_key in self.course_keys:
+            write_buffer.enqueue(user.id, course_key, 10, False)
+        write_buffer.flush()
+
+        write_buffer.enqueue(user.id, self.course_keys[1], 15, False)
+        with patch('leaderboard.write_buffer.LEADERBOARD_UPDATED.send') as mock_send:
+            write_buffer.flush()
+        self.assertFalse(mock_send.call_args[1]['passed_changed'])
+
+        write_buffer.enqueue(user.id, self.course_keys[0], 25, True)
+        write_buffer.enqueue(self.users[1].id, self.course_keys[0], 5, False)
+        with patch('leaderboard.write_buffer.LEADERBOARD_UPDATED.send') as mock_send:
+            self.assertEqual(write_buffer.flush(), 2)
+        self.assertTrue(mock_send.call_args[1]['passed_changed'])
+
+        row = LeaderBoard.objects.get(student=user, course_id=unicode(self.course_keys[0]))
+        self.assertEqual((row.points, row.has_passed), (25, True))
+        self.assert_points(LeaderBoardRank.course_scope(self.course_keys[0]), user, 25)
+        self.assert_points(LeaderBoardRank.GLOBAL_SCOPE, user, 40)
+        self.assert_points(LeaderBoardRank.org_scope('testx'), user, 40)
+        self.assert_points(LeaderBoardRank.GLOBAL_SCOPE, self.users[1], 5)
@@ -0,0 +1,182 @@
+"""
+Write-behind buffer for leaderboard updates.
+
+Course grade changes are recorded in the cache instead of the database.
+Repeated updates for the same (student, course) collapse into the latest
+value, and a flush task scheduled once per window writes all pending rows
+with a bulk insert plus a single bulk update.
+
+Pending entries are tracked through a util.cache_buffer slot buffer: the
+first update of a (student, course) within a window takes a slot, later
+updates only overwrite the buffered value.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, When, Value, FloatField, BooleanField
+from django.utils import timezone
+from opaque_keys.edx.keys import CourseKey
+
+from util.cache_buffer import CacheSlotBuffer, incr_counter
+
+from .models import LeaderBoard, LeaderBoardRank
+from .signals.signals import LEADERBOARD_UPDATED
+
+log = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = 'leaderboard.write_buffer'
+FLUSH_SCHEDULED_KEY = CACHE_KEY_PREFIX + '.flush_scheduled'
+
+# Buffered entries must outlive any realistic flush delay.
+ENTRY_TIMEOUT = 24 * 60 * 60
+FLUSH_BATCH_SIZE = 500
+
+COUNTERS = ('buffered', 'coalesced', 'written')
+
+SLOTS = CacheSlotBuffer(CACHE_KEY_PREFIX, ENTRY_TIMEOUT, FLUSH_BATCH_SIZE)
+
+
+def buffer_window():
+    """
+    Number of seconds updates are held before being flushed, 0 disables buffering.
+    """
+    return getattr(settings, 'LEADERBOARD_WRITE_BUFFER_SECONDS', 0)
+
+
+def is_enabled():
+    return buffer_window() > 0
+
+
+def _value_key(student_id, course_id):
+    return u'{}.value.{}.{}'.format(CACHE_KEY_PREFIX, student_id, course_id)
+
+
+def _pending_key(student_id, course_id):
+    return u'{}.pending.{}.{}'.format(CACHE_KEY_PREFIX, student_id, course_id)
+
+
+def _counter_key(name):
+    return u'{}.counter.{}'.format(CACHE_KEY_PREFIX, name)
+
+
+def get_counters():
+    """
+    Return the buffered, coalesced and written row counters.
+    """
+    values = cache.get_many([_counter_key(name) for name in COUNTERS])
+    return dict((name, values.get(_counter_key(name), 0)) for name in COUNTERS)
+
+
+def enqueue(student_id, course_id, points, has_passed):
+    """
+    Buffer the latest leaderboard values of a student in a course.
+    """
+    course_id = unicode(course_id)
+    cache.set(_value_key(student_id, course_id), (points, has_passed), ENTRY_TIMEOUT)
+    if cache.add(_pending_key(student_id, course_id), True, ENTRY_TIMEOUT):
+        if not SLOTS.append((student_id, course_id)):
+            # The slot sequence was evicted, write the row right away.
+            cache.delete(_pending_key(student_id, course_id))
+            _write_rows({(student_id, course_id): (points, has_passed)})
+            return
+        incr_counter(_counter_key('buffered'))
+    else:
+        incr_counter(_counter_key('coalesced'))
+    _schedule_flush()
+
+
+def _schedule_flush():
+    window = buffer_window()
+    if cache.add(FLUSH_SCHEDULED_KEY, True, window):
+        from .tasks import flush_leaderboard_buffer
+        flush_leaderboard_buffer.apply_async(countdown=window)
+
+
+def flush():
+    """
+    Write every pending update to the database, returns the number of rows written.
+    """
+    # Updates arriving from now on need a flush of their own.
+    cache.delete(FLUSH_SCHEDULED_KEY)
+    written = SLOTS.flush(lambda entries: _write_rows(_read_values(entries)))
+    if written:
+        incr_counter(_counter_key('written'), written)
+    return written
+
+
+def _read_values(entries):
+    """
+    Collect the buffered values of the (student_id, course_id) `entries`.
+
+    Pending markers are cleared before values are read, so an update racing
+    with the flush is either read here or takes a new slot.
+    """
+    cache.delete_many([_pending_key(*entry) for entry in entries])
+    values = cache.get_many([_value_key(*entry) for entry in entries])
+    pending = {}
+    for entry in entries:
+        value = values.get(_value_key(*entry))
+        if value is not None:
+            pending[entry] = value
+    return pending
+
+
+def _write_rows(pending):
+    """
+    Upsert LeaderBoard rows for `pending`, a dict of
+    {(student_id, course_id): (points, has_passed)}.
+    """
+    if not pending:
+        return 0
+
+    existing = {}
+    rows = LeaderBoard.objects.filter(
+        student_id__in=set(student_id for student_id, _ in pending),
+        course_id__in=set(course_id for _, course_id in pending)
+    ).values_list('id', 'student_id', 'course_id', 'points', 'has_passed')
+    for row_id, student_id, course_id, points, has_passed in rows:
+        if (student_id, course_id) in pending and (student_id, course_id) not in existing:
+            existing[(student_id, course_id)] = (row_id, points, has_passed)
+
+    new_rows = []
+    points_cases = []
+    passed_cases = []
+    rank_changes = []
+    passed_changed = False
+    for (student_id, course_id), (points, has_passed) in pending.iteritems():
+        if (student_id, course_id) in existing:
+            row_id, old_points, had_passed = existing[(student_id, course_id)]
+            passed_changed = passed_changed or had_passed != has_passed
+            points_cases.append(When(pk=row_id, then=Value(points)))
+            passed_cases.append(When(pk=row_id, then=Value(has_passed)))
+        else:
+            old_points = None
+            passed_changed = passed_changed or has_passed
+            new_rows.append(LeaderBoard(
+                student_id=student_id,
+                course_id=course_id,
+                points=points,
+                has_passed=has_passed
+            ))
+        rank_changes.append((student_id, CourseKey.from_string(course_id), old_points, points))
+
+    with transaction.atomic():
+        if points_cases:
+            LeaderBoard.objects.filter(
+                pk__in=[row_id for row_id, _, _ in existing.itervalues()]
+            ).update(
+                points=Case(*points_cases, output_field=FloatField()),
+                has_passed=Case(*passed_cases, output_field=BooleanField()),
+                modified=timezone.now()
+            )
+        LeaderBoard.objects.bulk_create(new_rows)
+        LeaderBoardRank.bulk_update_course_points(rank_changes)
+
+    LEADERBOARD_UPDATED.send(
+        sender=None,
+        course_ids=list(set(course_id for _, course_id in pending)),
+        passed_changed=passed_changed
+    )
+    return len(pending)
@@ -48,8 +48,7 @@ from third_party_auth.decorators import xframe_allow_whitelisted
 from util.bad_request_rate_limiter import BadRequestRateLimiter
 from util.date_utils import strftime_localized
 from util.enterprise_helpers import set_enterprise_branding_filter_param
-from openedx.core.djangoapps.micro_masters.views import programs_order_history
-from shoppingcart.api import order_history
+from openedx.core.djangoapps.micro_masters.ledger import get_purchase_history
 
 AUDIT_LOG = logging.getLogger("audit")
 log = logging.getLogger(__name__)
@@ -435,13 +434,22 @@ def account_settings_context(request):
 
     year_of_birth_options = [(unicode(year), unicode(year)) for year in UserProfile.VALID_YEARS]
     try:
-        user_orders = order_history(user)
-        user_orders += programs_order_history(user)
+        user_orders, previous_orders_page, next_orders_page = get_purchase_history(
+            user, request.GET.get('orders_page', 1)
+        )
     except:  # pylint: disable=bare-except
         log.exception('Error fetching order history from Otto.')
         # Return empty order list as account settings page expect a list and
         # it will be broken if exception raised
         user_orders = []
+        previous_orders_page = next_orders_page = None
+
+    orders_page_url = u'{}?orders_page={{}}'.format(reverse('account_settings'))
+    order_history_pagination = {
+        'selected': 'orders_page' in request.GET,
+        'previous_url': orders_page_url.format(previous_orders_page) if previous_orders_page else None,
+        'next_url': orders_page_url.format(next_orders_page) if next_orders_page else None,
+    }
 
     context = {
         'auth': {},
@@ -471,7 +479,8 @@ def account_settings_context(request):
         'user_preferences_api_url': reverse('preferences_api', kwargs={'username': user.username}),
         'disable_courseware_js': True,
         'show_program_listing': ProgramsApiConfig.current().show_program_listing,
-        'order_history': user_orders
+        'order_history': user_orders,
+        'order_history_pagination': order_history_pagination,
     }
 
     if third_party_auth.is_enabled():
@@ -221,6 +221,19 @@ class PhotoVerification(StatusModel):
                              or cls._earliest_allowed_date())
         ).exists()
 
+    @classmethod
+    def verified_user_ids(cls, user_ids, earliest_allowed_date=None):
+        """
+        Return the set of the ids in `user_ids` of the users that satisfactorily
+        proved their identity, see `user_is_verified`, with a single query.
+        """
+        return set(cls.objects.filter(
+            user_id__in=user_ids,
+            status="approved",
+            created_at__gte=(earliest_allowed_date
+                             or cls._earliest_allowed_date())
+        ).values_list('user_id', flat=True))
+
     @classmethod
     def verification_valid_or_pending(cls, user, earliest_allowed_date=None, queryset=None):
         """
@@ -955,14 +968,17 @@ class SoftwareSecurePhotoVerification(PhotoVerification):
         return response
 
     @classmethod
-    def verification_status_for_user(cls, user, course_id, user_enrollment_mode):
+    def verification_status_for_user(cls, user, course_id, user_enrollment_mode, user_is_verified=None):
         """
         Returns the verification status for use in grade report.
+
+        Whether the user is verified is looked up unless given.
         """
         if user_enrollment_mode not in CourseMode.VERIFIED_MODES:
             return 'N/A'
 
-        user_is_verified = cls.user_is_verified(user)
+        if user_is_verified is None:
+            user_is_verified = cls.user_is_verified(user)
 
         if not user_is_verified:
             return 'Not ID Verified'
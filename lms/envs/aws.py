@@ -626,6 +626,12 @@ VERIFY_STUDENT = AUTH_TOKENS.get("VERIFY_STUDENT", VERIFY_STUDENT)
 GRADES_DOWNLOAD_ROUTING_KEY = ENV_TOKENS.get('GRADES_DOWNLOAD_ROUTING_KEY', HIGH_MEM_QUEUE)
 
 GRADES_DOWNLOAD = ENV_TOKENS.get("GRADES_DOWNLOAD", GRADES_DOWNLOAD)
+GRADE_REPORT_SUBTASK_THRESHOLD = ENV_TOKENS.get('GRADE_REPORT_SUBTASK_THRESHOLD', GRADE_REPORT_SUBTASK_THRESHOLD)
+GRADE_REPORT_STUDENTS_PER_TASK = ENV_TOKENS.get('GRADE_REPORT_STUDENTS_PER_TASK', GRADE_REPORT_STUDENTS_PER_TASK)
+GRADE_REPORT_TRUST_PERSISTED_GRADES = ENV_TOKENS.get(
+    'GRADE_REPORT_TRUST_PERSISTED_GRADES', GRADE_REPORT_TRUST_PERSISTED_GRADES
+)
+REPORT_STORE_MAX_BUFFER_SIZE = ENV_TOKENS.get('REPORT_STORE_MAX_BUFFER_SIZE', REPORT_STORE_MAX_BUFFER_SIZE)
 
 # financial reports
 FINANCIAL_REPORTS = ENV_TOKENS.get("FINANCIAL_REPORTS", FINANCIAL_REPORTS)
@@ -907,3 +913,37 @@ _COUNTRIES_OVERRIDE = ENV_TOKENS.get('COUNTRIES_OVERRIDE', None)
 if _COUNTRIES_OVERRIDE:
     COUNTRIES_OVERRIDE = _COUNTRIES_OVERRIDE
 
+
+############## Settings for the Leaderboard ######################
+
+LEADERBOARD_WRITE_BUFFER_SECONDS = ENV_TOKENS.get('LEADERBOARD_WRITE_BUFFER_SECONDS', LEADERBOARD_WRITE_BUFFER_SECONDS)
+
+############## Settings for the Admin Dashboard ######################
+
+ADMIN_DASH_PRECOMPUTED_COURSE_STATS = ENV_TOKENS.get(
+    'ADMIN_DASH_PRECOMPUTED_COURSE_STATS', ADMIN_DASH_PRECOMPUTED_COURSE_STATS
+)
+ADMIN_DASH_REPORT_SNAPSHOT_INTERVAL_SECONDS = ENV_TOKENS.get(
+    'ADMIN_DASH_REPORT_SNAPSHOT_INTERVAL_SECONDS', ADMIN_DASH_REPORT_SNAPSHOT_INTERVAL_SECONDS
+)
+if ADMIN_DASH_REPORT_SNAPSHOT_INTERVAL_SECONDS:
+    CELERYBEAT_SCHEDULE['refresh-admin-dash-reports'] = {
+        'task': 'admin_dash.tasks.refresh_report_snapshots',
+        'schedule': datetime.timedelta(seconds=ADMIN_DASH_REPORT_SNAPSHOT_INTERVAL_SECONDS),
+    }
+
+############## Settings for Attendance ######################
+
+ATTENDANCE_FLUSH_INTERVAL_SECONDS = ENV_TOKENS.get('ATTENDANCE_FLUSH_INTERVAL_SECONDS', ATTENDANCE_FLUSH_INTERVAL_SECONDS)
+if ATTENDANCE_FLUSH_INTERVAL_SECONDS:
+    CELERYBEAT_SCHEDULE['flush-attendance'] = {
+        'task': 'attendance.tasks.flush_attendance',
+        'schedule': datetime.timedelta(seconds=ATTENDANCE_FLUSH_INTERVAL_SECONDS),
+    }
+
+ATTENDANCE_RAW_RETENTION_DAYS = ENV_TOKENS.get('ATTENDANCE_RAW_RETENTION_DAYS', ATTENDANCE_RAW_RETENTION_DAYS)
+if ATTENDANCE_RAW_RETENTION_DAYS:
+    CELERYBEAT_SCHEDULE['compact-attendance'] = {
+        'task': 'attendance.tasks.compact_attendance',
+        'schedule': datetime.timedelta(days=1),
+    }
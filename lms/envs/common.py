@@ -1758,6 +1758,9 @@ DEBUG_TOOLBAR_PATCH_SETTINGS = False
 # Tasks are only registered when the module they are defined in is imported.
 CELERY_IMPORTS = (
     'openedx.core.djangoapps.programs.tasks.v1.tasks',
+    # Installed through its AppConfig, which autodiscovery does not follow.
+    'leaderboard.tasks',
+    'admin_dash.tasks',
 )
 
 # Message configuration
@@ -2170,6 +2173,9 @@ INSTALLED_APPS = (
     # student attendance
     'attendance',
 
+    # site administration dashboard
+    'admin_dash.apps.AdminDashConfig',
+
     # homepage content adding from admin, example testimonials
     'homepage_content',
 
@@ -2441,6 +2447,17 @@ GRADES_DOWNLOAD = {
     'ROOT_PATH': '/tmp/edx-s3/grades',
 }
 
+# Grade reports of courses with more enrolled students than the threshold are
+# generated by parallel subtasks of GRADE_REPORT_STUDENTS_PER_TASK students.
+# With None, grade reports are always generated in a single task.
+GRADE_REPORT_SUBTASK_THRESHOLD = None
+GRADE_REPORT_STUDENTS_PER_TASK = 1000
+
+# Read the grades of the grade and problem grade reports from the persisted
+# grades that are up to date with the course version and grading policy, only
+# recomputing the missing or stale ones.
+GRADE_REPORT_TRUST_PERSISTED_GRADES = False
+
 FINANCIAL_REPORTS = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': 'edx-financial-reports',
@@ -2448,6 +2465,11 @@ FINANCIAL_REPORTS = {
     'ROOT_PATH': '/tmp/edx-s3/financial_reports',
 }
 
+# Reports are written to their storage as they are generated, keeping at most
+# this many bytes of CSV rows in memory. Set 'GZIP': True in the report store
+# settings above to gzip the reports.
+REPORT_STORE_MAX_BUFFER_SIZE = 1024 * 1024
+
 #### PASSWORD POLICY SETTINGS #####
 PASSWORD_MIN_LENGTH = 8
 PASSWORD_MAX_LENGTH = None
@@ -3060,3 +3082,31 @@ DOC_LINK_BASE_URL = None
 ############## Settings for the Enterprise App ######################
 
 ENTERPRISE_ENROLLMENT_API_URL = LMS_ROOT_URL + "/api/enrollment/v1/"
+
+############## Settings for the Leaderboard ######################
+
+# Seconds course grade changes are buffered and coalesced before being
+# written to the leaderboard in bulk. 0 writes them synchronously.
+LEADERBOARD_WRITE_BUFFER_SECONDS = 0
+
+############## Settings for the Admin Dashboard ######################
+
+# Serve course chart counters from the CourseStats table, recomputing only
+# courses whose enrollments or leaderboard rows changed since the last read.
+# Changes are not tracked while it is off: when turning it back on, empty
+# the admin_dash_coursestats table first.
+ADMIN_DASH_PRECOMPUTED_COURSE_STATS = False
+
+# Seconds between scheduled recomputations of the insight report snapshots
+# served by the admin dashboard. 0 computes the reports on every request.
+ADMIN_DASH_REPORT_SNAPSHOT_INTERVAL_SECONDS = 0
+
+############## Settings for Attendance ######################
+
+# Seconds between bulk writes of first daily visits, buffered in the cache
+# meanwhile. 0 writes them during the request.
+ATTENDANCE_FLUSH_INTERVAL_SECONDS = 0
+
+# Days of raw attendance rows kept once counted in the daily traffic
+# counters. None keeps them forever.
+ATTENDANCE_RAW_RETENTION_DAYS = None
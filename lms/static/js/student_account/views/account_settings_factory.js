@@ -6,9 +6,10 @@
         'js/student_account/models/user_preferences_model',
         'js/student_account/views/account_settings_fields',
         'js/student_account/views/account_settings_view',
-        'edx-ui-toolkit/js/utils/string-utils'
+        'edx-ui-toolkit/js/utils/string-utils',
+        'edx-ui-toolkit/js/utils/html-utils'
     ], function(gettext, $, _, Backbone, Logger, UserAccountModel, UserPreferencesModel,
-                 AccountSettingsFieldViews, AccountSettingsView, StringUtils) {
+                 AccountSettingsFieldViews, AccountSettingsView, StringUtils, HtmlUtils) {
         return function(
             fieldsData,
             ordersHistoryData,
@@ -16,11 +17,13 @@
             userAccountsApiUrl,
             userPreferencesApiUrl,
             accountUserId,
-            platformName
+            platformName,
+            ordersPagination
         ) {
             var accountSettingsElement, userAccountModel, userPreferencesModel, aboutSectionsData,
                 accountsSectionData, ordersSectionData, accountSettingsView, showAccountSettingsPage,
-                showLoadingError, orderNumber, getUserField, userFields, timeZoneDropdownField, countryDropdownField;
+                showLoadingError, orderNumber, getUserField, userFields, timeZoneDropdownField, countryDropdownField,
+                renderOrdersPagination;
 
             accountSettingsElement = $('.wrapper-account-settings');
 
@@ -255,6 +258,38 @@
 
             accountSettingsView.render();
 
+            renderOrdersPagination = function(pagination) {
+                var pageLinks = [];
+                if (pagination.previous_url) {
+                    pageLinks.push(HtmlUtils.interpolateHtml(
+                        HtmlUtils.HTML('<a class="orders-page-link orders-page-previous" href="{url}">{label}</a>'),
+                        {url: pagination.previous_url, label: gettext('Newer orders')}
+                    ));
+                }
+                if (pagination.next_url) {
+                    pageLinks.push(HtmlUtils.interpolateHtml(
+                        HtmlUtils.HTML('<a class="orders-page-link orders-page-next" href="{url}">{label}</a>'),
+                        {url: pagination.next_url, label: gettext('Older orders')}
+                    ));
+                }
+                if (pageLinks.length) {
+                    HtmlUtils.append(
+                        accountSettingsView.$('#ordersTabSections-tabpanel'),
+                        HtmlUtils.interpolateHtml(
+                            HtmlUtils.HTML('<nav class="orders-pagination" aria-label="{label}">{links}</nav>'),
+                            {label: gettext('Order history pages'), links: HtmlUtils.joinHtml.apply(null, pageLinks)}
+                        )
+                    );
+                }
+                if (pagination.selected) {
+                    accountSettingsView.$('#orders-tab').click();
+                }
+            };
+
+            if (ordersPagination) {
+                renderOrdersPagination(ordersPagination);
+            }
+
             showAccountSettingsPage = function() {
                 // Record that the account settings page was viewed.
                 Logger.log('edx.user.settings.viewed', {
@@ -88,7 +88,7 @@ admin.site.register(ProgramEnrollment, ProgramEnrollmentAdmin)
 
 
 class ProgramCouponAdmin(admin.ModelAdmin):
-    list_display = ['code', 'program', 'percentage_discount', 'is_active', 'expiration_date']
+    list_display = ['code', 'program', 'percentage_discount', 'is_active', 'expiration_date', 'redemption_count']
     list_filter = ['is_active', 'percentage_discount', 'program']
     search_fields = ['program__name', 'code', 'percentage_discount']
 
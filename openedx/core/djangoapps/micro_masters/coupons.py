@@ -0,0 +1,55 @@
+"""
+Program coupon lookups.
+
+Checkout looks coupons up by code. The active coupons of a code are cached
+until one of them changes, so a lookup costs a single cache read whatever
+the number of coupons; expiry is checked on every read against the cached
+expiration dates. Redemptions count once their order is purchased.
+"""
+import hashlib
+import pytz
+from datetime import datetime
+
+from django.core.cache import cache
+
+from .models import ProgramCoupon, ProgramCouponRedemption
+
+PROGRAM_COUPONS_CACHE_KEY = u'micro_masters.program_coupons.{}'
+PROGRAM_COUPONS_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def _coupons_key(code):
+    # Codes are entered by users, hash them into a valid cache key.
+    return PROGRAM_COUPONS_CACHE_KEY.format(hashlib.md5(code.encode('utf-8')).hexdigest())
+
+
+def get_active_program_coupons(code):
+    """
+    Return the active and unexpired program coupons of `code`.
+    """
+    key = _coupons_key(code)
+    coupons = cache.get(key)
+    if coupons is None:
+        coupons = list(ProgramCoupon.objects.filter(code=code, is_active=True))
+        cache.set(key, coupons, PROGRAM_COUPONS_CACHE_TIMEOUT)
+
+    now = datetime.now(pytz.UTC)
+    return [coupon for coupon in coupons if coupon.expiration_date is None or coupon.expiration_date > now]
+
+
+def get_user_coupon_redemptions(user, code):
+    """
+    Return the redemptions of coupons of `code` by `user` in purchased orders.
+    """
+    return ProgramCouponRedemption.objects.filter(
+        user=user,
+        coupon__code=code,
+        order__status='purchased'
+    ).select_related('coupon')
+
+
+def invalidate_program_coupons(*codes):
+    """
+    Drop the cached active coupons of `codes`.
+    """
+    cache.delete_many([_coupons_key(code) for code in codes if code])
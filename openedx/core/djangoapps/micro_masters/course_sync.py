@@ -0,0 +1,45 @@
+"""
+Deferred mirroring of course overviews into program courses.
+
+Every saved CourseOverview is mirrored into Courses by a signal handler, one
+get and save per course. Code generating many overviews at once, such as a
+course overview backfill, wraps the work in `deferred_course_sync` so the
+saved overviews are only collected and mirrored with one bulk sync at the end.
+"""
+import threading
+from contextlib import contextmanager
+
+from .models import Courses
+
+_deferred = threading.local()
+
+
+def defer_course_sync(course_key):
+    """
+    Collect `course_key` for the running deferred sync, returns False when
+    there is none and the course must be mirrored right away.
+    """
+    course_keys = getattr(_deferred, 'course_keys', None)
+    if course_keys is None:
+        return False
+    course_keys.add(course_key)
+    return True
+
+
+@contextmanager
+def deferred_course_sync():
+    """
+    Mirror the course overviews saved within the block with one bulk sync
+    when it exits. Nested blocks join the outermost one.
+    """
+    if getattr(_deferred, 'course_keys', None) is not None:
+        yield
+        return
+
+    _deferred.course_keys = set()
+    try:
+        yield
+    finally:
+        course_keys, _deferred.course_keys = _deferred.course_keys, None
+        if course_keys:
+            Courses.sync_from_course_overviews(course_keys)
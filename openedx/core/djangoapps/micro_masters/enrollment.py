@@ -0,0 +1,149 @@
+"""
+Batched course enrollment for program enrollments.
+
+Programs enroll a learner into all of their courses at once. The enrollment
+rows are written with a couple of bulk queries; the pre_save and post_save
+signals a CourseEnrollment save sends are sent for each of them, so their
+receivers (audit history, forum role, caches, cohorts) apply as usual. The
+enrollment signals and tracking events are sent once the writes committed.
+"""
+import logging
+
+import dogstats_wrapper as dog_stats_api
+from django.core.cache import cache
+from django.db import IntegrityError, router, transaction
+from django.db.models.signals import pre_save, post_save
+
+from course_modes.models import CourseMode
+from student.models import (
+    CourseEnrollment,
+    EnrollStatusChange,
+    UNENROLL_DONE,
+    EVENT_NAME_ENROLLMENT_ACTIVATED,
+    EVENT_NAME_ENROLLMENT_DEACTIVATED
+)
+
+log = logging.getLogger("micro_masters")
+
+
+def _default_modes(course_keys):
+    """
+    Return {course_key: mode} with the mode CourseEnrollment.enroll picks
+    when none is given, reading the modes of every course in one query.
+    """
+    _all_modes, unexpired_modes = CourseMode.all_and_unexpired_modes_for_courses(list(course_keys))
+    default_modes = {}
+    for course_key in course_keys:
+        slugs = set(mode.slug for mode in unexpired_modes.get(course_key, []))
+        if 'honor' in slugs and not slugs & {CourseMode.DEFAULT_MODE_SLUG, 'audit'}:
+            default_modes[course_key] = 'honor'
+        else:
+            default_modes[course_key] = CourseMode.DEFAULT_MODE_SLUG
+    return default_modes
+
+
+def _send_save_signals(signal, enrollments, created=()):
+    """
+    Send `signal`, pre_save or post_save, for each of `enrollments` as
+    CourseEnrollment.save does; `created` holds the enrollments inserted.
+    """
+    using = router.db_for_write(CourseEnrollment)
+    for enrollment in enrollments:
+        kwargs = {'created': enrollment in created} if signal is post_save else {}
+        signal.send(
+            sender=CourseEnrollment, instance=enrollment, raw=False, using=using, update_fields=None, **kwargs
+        )
+
+
+def _count(metric, enrollment):
+    dog_stats_api.increment(
+        metric,
+        tags=[u"org:{}".format(enrollment.course_id.org),
+              u"offering:{}".format(enrollment.course_id.offering),
+              u"mode:{}".format(enrollment.mode)]
+    )
+
+
+def enroll_in_courses(user, course_keys):
+    """
+    Activate the enrollments of `user` in `course_keys`, creating missing
+    ones in the default mode of their course. Modes of existing enrollments
+    are kept.
+
+    Returns the enrollments that changed; calling it again is a no-op.
+    """
+    course_keys = set(course_keys)
+    existing = dict(
+        (enrollment.course_id, enrollment)
+        for enrollment in CourseEnrollment.objects.filter(user=user, course_id__in=course_keys)
+    )
+    reactivated = [enrollment for enrollment in existing.itervalues() if not enrollment.is_active]
+    new_keys = course_keys - set(existing)
+    default_modes = _default_modes(new_keys)
+    new_enrollments = [
+        CourseEnrollment(user=user, course_id=course_key, mode=default_modes[course_key], is_active=True)
+        for course_key in new_keys
+    ]
+    if not reactivated and not new_enrollments:
+        return []
+
+    for enrollment in reactivated:
+        enrollment.is_active = True
+    _send_save_signals(pre_save, reactivated + new_enrollments)
+    try:
+        with transaction.atomic():
+            if reactivated:
+                CourseEnrollment.objects.filter(pk__in=[enrollment.pk for enrollment in reactivated]).update(
+                    is_active=True
+                )
+            if new_enrollments:
+                CourseEnrollment.objects.bulk_create(new_enrollments)
+                # bulk_create does not set primary keys on every backend; keep
+                # the instances the pre_save receivers have seen.
+                enrollment_ids = dict(
+                    CourseEnrollment.objects.filter(user=user, course_id__in=new_keys).values_list('course_id', 'id')
+                )
+                for enrollment in new_enrollments:
+                    enrollment.pk = enrollment_ids[enrollment.course_id]
+    except IntegrityError:
+        # Enrolled concurrently in one of the courses, fall back to the
+        # regular enrollment path which handles existing rows.
+        log.warning(u'Concurrent enrollment of user %s, enrolling course by course.', user.id)
+        return [
+            CourseEnrollment.enroll(user, course_key, mode=getattr(existing.get(course_key), 'mode', None))
+            for course_key in new_keys | set(enrollment.course_id for enrollment in reactivated)
+        ]
+
+    changed = reactivated + new_enrollments
+    _send_save_signals(post_save, changed, new_enrollments)
+    cache.delete(CourseEnrollment.enrollment_status_hash_cache_key(user))
+    for enrollment in changed:
+        enrollment.emit_event(EVENT_NAME_ENROLLMENT_ACTIVATED)
+        _count("common.student.enrollment", enrollment)
+        enrollment.send_signal(EnrollStatusChange.enroll)
+    return changed
+
+
+def unenroll_from_courses(user, course_keys, skip_refund=False):
+    """
+    Deactivate the active enrollments of `user` in `course_keys`.
+
+    Returns the enrollments that changed; calling it again is a no-op.
+    """
+    active = list(CourseEnrollment.objects.filter(user=user, course_id__in=course_keys, is_active=True))
+    if not active:
+        return []
+
+    for enrollment in active:
+        enrollment.is_active = False
+    _send_save_signals(pre_save, active)
+    CourseEnrollment.objects.filter(pk__in=[enrollment.pk for enrollment in active]).update(is_active=False)
+
+    _send_save_signals(post_save, active)
+    cache.delete(CourseEnrollment.enrollment_status_hash_cache_key(user))
+    for enrollment in active:
+        UNENROLL_DONE.send(sender=None, course_enrollment=enrollment, skip_refund=skip_refund)
+        enrollment.emit_event(EVENT_NAME_ENROLLMENT_DEACTIVATED)
+        enrollment.send_signal(EnrollStatusChange.unenroll)
+        _count("common.student.unenrollment", enrollment)
+    return active
@@ -0,0 +1,129 @@
+"""
+Per-user purchase ledger covering shopping cart and program orders.
+"""
+from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.db.models import Q
+
+from shoppingcart.models import OrderItem
+from xmodule.modulestore.django import ModuleI18nService
+
+from .models import ProgramOrder, PurchaseLedgerEntry
+
+PURCHASE_HISTORY_PAGE_SIZE = 50
+# Shopping cart items of a course, the ones recorded in the ledger.
+COURSE_ITEMS = Q(paidcourseregistration__isnull=False) | Q(courseregcodeitem__isnull=False) | \
+    Q(certificateitem__isnull=False)
+
+
+def _course_item_title(order_item):
+    try:
+        return order_item.pdf_receipt_display_name or u''
+    except:  # pylint: disable=bare-except
+        return u''
+
+
+def record_course_order_item(order_item):
+    """
+    Append the shopping cart order of a purchased course item to the ledger.
+    """
+    order = order_item.order
+    PurchaseLedgerEntry.record(
+        user_id=order.user_id,
+        kind=PurchaseLedgerEntry.COURSE_ORDER,
+        order_number=order.id,
+        title=_course_item_title(order_item),
+        price=order.total_cost,
+        purchase_time=order.purchase_time or order_item.fulfilled_time,
+        org=order_item.course_id.org
+    )
+
+
+def refund_course_order_item(order_item):
+    """
+    Flag the order of a refunded course item once none of its items remain purchased.
+    """
+    if not OrderItem.objects.filter(order_id=order_item.order_id, status='purchased').exists():
+        PurchaseLedgerEntry.mark_refunded(PurchaseLedgerEntry.COURSE_ORDER, order_item.order_id)
+
+
+def record_program_order(order):
+    """
+    Append a purchased program order to the ledger.
+    """
+    PurchaseLedgerEntry.record(
+        user_id=order.user_id,
+        kind=PurchaseLedgerEntry.PROGRAM_ORDER,
+        order_number=order.id,
+        title=order.item_name or order.program.name,
+        price=order.program.price,
+        purchase_time=order.purchase_time
+    )
+
+
+def get_purchase_history(user, page=1, page_size=PURCHASE_HISTORY_PAGE_SIZE, course_org_filter=None,
+                         org_filter_out_set=()):
+    """
+    Return one page of the purchased orders of `user`, most recent first, in
+    the format of the order history lists, and the numbers of the previous
+    and next pages, None on the first and last page.
+
+    Only the ledger is read; orders purchased before it was installed are
+    recorded once by the backfill_purchase_ledger command.
+    """
+    entries = PurchaseLedgerEntry.history(user, course_org_filter, org_filter_out_set)
+    paginator = Paginator(entries, page_size)
+    try:
+        entries_page = paginator.page(page)
+    except PageNotAnInteger:
+        entries_page = paginator.page(1)
+    except EmptyPage:
+        entries_page = paginator.page(paginator.num_pages)
+
+    i18n_service = ModuleI18nService()
+    order_history_list = [
+        {
+            'number': entry.order_number,
+            'title': entry.title,
+            'price': float(entry.price),
+            'receipt_url': entry.receipt_url,
+            'order_date': i18n_service.strftime(entry.purchase_time, 'SHORT_DATE')
+        }
+        for entry in entries_page
+    ]
+    return (
+        order_history_list,
+        entries_page.previous_page_number() if entries_page.has_previous() else None,
+        entries_page.next_page_number() if entries_page.has_next() else None,
+    )
+
+
+def backfill_purchase_ledger():
+    """
+    Record every purchased order missing from the ledger, returns the number of orders recorded.
+    """
+    recorded = 0
+    recorded_orders = set(
+        PurchaseLedgerEntry.objects.filter(
+            kind=PurchaseLedgerEntry.COURSE_ORDER
+        ).values_list('order_number', flat=True)
+    )
+    course_items = OrderItem.objects.filter(
+        status='purchased'
+    ).filter(COURSE_ITEMS).select_related('order').select_subclasses().order_by('-fulfilled_time')
+    for order_item in course_items.iterator():
+        if order_item.order_id in recorded_orders:
+            continue
+        record_course_order_item(order_item)
+        recorded_orders.add(order_item.order_id)
+        recorded += 1
+
+    recorded_programs = set(
+        PurchaseLedgerEntry.objects.filter(
+            kind=PurchaseLedgerEntry.PROGRAM_ORDER
+        ).values_list('order_number', flat=True)
+    )
+    for order in ProgramOrder.objects.filter(status='purchased').select_related('program').iterator():
+        if order.id not in recorded_programs:
+            record_program_order(order)
+            recorded += 1
+    return recorded
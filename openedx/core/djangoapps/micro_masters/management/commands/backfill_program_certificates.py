@@ -0,0 +1,31 @@
+"""
+Management command to issue the program certificates earned before they were issued on grade changes.
+"""
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand
+
+from openedx.core.djangoapps.micro_masters.progress import issue_missing_program_certificates
+
+
+class Command(BaseCommand):
+    """
+    Issue the program certificates of learners who passed every course of
+    a program they are enrolled in but hold no certificate for it.
+
+    Certificates are issued when a course grade changes; this is needed
+    once for the learners who passed their program courses before that,
+    and is safe to run again.
+
+    Example:
+
+        ./manage.py lms backfill_program_certificates --program-ids 1 2 --settings=aws
+    """
+    help = dedent(__doc__)
+
+    def add_arguments(self, parser):
+        parser.add_argument('--program-ids', nargs='+', type=int, help='Only issue certificates of these programs.')
+
+    def handle(self, *args, **options):
+        issued = issue_missing_program_certificates(options['program_ids'])
+        self.stdout.write(u'Issued {} program certificates.'.format(issued))
@@ -0,0 +1,29 @@
+"""
+Management command to fill the purchase ledger from existing orders.
+"""
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand
+
+from openedx.core.djangoapps.micro_masters.ledger import backfill_purchase_ledger
+
+
+class Command(BaseCommand):
+    """
+    Record purchased shopping cart and program orders missing from the
+    purchase ledger.
+
+    New orders are recorded when they are fulfilled and order histories
+    are only read from the ledger, so this must be run once on deploy to
+    record the orders purchased before. Orders already in the ledger are
+    skipped, running it again is safe.
+
+    Example:
+
+        ./manage.py lms backfill_purchase_ledger --settings=aws
+    """
+    help = dedent(__doc__)
+
+    def handle(self, *args, **options):
+        recorded = backfill_purchase_ledger()
+        self.stdout.write(u'Recorded {} orders in the purchase ledger.'.format(recorded))
@@ -0,0 +1,40 @@
+"""
+Management command to mirror course overviews into program courses.
+"""
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from openedx.core.djangoapps.micro_masters.models import Courses
+
+
+class Command(BaseCommand):
+    """
+    Create and rename the program courses of the given course overviews, or
+    of all of them, with bulk queries.
+
+    Run it after generating course overviews in bulk instead of relying on
+    the per-course signal handler.
+
+    Example:
+
+        ./manage.py lms sync_program_courses --settings=aws
+        ./manage.py lms sync_program_courses course-v1:edX+DemoX+Demo_Course --settings=aws
+    """
+    help = dedent(__doc__)
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_keys', nargs='*', help='course ids to sync, all courses when omitted')
+
+    def handle(self, *args, **options):
+        course_keys = None
+        if options['course_keys']:
+            try:
+                course_keys = [CourseKey.from_string(course_key) for course_key in options['course_keys']]
+            except InvalidKeyError as exc:
+                raise CommandError(u'Invalid course id: {}'.format(exc))
+
+        created, updated = Courses.sync_from_course_overviews(course_keys)
+        self.stdout.write(u'Created {} and updated {} program courses.'.format(created, updated))
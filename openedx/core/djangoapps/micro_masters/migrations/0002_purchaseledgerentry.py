@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.conf import settings
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('micro_masters', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseLedgerEntry',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('kind', models.CharField(max_length=16, choices=[('course', 'course'), ('program', 'program')])),
+                ('order_number', models.IntegerField()),
+                ('title', models.CharField(default='', max_length=255, blank=True)),
+                ('price', models.DecimalField(default=0, max_digits=30, decimal_places=2)),
+                ('org', models.CharField(default='', max_length=255, blank=True)),
+                ('purchase_time', models.DateTimeField()),
+                ('refunded', models.BooleanField(default=False)),
+                ('user', models.ForeignKey(to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Purchase Ledger Entry',
+                'verbose_name_plural': 'Purchase Ledger',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='purchaseledgerentry',
+            unique_together=set([('kind', 'order_number')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='purchaseledgerentry',
+            index_together=set([('user', 'refunded', 'purchase_time')]),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_redemptions(apps, schema_editor):
+    """
+    Initialize the redemption counters from the redemptions of purchased orders.
+    """
+    ProgramCoupon = apps.get_model('micro_masters', 'ProgramCoupon')
+    ProgramCouponRedemption = apps.get_model('micro_masters', 'ProgramCouponRedemption')
+    counts = ProgramCouponRedemption.objects.filter(
+        order__status='purchased'
+    ).values('coupon_id').annotate(count=Count('id')).order_by()
+    for row in counts:
+        ProgramCoupon.objects.filter(id=row['coupon_id']).update(redemption_count=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('micro_masters', '0002_purchaseledgerentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='programcoupon',
+            name='redemption_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterIndexTogether(
+            name='programcoupon',
+            index_together=set([('code', 'is_active')]),
+        ),
+        migrations.RunPython(count_redemptions, migrations.RunPython.noop),
+    ]
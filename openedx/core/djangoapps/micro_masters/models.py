@@ -16,25 +16,40 @@ from decimal import Decimal
 from datetime import datetime, timedelta
 
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Value, When
+from django.core.cache import cache
 from django.core.mail.message import EmailMessage
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.core.validators import URLValidator
 from django_extensions.db.models import TimeStampedModel
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.translation import ugettext as _, ugettext_noop
 
 from edxmako.shortcuts import render_to_string
+from util.date_utils import to_timestamp
 from util.models import CompressedTextField
 from student.models import CourseEnrollment
 from shoppingcart.pdf import PDFInvoice
 from shoppingcart.exceptions import MultipleCouponsNotAllowedException
+from opaque_keys.edx.keys import CourseKey
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 
 log = logging.getLogger("micro_masters")
 
+COURSE_PROGRAMS_CACHE_KEY = 'micro_masters.course_programs_index'
+COURSES_SYNC_BATCH_SIZE = 500
+PROGRAM_RECEIPT_PDF_CACHE_KEY = u'micro_masters.program_receipt_pdf.{}'
+PROGRAM_RECEIPT_PDF_CACHE_TIMEOUT = 24 * 60 * 60
+# Delay before the tasks queued while saving programs, orders and program
+# enrollments run, giving the saving transaction time to commit. Tasks that
+# find their rows uncommitted retry.
+TASK_COMMIT_COUNTDOWN = 5
+
 ORDER_STATUSES = (
     # The user is selecting what he/she wants to purchase.
     ('initiate', 'initiate'),
@@ -72,14 +87,53 @@ class Courses(TimeStampedModel):
         course_key = course_overview.id
         try:
             course = cls.objects.get(course_key=course_key)
-            course.name = title
-            course.save()
+            if course.name != title:
+                course.name = title
+                course.save()
         except cls.DoesNotExist:
             cls.objects.create(
                 course_key=course_key,
                 name=title
             )
 
+    @classmethod
+    def sync_from_course_overviews(cls, course_keys=None):
+        """
+        Mirror the display names of the course overviews of `course_keys`, or
+        of all of them, creating the missing courses and renaming the changed
+        ones with bulk queries. Returns the number of courses created and updated.
+        """
+        overviews = CourseOverview.objects.filter(display_name__isnull=False)
+        courses = cls.objects.all()
+        if course_keys is not None:
+            course_keys = list(course_keys)
+            overviews = overviews.filter(id__in=course_keys)
+            courses = courses.filter(course_key__in=course_keys)
+
+        names = dict((unicode(course_key), name) for course_key, name in overviews.values_list('id', 'display_name'))
+        existing = set()
+        renamed = []
+        for pk, course_key, name in courses.values_list('pk', 'course_key', 'name'):
+            course_key = unicode(course_key)
+            existing.add(course_key)
+            if course_key in names and names[course_key] != name:
+                renamed.append((pk, names[course_key]))
+
+        new_courses = [
+            cls(course_key=CourseKey.from_string(course_key), name=name)
+            for course_key, name in names.iteritems() if course_key not in existing
+        ]
+        cls.objects.bulk_create(new_courses, batch_size=COURSES_SYNC_BATCH_SIZE)
+
+        now = timezone.now()
+        for start in range(0, len(renamed), COURSES_SYNC_BATCH_SIZE):
+            batch = renamed[start:start + COURSES_SYNC_BATCH_SIZE]
+            cls.objects.filter(pk__in=[pk for pk, __ in batch]).update(
+                name=Case(*[When(pk=pk, then=Value(name)) for pk, name in batch], output_field=models.CharField()),
+                modified=now
+            )
+        return len(new_courses), len(renamed)
+
     def __unicode__(self):
         return self.name
 
@@ -266,23 +320,40 @@ class Program(TimeStampedModel):
     def __repr__(self):
         return self.__unicode__()
 
+    @classmethod
+    def course_programs_index(cls):
+        """
+        Return {course_id: [(program id, name, start)]} for all programs,
+        cached until a program or its courses change.
+        """
+        index = cache.get(COURSE_PROGRAMS_CACHE_KEY)
+        if index is None:
+            index = {}
+            links = cls.courses.through.objects.select_related('program', 'courses').order_by('program_id')
+            for link in links:
+                index.setdefault(unicode(link.courses.course_key), []).append(
+                    (link.program.id, link.program.name, link.program.start)
+                )
+            cache.set(COURSE_PROGRAMS_CACHE_KEY, index, None)
+        return index
+
+    @classmethod
+    def invalidate_course_programs_index(cls):
+        cache.delete(COURSE_PROGRAMS_CACHE_KEY)
+
     @classmethod
     def course_has_part_of_programs(cls, course_id):
         """
         Check this course is part of programs
         """
-        programs = cls.objects.all()
+        today = datetime.now(pytz.UTC).date()
         course_programs_details = []
-        for program in programs:
-            if program.start <= datetime.now(pytz.UTC).date():
-                for course in program.courses.select_related():
-                    if str(course.course_key) == course_id:
-                        program_about = reverse('openedx.core.djangoapps.micro_masters.views.program_about', args=str(program.id))
-                        course_programs_details.append({
-                            program.name: program_about
-                        })
-                        break
-                        # return True
+        for program_id, name, start in cls.course_programs_index().get(unicode(course_id), []):
+            if start is None or start <= today:
+                program_about = reverse('openedx.core.djangoapps.micro_masters.views.program_about', args=[program_id])
+                course_programs_details.append({
+                    name: program_about
+                })
         return course_programs_details
 
 
@@ -351,6 +422,17 @@ class ProgramOrder(TimeStampedModel):
         cart_order.save()
         return cart_order
 
+    def receipt_pdf(self):
+        """
+        Returns the content of the pdf receipt, rendered once and cached.
+        """
+        cache_key = PROGRAM_RECEIPT_PDF_CACHE_KEY.format(self.id)
+        pdf = cache.get(cache_key)
+        if pdf is None:
+            pdf = self.generate_pdf_receipt().getvalue()
+            cache.set(cache_key, pdf, PROGRAM_RECEIPT_PDF_CACHE_TIMEOUT)
+        return pdf
+
     def generate_pdf_receipt(self):
         """
         Generates the pdf receipt for the order
@@ -378,10 +460,31 @@ class ProgramOrder(TimeStampedModel):
         ).generate_pdf(pdf_buffer)
         return pdf_buffer
 
-    def send_confirmation_emails(self, pdf_file, site_name):
+    @staticmethod
+    def get_site_email_settings():
+        """
+        Returns the sender and branding of receipt emails for the current
+        site. Only requests know their site, so this is read before the
+        receipt is handed over to a celery task.
+        """
+        return {
+            'from_address': configuration_helpers.get_value('email_from_address', settings.PAYMENT_SUPPORT_EMAIL),
+            'platform_name': configuration_helpers.get_value('platform_name', settings.PLATFORM_NAME),
+            'payment_support_email': configuration_helpers.get_value(
+                'payment_support_email', settings.PAYMENT_SUPPORT_EMAIL,
+            ),
+            'payment_email_signature': configuration_helpers.get_value('payment_email_signature'),
+        }
+
+    def send_confirmation_emails(self, pdf_file, site_name, site_settings=None):
         """
         send confirmation e-mail
+
+        `site_settings` are the values of get_site_email_settings, read from
+        the current site when not given.
         """
+        if site_settings is None:
+            site_settings = self.get_site_email_settings()
         recipient_list = [(self.user.username, self.user.email,
                            'user')]  # pylint: disable=no-member
 
@@ -392,10 +495,7 @@ class ProgramOrder(TimeStampedModel):
             dashboard=reverse('dashboard')
         )
         try:
-            from_address = configuration_helpers.get_value(
-                'email_from_address',
-                settings.PAYMENT_SUPPORT_EMAIL
-            )
+            from_address = site_settings['from_address']
             # Send a unique email for each recipient. Don't put all email
             # addresses in a single email.
             for recipient in recipient_list:
@@ -412,11 +512,9 @@ class ProgramOrder(TimeStampedModel):
                             username=self.user.username, email=self.user.email
                         ),
                         'has_billing_info': settings.FEATURES['STORE_BILLING_INFO'],
-                        'platform_name': configuration_helpers.get_value('platform_name', settings.PLATFORM_NAME),
-                        'payment_support_email': configuration_helpers.get_value(
-                            'payment_support_email', settings.PAYMENT_SUPPORT_EMAIL,
-                        ),
-                        'payment_email_signature': configuration_helpers.get_value('payment_email_signature'),
+                        'platform_name': site_settings['platform_name'],
+                        'payment_support_email': site_settings['payment_support_email'],
+                        'payment_email_signature': site_settings['payment_email_signature'],
                     }
                 )
                 email = EmailMessage(
@@ -438,6 +536,7 @@ class ProgramOrder(TimeStampedModel):
         # sadly need to handle diff. mail backends individually
         except (smtplib.SMTPException, BotoServerError):
             log.error('Failed sending confirmation e-mail for order %d', self.id)
+            raise
 
     def purchase(self, first='', last='', street1='', street2='', city='', state='', postalcode='',
                  country='', processor_reply_dump=''):
@@ -477,27 +576,21 @@ class ProgramOrder(TimeStampedModel):
         # save these changes on the order, then we can tell when we are in an
         # inconsistent state
         self.save()
-        # this should return all of the objects with the correct types of the
-        # subclasses
+
+        # Coupons only count as redeemed once the order is paid for.
+        ProgramCoupon.add_redemptions(
+            list(ProgramCouponRedemption.objects.filter(order=self).values_list('coupon_id', flat=True)), 1
+        )
 
         site_name = configuration_helpers.get_value(
             'SITE_NAME', settings.SITE_NAME)
 
-        try:
-            pdf_file = self.generate_pdf_receipt()
-        except Exception:  # pylint: disable=broad-except
-            log.exception('Exception at creating pdf file.')
-            pdf_file = None
-
-        try:
-            self.send_confirmation_emails(pdf_file, site_name)
-        except Exception:  # pylint: disable=broad-except
-            # Catch all exceptions here, since the Django view implicitly
-            # wraps this in a transaction.  If the order completes successfully,
-            # we don't want to roll back just because we couldn't send
-            # the confirmation email.
-            log.exception(
-                'Error occurred while sending payment confirmation email')
+        # The receipt is rendered and mailed in the background so the payment
+        # processor callback returns right away.
+        from .tasks import send_program_receipt
+        send_program_receipt.apply_async(
+            args=[self.id, site_name, self.get_site_email_settings()], countdown=TASK_COMMIT_COUNTDOWN
+        )
 
 
 class ProgramEnrollment(TimeStampedModel):
@@ -524,6 +617,10 @@ class ProgramEnrollment(TimeStampedModel):
 
     @classmethod
     def enroll(cls, user, program_id):
+        """
+        Enroll `user` in a program, the program courses are enrolled in the
+        background by the enroll_in_program_courses task.
+        """
         try:
             program = Program.objects.get(pk=program_id)
         except:
@@ -536,8 +633,13 @@ class ProgramEnrollment(TimeStampedModel):
         change_course_enrollment.is_active = True
         change_course_enrollment.save()
 
-        for course in program.courses.select_related():
-            CourseEnrollment.enroll(user, course.course_key)
+        # The task waits for this transaction to commit, see
+        # micro_masters.tasks.
+        from .tasks import enroll_in_program_courses
+        enroll_in_program_courses.apply_async(
+            args=[user.id, program.id, to_timestamp(change_course_enrollment.modified)],
+            countdown=TASK_COMMIT_COUNTDOWN,
+        )
         return True
 
     @classmethod
@@ -547,14 +649,43 @@ class ProgramEnrollment(TimeStampedModel):
         except:
             return False
 
-        for course in program.courses.select_related():
-            CourseEnrollment.unenroll(user, course.course_key)
         change_course_enrollment = cls.objects.get(user=user, program=program)
         change_course_enrollment.is_active = False
         change_course_enrollment.save()
 
+        from .tasks import unenroll_from_program_courses
+        unenroll_from_program_courses.apply_async(
+            args=[user.id, program.id, to_timestamp(change_course_enrollment.modified)],
+            countdown=TASK_COMMIT_COUNTDOWN,
+        )
         return True
 
+    @classmethod
+    def bulk_enroll(cls, program, users):
+        """
+        Enroll a cohort of `users` in `program` and queue their enrollment in
+        the program courses. Safe to repeat: it only completes what is
+        missing. Returns the number of newly enrolled users.
+        """
+        user_ids = set(user.id for user in users)
+        existing = dict(cls.objects.filter(program=program, user_id__in=user_ids).values_list('user_id', 'is_active'))
+        inactive = [user_id for user_id, is_active in existing.iteritems() if not is_active]
+        missing = user_ids - set(existing)
+        # Every enrollment of the cohort is touched, so the task can tell
+        # when this transaction committed.
+        now = timezone.now()
+        with transaction.atomic():
+            cls.objects.filter(program=program, user_id__in=list(existing)).update(is_active=True, modified=now)
+            cls.objects.bulk_create([cls(user_id=user_id, program=program, is_active=True) for user_id in missing])
+
+        if user_ids:
+            from .tasks import enroll_cohort_in_program_courses
+            enroll_cohort_in_program_courses.apply_async(
+                args=[program.id, sorted(user_ids), to_timestamp(now)],
+                countdown=TASK_COMMIT_COUNTDOWN,
+            )
+        return len(missing) + len(inactive)
+
 
 class ProgramCoupon(TimeStampedModel):
     """
@@ -565,6 +696,7 @@ class ProgramCoupon(TimeStampedModel):
         app_label = 'micro_masters'
         verbose_name = 'Program Coupon'
         verbose_name_plural = 'Program Coupons'
+        index_together = (('code', 'is_active'),)
 
     code = models.CharField(max_length=32, db_index=True)
     description = models.CharField(max_length=255, null=True, blank=True)
@@ -572,6 +704,7 @@ class ProgramCoupon(TimeStampedModel):
     percentage_discount = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     expiration_date = models.DateTimeField(null=True, blank=True)
+    redemption_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __unicode__(self):
         return "[Coupon] code: {} program: {}".format(self.code, self.program.name)
@@ -583,6 +716,19 @@ class ProgramCoupon(TimeStampedModel):
         """
         return (self.expiration_date - timedelta(days=1)).strftime("%B %d, %Y") if self.expiration_date else None
 
+    @classmethod
+    def add_redemptions(cls, coupon_ids, count):
+        """
+        Atomically add `count`, possibly negative, to the redemption counters
+        of `coupon_ids`, which count the purchased orders using the coupon.
+        """
+        if not coupon_ids:
+            return
+        coupons = cls.objects.filter(id__in=coupon_ids)
+        if count < 0:
+            coupons = coupons.filter(redemption_count__gte=-count)
+        coupons.update(redemption_count=models.F('redemption_count') + count)
+
 
 class ProgramCouponRedemption(TimeStampedModel):
     """
@@ -611,7 +757,7 @@ class ProgramCouponRedemption(TimeStampedModel):
         add coupon info into coupon_redemption model
         """
         is_redemption_applied = False
-        coupon_redemptions = cls.objects.filter(order=order, user=order.user)
+        coupon_redemptions = cls.objects.filter(order=order, user=order.user).select_related('coupon')
         for coupon_redemption in coupon_redemptions:
             if coupon_redemption.coupon.code != coupon.code or coupon_redemption.coupon.id == coupon.id:
                 log.exception(
@@ -621,7 +767,7 @@ class ProgramCouponRedemption(TimeStampedModel):
                 )
                 raise MultipleCouponsNotAllowedException
 
-        if order.program.id == coupon.program.id:
+        if order.program_id == coupon.program_id:
             coupon_redemption = cls(order=order, user=order.user, coupon=coupon)
             coupon_redemption.save()
             discount_price = cls.get_discount_price(coupon.percentage_discount, order.item_price)
@@ -642,7 +788,7 @@ class ProgramCouponRedemption(TimeStampedModel):
         This method delete coupon redemption
         """
         coupon_redemption = cls.objects.filter(user=user, order=order)
-        if coupon_redemption:
+        if coupon_redemption.exists():
             coupon_redemption.delete()
             log.info(u'Coupon redemption entry removed for user %s for order %s', user, order.id)
 
@@ -729,3 +875,90 @@ class ProgramGeneratedCertificate(TimeStampedModel):
             except Exception, e:
                 return False
         return False
+
+
+class PurchaseLedgerEntry(TimeStampedModel):
+    """
+    One row per fulfilled order of a user, course seats and registration
+    codes from the shopping cart as well as programs.
+
+    Entries are appended when orders are fulfilled and only flagged when
+    refunded, so order history pages read a single indexed range.
+    """
+    COURSE_ORDER = 'course'
+    PROGRAM_ORDER = 'program'
+    ORDER_KINDS = (
+        (COURSE_ORDER, 'course'),
+        (PROGRAM_ORDER, 'program'),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=16, choices=ORDER_KINDS)
+    order_number = models.IntegerField()
+    title = models.CharField(max_length=255, blank=True, default='')
+    price = models.DecimalField(default=0, decimal_places=2, max_digits=30)
+    org = models.CharField(max_length=255, blank=True, default='')
+    purchase_time = models.DateTimeField()
+    refunded = models.BooleanField(default=False)
+
+    class Meta:
+        app_label = 'micro_masters'
+        verbose_name = 'Purchase Ledger Entry'
+        verbose_name_plural = 'Purchase Ledger'
+        unique_together = (('kind', 'order_number'),)
+        index_together = (('user', 'refunded', 'purchase_time'),)
+
+    def __unicode__(self):
+        return u'{} {} #{}'.format(self.user_id, self.kind, self.order_number)
+
+    def __repr__(self):
+        return self.__unicode__()
+
+    @property
+    def receipt_url(self):
+        if self.kind == self.PROGRAM_ORDER:
+            return reverse(
+                'openedx.core.djangoapps.micro_masters.views.show_program_receipt',
+                kwargs={'ordernum': self.order_number}
+            )
+        return reverse('shoppingcart.views.show_receipt', kwargs={'ordernum': self.order_number})
+
+    @classmethod
+    def record(cls, user_id, kind, order_number, title, price, purchase_time, org=''):
+        """
+        Append the entry of a fulfilled order, recording an order twice is a no-op.
+        """
+        entry, _created = cls.objects.get_or_create(
+            kind=kind,
+            order_number=order_number,
+            defaults={
+                'user_id': user_id,
+                'title': title[:255],
+                'price': price,
+                'org': org,
+                'purchase_time': purchase_time,
+            }
+        )
+        return entry
+
+    @classmethod
+    def mark_refunded(cls, kind, order_number):
+        cls.objects.filter(kind=kind, order_number=order_number).update(refunded=True)
+
+    @classmethod
+    def history(cls, user, course_org_filter=None, org_filter_out_set=()):
+        """
+        Return the purchased orders of `user`, most recent first.
+
+        Course orders follow the microsite rules of the shopping cart order
+        history: only orders of the current microsite ORG, or outside of any
+        microsite ORG when not in a microsite. Program orders are always listed.
+        """
+        entries = cls.objects.filter(user=user, refunded=False).order_by('-purchase_time', '-id')
+        if course_org_filter:
+            entries = entries.filter(
+                models.Q(kind=cls.PROGRAM_ORDER) | models.Q(kind=cls.COURSE_ORDER, org=course_org_filter)
+            )
+        elif org_filter_out_set:
+            entries = entries.exclude(kind=cls.COURSE_ORDER, org__in=org_filter_out_set)
+        return entries
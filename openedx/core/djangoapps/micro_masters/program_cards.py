@@ -0,0 +1,177 @@
+"""
+Program cards: the catalog representation of a program, cached per program.
+
+A card holds everything the catalog pages render for a program, including
+its courses, instructors, institution and language, so listing programs
+costs a single cache multi-get once the cards are built. Cards are dropped
+by the signal handlers whenever the program or one of its course overviews
+changes, and rebuilt in bulk on the next read.
+"""
+import pytz
+from datetime import datetime
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+from .course_sync import deferred_course_sync
+from .models import Program
+
+# Bump the version when the card format changes.
+PROGRAM_CARD_CACHE_KEY = u'micro_masters.program_card.v1.{}'
+CATALOG_PROGRAMS_CACHE_KEY = 'micro_masters.catalog_program_ids'
+
+
+def _file_url(field):
+    return field.url if field else ''
+
+
+def _card_key(program_id):
+    return PROGRAM_CARD_CACHE_KEY.format(program_id)
+
+
+def load_course_overviews(course_keys):
+    """
+    Return {course_key: CourseOverview} for `course_keys` with a single query,
+    generating only the overviews that are missing or outdated.
+    """
+    course_keys = set(course_keys)
+    overviews = dict(
+        (overview.id, overview)
+        for overview in CourseOverview.objects.filter(id__in=course_keys, version__gte=CourseOverview.VERSION)
+    )
+    missing = course_keys - set(overviews)
+    if missing:
+        with deferred_course_sync():
+            for overview in CourseOverview.get_select_courses(list(missing)):
+                overviews[overview.id] = overview
+    return overviews
+
+
+def _course_card(overview):
+    return {
+        'id': unicode(overview.id),
+        'display_name': overview.display_name_with_default,
+        'display_org_with_default': overview.display_org_with_default,
+        'display_number_with_default': overview.display_number_with_default,
+        'course_image_url': overview.course_image_url,
+        'short_description': overview.short_description,
+        'effort': overview.effort,
+        'start': overview.start,
+        'end': overview.end,
+    }
+
+
+def _instructor_card(instructor):
+    return {
+        'name': instructor.name,
+        'designation': instructor.designation,
+        'profile_image_url': _file_url(instructor.profile_image),
+        'institution': instructor.institution.name if instructor.institution else None,
+    }
+
+
+def _build_cards(program_ids):
+    """
+    Build the cards of `program_ids` with a fixed number of queries.
+    """
+    programs = Program.objects.filter(id__in=program_ids).select_related('language', 'subject', 'institution')
+
+    course_keys = defaultdict(list)
+    for link in Program.courses.through.objects.filter(
+            program_id__in=program_ids
+    ).select_related('courses').order_by('id'):
+        course_keys[link.program_id].append(link.courses.course_key)
+
+    instructors = defaultdict(list)
+    for link in Program.instructors.through.objects.filter(
+            program_id__in=program_ids
+    ).select_related('instructor__institution').order_by('id'):
+        instructors[link.program_id].append(_instructor_card(link.instructor))
+
+    overviews = load_course_overviews(
+        course_key for program_course_keys in course_keys.itervalues() for course_key in program_course_keys
+    )
+
+    cards = {}
+    for program in programs:
+        institution = program.institution
+        cards[program.id] = {
+            'id': program.id,
+            'name': program.name,
+            'start': program.start,
+            'end': program.end,
+            'price': program.price,
+            'short_description': program.short_description,
+            'banner_image_url': _file_url(program.banner_image),
+            'average_length': program.average_length,
+            'effort': program.effort,
+            'language': program.language.name if program.language else None,
+            'subject': program.subject.name if program.subject else None,
+            'institution': {
+                'name': institution.name,
+                'website_url': institution.website_url,
+                'logo_url': _file_url(institution.logo),
+            } if institution else None,
+            'instructors': instructors[program.id],
+            'courses': [
+                _course_card(overviews[course_key])
+                for course_key in course_keys[program.id] if course_key in overviews
+            ],
+        }
+    return cards
+
+
+def get_program_cards(program_ids):
+    """
+    Return the cards of `program_ids` in the same order, skipping programs
+    that do not exist. Cached cards are read with one multi-get and the
+    missing ones are built together and cached.
+    """
+    program_ids = [int(program_id) for program_id in program_ids]
+    cached = cache.get_many([_card_key(program_id) for program_id in program_ids])
+    cards = dict((card['id'], card) for card in cached.itervalues())
+
+    missing = [program_id for program_id in program_ids if program_id not in cards]
+    if missing:
+        built = _build_cards(missing)
+        cache.set_many(dict((_card_key(program_id), card) for program_id, card in built.iteritems()), None)
+        cards.update(built)
+    return [cards[program_id] for program_id in program_ids if program_id in cards]
+
+
+def get_catalog_program_cards():
+    """
+    Return the cards of the programs that have started, in catalog order.
+    """
+    program_ids = cache.get(CATALOG_PROGRAMS_CACHE_KEY)
+    if program_ids is None:
+        program_ids = list(Program.objects.order_by('id').values_list('id', flat=True))
+        cache.set(CATALOG_PROGRAMS_CACHE_KEY, program_ids, None)
+
+    today = datetime.now(pytz.UTC).date()
+    return [
+        card for card in get_program_cards(program_ids)
+        if card['start'] is None or card['start'] <= today
+    ]
+
+
+def invalidate_program_cards(program_ids, catalog=False):
+    """
+    Drop the cached cards of `program_ids`, and the catalog listing with `catalog`.
+    """
+    keys = [_card_key(program_id) for program_id in program_ids]
+    if catalog:
+        keys.append(CATALOG_PROGRAMS_CACHE_KEY)
+    if keys:
+        cache.delete_many(keys)
+
+
+def invalidate_course_program_cards(course_key):
+    """
+    Drop the cached cards of the programs containing `course_key`.
+    """
+    invalidate_program_cards([
+        program_id for program_id, __, __ in Program.course_programs_index().get(unicode(course_key), [])
+    ])
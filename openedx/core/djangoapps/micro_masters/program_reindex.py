@@ -1,58 +1,103 @@
 """Program reindex"""
 
+import json
+import hashlib
+import logging
 import pytz
 from datetime import datetime
 
-from django.http import HttpResponse
-from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import JsonResponse
 from django.contrib.auth.decorators import user_passes_test
 
 from opaque_keys.edx.keys import CourseKey
 from search.search_engine_base import SearchEngine
 from .models import Program
 
+log = logging.getLogger("micro_masters")
 
-@user_passes_test(lambda u: u.is_superuser)
-def index_programs_information(request):
+INDEX_NAME = "courseware_index"
+DOCUMENT_TYPE = 'course_info'
+INDEX_BATCH_SIZE = 100
+CONTENT_HASH_CACHE_KEY = u'micro_masters.program_index_hash.{}'
+
+
+def program_document(program):
+    """
+    Course discovery document of a program.
+    """
+    return {
+        'id': program.id,
+        'course': program.id,
+        'content': {
+            'display_name': program.name,
+            'overview': program.overview
+        },
+        'image_url': program.banner_image.url,
+        'start': program.start,
+        'language': program.language.code if program.language else None,
+        'subject': program.subject.name if program.subject else None,
+        'is_program': True,
+    }
+
+
+def _content_hash(document):
+    return hashlib.sha1(json.dumps(document, sort_keys=True, default=unicode)).hexdigest()
+
+
+def reindex_programs(program_ids=None, force=False):
     """
-    Add all the program to the course discovery index
+    Add started programs to the course discovery index in batches, skipping
+    programs whose document did not change since they were last indexed.
 
+    With `program_ids` only those programs are considered, and the ones that
+    no longer exist or have not started are removed from the index.
+    Returns the number of documents sent to the index.
     """
-    INDEX_NAME = "courseware_index"
     searcher = SearchEngine.get_search_engine(INDEX_NAME)
     if not searcher:
-        return
-
-    programs = Program.objects.all()
-    for program in programs:
-        if program.start <= datetime.now(pytz.UTC).date():
-            program_info = {
-                'id': program.id,
-                'course': program.id,
-                'content': {
-                    'display_name': program.name,
-                    'overview': program.overview
-                },
-                'image_url': program.banner_image.url,
-                'start': program.start,
-                'language': program.language.code,
-                'subject': program.subject.name,
-                'is_program': True,
-            }
-        # Broad exception handler to protect around and report problems with indexing
-            try:
-                searcher.index('course_info', [program_info])
-            except:  # pylint: disable=bare-except
-                log.exception(
-                    "Program discovery indexing error encountered %s",
-                    program_info.get('id',''),
-                )
-                return HttpResponse({
-                    'success': False,
-                    'error': 'Program discovery indexing error encountered '
-                })
-                raise
-    return HttpResponse({'success': True})
+        return 0
+
+    programs = Program.objects.select_related('language', 'subject').filter(
+        Q(start__isnull=True) | Q(start__lte=datetime.now(pytz.UTC).date())
+    )
+    if program_ids is not None:
+        programs = programs.filter(id__in=program_ids)
+    documents = [program_document(program) for program in programs]
+
+    if program_ids is not None:
+        removed = set(program_ids) - set(document['id'] for document in documents)
+        if removed:
+            searcher.remove(DOCUMENT_TYPE, list(removed))
+            cache.delete_many([CONTENT_HASH_CACHE_KEY.format(program_id) for program_id in removed])
+
+    indexed_hashes = cache.get_many([CONTENT_HASH_CACHE_KEY.format(document['id']) for document in documents])
+    changed = []
+    for document in documents:
+        content_hash = _content_hash(document)
+        if force or indexed_hashes.get(CONTENT_HASH_CACHE_KEY.format(document['id'])) != content_hash:
+            changed.append((document, content_hash))
+
+    for start in range(0, len(changed), INDEX_BATCH_SIZE):
+        batch = changed[start:start + INDEX_BATCH_SIZE]
+        searcher.index(DOCUMENT_TYPE, [document for document, _ in batch])
+        cache.set_many(
+            dict((CONTENT_HASH_CACHE_KEY.format(document['id']), content_hash) for document, content_hash in batch),
+            None
+        )
+    return len(changed)
+
+
+@user_passes_test(lambda u: u.is_superuser)
+def index_programs_information(request):
+    """
+    Queue the indexing of all the programs to the course discovery index
+
+    """
+    from .tasks import index_programs
+    index_programs.delay(force=True)
+    return JsonResponse({'success': True})
 
 
 def index_course_programs(course_id):
@@ -60,38 +105,7 @@ def index_course_programs(course_id):
     reindex only the program that containts course
 
     """
-    INDEX_NAME = "courseware_index"
-    searcher = SearchEngine.get_search_engine(INDEX_NAME)
-    if not searcher:
-        return
     course_key = CourseKey.from_string(course_id)
-    programs = Program.objects.filter(courses__course_key=course_key)
-    for program in programs:
-        if program.start <= datetime.now(pytz.UTC).date():
-            program_info = {
-                'id': program.id,
-                'course': program.id,
-                'content': {
-                    'display_name': program.name,
-                    'overview': program.overview
-                },
-                'image_url': program.banner_image.url,
-                'start': program.start,
-                'language': program.language.code,
-                'subject': program.subject.name,
-                'is_program': True,
-            }
-        # Broad exception handler to protect around and report problems with indexing
-            try:
-                searcher.index('course_info', [program_info])
-            except:  # pylint: disable=bare-except
-                log.exception(
-                    "Program discovery indexing error encountered %s",
-                    program_info.get('id',''),
-                )
-                return HttpResponse({
-                    'success': False,
-                    'error': 'Program discovery indexing error encountered '
-                })
-                raise
-    return HttpResponse({'success': True})
+    program_ids = list(Program.objects.filter(courses__course_key=course_key).values_list('id', flat=True))
+    if program_ids:
+        reindex_programs(program_ids)
@@ -0,0 +1,184 @@
+"""
+Program and course progress of learners, computed from bulk loaded rows.
+"""
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db.models import Count
+
+from student.models import CourseEnrollment
+from leaderboard.models import LeaderBoard
+
+from .models import Program, ProgramEnrollment, ProgramGeneratedCertificate
+
+
+def _program_courses(program_ids):
+    """
+    Return {program_id: [Courses]} for `program_ids` with a single join.
+    """
+    courses = defaultdict(list)
+    links = Program.courses.through.objects.filter(
+        program_id__in=program_ids
+    ).select_related('courses').order_by('id')
+    for link in links:
+        courses[link.program_id].append(link.courses)
+    return courses
+
+
+def _course_grades(user, course_keys):
+    """
+    Return {course_key: {'points', 'pass'}} of `user` for `course_keys`.
+    """
+    course_keys_by_id = dict((unicode(course_key), course_key) for course_key in course_keys)
+    grades = dict((course_key, {'points': 0, 'pass': False}) for course_key in course_keys)
+    rows = LeaderBoard.objects.filter(
+        student=user,
+        course_id__in=course_keys_by_id.keys()
+    ).values_list('course_id', 'points', 'has_passed')
+    for course_id, points, has_passed in rows:
+        grades[course_keys_by_id[course_id]] = {'points': points or 0, 'pass': has_passed}
+    return grades
+
+
+class ProgramProgress(object):
+    """
+    Course grades and program progress of a user for the learner dashboard.
+
+    Everything is loaded in a fixed number of queries whatever the number of
+    enrollments or program courses.
+    """
+
+    def __init__(self, user, course_enrollments):
+        self.user = user
+        self.program_enrollments = list(
+            ProgramEnrollment.objects.filter(user=user, is_active=True).select_related('program')
+        )
+        self.courses_by_program = _program_courses([
+            program_enrollment.program_id for program_enrollment in self.program_enrollments
+        ])
+
+        enrollments = dict((enrollment.course_id, enrollment) for enrollment in course_enrollments)
+        self.dashboard_course_keys = set(enrollments)
+        program_course_keys = set(
+            course.course_key for courses in self.courses_by_program.itervalues() for course in courses
+        )
+        missing = program_course_keys - set(enrollments)
+        if missing:
+            # Inactive enrollments are not on the dashboard but count for programs.
+            for enrollment in CourseEnrollment.objects.filter(user=user, course_id__in=missing):
+                enrollments[enrollment.course_id] = enrollment
+        self.enrollments = enrollments
+
+        self.course_grades = _course_grades(user, set(enrollments) | program_course_keys)
+        self.certificates = list(
+            ProgramGeneratedCertificate.objects.filter(user=user, issued=True).select_related('program')
+        )
+
+    def dashboard_context(self, course_enrollments):
+        """
+        Return the program section context of the dashboard, and remove the
+        enrollments shown within programs from `course_enrollments`.
+        """
+        programs = {}
+        program_grades = {}
+        program_course_states = {}
+        for program_enrollment in self.program_enrollments:
+            program = program_enrollment.program
+            program_courses = self.courses_by_program[program.id]
+            courses = []
+            program_grade = 0.0
+            states = {'in_progress': 0, 'passed': 0, 'not_started': 0}
+            for course in program_courses:
+                course_enroll = self.enrollments.get(course.course_key)
+                courses.append(course_enroll)
+                if course_enroll in course_enrollments:
+                    course_enrollments.remove(course_enroll)
+                course_grade = self.course_grades[course.course_key]
+                program_grade += course_grade['points']
+                if not course_grade['points']:
+                    states['not_started'] += 1
+                elif course_grade['pass']:
+                    states['passed'] += 1
+                else:
+                    states['in_progress'] += 1
+
+            program_course_states[program] = states
+            program_grades[program] = program_grade / len(program_courses) if program_courses else 0
+            programs[program] = courses
+
+        return {
+            'programs': programs,
+            'user_program_grades': program_grades,
+            'user_course_grades': dict(
+                (course_key, grade) for course_key, grade in self.course_grades.iteritems()
+                if course_key in self.dashboard_course_keys
+            ),
+            'user_program_certificates': self.certificates,
+            'program_course_states': program_course_states,
+        }
+
+
+def update_program_certificates(user, course_key, has_passed):
+    """
+    Issue or revoke the certificates of the programs containing `course_key`
+    that `user` is enrolled in, after their grade in that course changed.
+    """
+    programs = list(Program.objects.filter(
+        courses__course_key=course_key,
+        programenrollment__user=user,
+        programenrollment__is_active=True
+    ).distinct())
+    if not programs:
+        return
+
+    courses_by_program = _program_courses([program.id for program in programs])
+    course_keys = set(course.course_key for courses in courses_by_program.itervalues() for course in courses)
+    passed = set(
+        course_key for course_key, grade in _course_grades(user, course_keys).iteritems() if grade['pass']
+    )
+    # The leaderboard row of this course may not be written yet.
+    if has_passed:
+        passed.add(course_key)
+    else:
+        passed.discard(course_key)
+
+    for program in programs:
+        program_course_keys = set(course.course_key for course in courses_by_program[program.id])
+        issued = bool(program_course_keys) and program_course_keys <= passed
+        ProgramGeneratedCertificate.create_user_certificate(user, program, issued)
+
+
+def issue_missing_program_certificates(program_ids=None):
+    """
+    Issue the certificates of the active learners of the programs, or of
+    `program_ids`, who passed every course of a program but hold no issued
+    certificate for it, such as learners who passed before certificates were
+    issued on grade changes. Returns the number of certificates issued.
+    """
+    programs = Program.objects.all()
+    if program_ids is not None:
+        programs = programs.filter(id__in=program_ids)
+    programs = list(programs)
+    courses_by_program = _program_courses([program.id for program in programs])
+
+    issued = 0
+    for program in programs:
+        course_ids = set(unicode(course.course_key) for course in courses_by_program[program.id])
+        if not course_ids:
+            continue
+        rows = LeaderBoard.objects.filter(
+            student__in=ProgramEnrollment.objects.filter(program=program, is_active=True).values('user_id'),
+            course_id__in=course_ids,
+            has_passed=True
+        ).exclude(
+            student__in=ProgramGeneratedCertificate.objects.filter(program=program, issued=True).values('user_id')
+        ).values(
+            'student'
+        ).annotate(
+            passed=Count('course_id', distinct=True)
+        ).order_by()
+        user_ids = [row['student'] for row in rows if row['passed'] == len(course_ids)]
+        for user in User.objects.filter(id__in=user_ids):
+            ProgramGeneratedCertificate.create_user_certificate(user, program, issued=True)
+            issued += 1
+    return issued
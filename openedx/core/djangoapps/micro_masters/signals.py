@@ -2,16 +2,30 @@
 Signal handler for invalidating cached course overviews
 """
 from django.dispatch.dispatcher import receiver
-from django.db.models.signals import post_save
+from django.db.models import Q
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
 
-from .models import Courses
+from .models import (
+    TASK_COMMIT_COUNTDOWN, Courses, Institution, Instructor, Language, Program, ProgramCoupon, ProgramOrder,
+    PurchaseLedgerEntry
+)
+from .coupons import invalidate_program_coupons
+from .course_sync import defer_course_sync
+from .ledger import record_course_order_item, refund_course_order_item, record_program_order
+from .program_cards import invalidate_program_cards, invalidate_course_program_cards
+from .progress import update_program_certificates
+from .tasks import index_programs
 from xmodule.modulestore.django import SignalHandler
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from lms.djangoapps.grades.signals.signals import COURSE_GRADE_CHANGED
+from shoppingcart.models import PaidCourseRegistration, CourseRegCodeItem, CertificateItem
 
 
 @receiver(post_save, sender=CourseOverview)
 def _listen_for_course_publish(sender, instance, **kwargs):
-    Courses.create_or_update_from_course_overview(instance)
+    if not defer_course_sync(instance.id):
+        Courses.create_or_update_from_course_overview(instance)
+    invalidate_course_program_cards(instance.id)
 
 
 @receiver(SignalHandler.course_deleted)
@@ -21,3 +35,110 @@ def _listen_for_course_delete(sender, course_key, **kwargs):  # pylint: disable=
     invalidates the corresponding Course cache entry if one exists.
     """
     Courses.objects.filter(course_key=course_key).delete()
+
+
+@receiver(COURSE_GRADE_CHANGED)
+def _listen_for_course_grade_change(sender, user, course, grade, **kwargs):  # pylint: disable=unused-argument
+    """
+    Issues or revokes the certificates of the user's programs containing
+    the course, the same passing rule as the leaderboard applies.
+    """
+    has_passed = grade.percent * 100 >= course.lowest_passing_grade * 100
+    update_program_certificates(user, course.id, has_passed)
+
+
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+@receiver(post_delete, sender=Courses)
+@receiver(m2m_changed, sender=Program.courses.through)
+def _invalidate_course_programs_index(sender, **kwargs):  # pylint: disable=unused-argument
+    Program.invalidate_course_programs_index()
+
+
+@receiver(post_save, sender=Program)
+@receiver(m2m_changed, sender=Program.courses.through)
+@receiver(m2m_changed, sender=Program.instructors.through)
+def _listen_for_program_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Reindexes the program, unchanged documents are skipped by the task.
+    """
+    action = kwargs.get('action')
+    if action is not None and not action.startswith('post_'):
+        return
+    if isinstance(instance, Program):
+        program_ids = [instance.id]
+    else:
+        # Reverse side of the relation, the changed programs are in pk_set.
+        program_ids = list(kwargs.get('pk_set') or [])
+    if program_ids:
+        index_programs.apply_async(args=[program_ids], countdown=TASK_COMMIT_COUNTDOWN)
+
+
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+@receiver(m2m_changed, sender=Program.courses.through)
+@receiver(m2m_changed, sender=Program.instructors.through)
+def _invalidate_program_cards(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drops the cached catalog cards of the changed programs.
+    """
+    if isinstance(instance, Program):
+        invalidate_program_cards([instance.id], catalog=kwargs.get('action') is None)
+    else:
+        invalidate_program_cards(kwargs.get('pk_set') or [])
+
+
+@receiver(post_save, sender=Instructor)
+@receiver(post_save, sender=Institution)
+@receiver(post_save, sender=Language)
+def _invalidate_related_program_cards(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    if sender is Instructor:
+        programs = Program.objects.filter(instructors=instance)
+    elif sender is Institution:
+        programs = Program.objects.filter(Q(institution=instance) | Q(instructors__institution=instance))
+    else:
+        programs = Program.objects.filter(language=instance)
+    invalidate_program_cards(set(programs.values_list('id', flat=True)))
+
+
+@receiver(post_delete, sender=Program)
+def _listen_for_program_delete(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    index_programs.apply_async(args=[[instance.id]], countdown=TASK_COMMIT_COUNTDOWN)
+
+
+@receiver(post_save, sender=PaidCourseRegistration)
+@receiver(post_save, sender=CourseRegCodeItem)
+@receiver(post_save, sender=CertificateItem)
+def _listen_for_course_order_item(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Keeps the purchase ledger in step with fulfilled and refunded course items.
+    """
+    if instance.status == 'purchased':
+        record_course_order_item(instance)
+    elif instance.status == 'refunded':
+        refund_course_order_item(instance)
+
+
+@receiver(post_save, sender=ProgramOrder)
+def _listen_for_program_order(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    if instance.status == 'purchased':
+        record_program_order(instance)
+    elif instance.status == 'refunded':
+        PurchaseLedgerEntry.mark_refunded(PurchaseLedgerEntry.PROGRAM_ORDER, instance.id)
+
+
+@receiver(pre_save, sender=ProgramCoupon)
+def _listen_for_program_coupon_edit(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drops the cached coupons of the previous code when a coupon is renamed.
+    """
+    if instance.pk:
+        previous_code = ProgramCoupon.objects.filter(pk=instance.pk).values_list('code', flat=True).first()
+        if previous_code != instance.code:
+            invalidate_program_coupons(previous_code)
+
+
+@receiver(post_save, sender=ProgramCoupon)
+@receiver(post_delete, sender=ProgramCoupon)
+def _invalidate_program_coupons(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_program_coupons(instance.code)
@@ -0,0 +1,142 @@
+"""
+Asynchronous tasks for program enrollments, indexing and orders.
+"""
+import smtplib
+from io import BytesIO
+from logging import getLogger
+
+# this is a super-class of SESError and catches connection errors
+from boto.exception import BotoServerError
+
+from celery.task import task  # pylint: disable=import-error,no-name-in-module
+from django.contrib.auth.models import User
+from django.db import DatabaseError
+
+from util.date_utils import to_timestamp
+
+from .enrollment import enroll_in_courses, unenroll_from_courses
+from .models import Courses, ProgramEnrollment, ProgramOrder
+
+log = getLogger(__name__)
+
+COHORT_BATCH_SIZE = 100
+
+
+def _program_course_keys(program_id):
+    return list(Courses.objects.filter(program=program_id).values_list('course_key', flat=True))
+
+
+def _committed_enrollments(program_id, user_ids, expected_modified_time):
+    """
+    Returns the program enrollments of `user_ids` keyed by user id, or None
+    while the change the task was queued for is not visible yet.
+
+    The tasks are queued from within the request transaction, so they may
+    run before it commits. Every enrollment changed by the transaction was
+    modified at or after `expected_modified_time`.
+    """
+    enrollments = dict(
+        (enrollment.user_id, enrollment)
+        for enrollment in ProgramEnrollment.objects.filter(program_id=program_id, user_id__in=user_ids)
+    )
+    if len(enrollments) < len(set(user_ids)) or any(
+            to_timestamp(enrollment.modified) < expected_modified_time for enrollment in enrollments.itervalues()
+    ):
+        return None
+    return enrollments
+
+
+@task(bind=True, default_retry_delay=30, max_retries=5)
+def enroll_in_program_courses(self, user_id, program_id, expected_modified_time=0):
+    """
+    Enroll a program learner into all courses of the program.
+    """
+    enrollments = _committed_enrollments(program_id, [user_id], expected_modified_time)
+    if enrollments is None:
+        raise self.retry()
+    if not enrollments[user_id].is_active:
+        # Unenrolled from the program after this task was queued.
+        return
+    try:
+        changed = enroll_in_courses(User.objects.get(pk=user_id), _program_course_keys(program_id))
+    except DatabaseError as exc:
+        raise self.retry(exc=exc)
+    log.info(u'Program %s: enrolled user %s in %d courses.', program_id, user_id, len(changed))
+
+
+@task(bind=True, default_retry_delay=30, max_retries=5)
+def unenroll_from_program_courses(self, user_id, program_id, expected_modified_time=0):
+    """
+    Unenroll a former program learner from all courses of the program.
+    """
+    enrollments = _committed_enrollments(program_id, [user_id], expected_modified_time)
+    if enrollments is None:
+        raise self.retry()
+    if enrollments[user_id].is_active:
+        # Enrolled again after this task was queued.
+        return
+    try:
+        changed = unenroll_from_courses(User.objects.get(pk=user_id), _program_course_keys(program_id))
+    except DatabaseError as exc:
+        raise self.retry(exc=exc)
+    log.info(u'Program %s: unenrolled user %s from %d courses.', program_id, user_id, len(changed))
+
+
+@task(bind=True, default_retry_delay=60, max_retries=5)
+def enroll_cohort_in_program_courses(self, program_id, user_ids, expected_modified_time=0):
+    """
+    Enroll every active program learner of `user_ids` into the program
+    courses, retrying only the users not processed yet on failure.
+    """
+    enrollments = _committed_enrollments(program_id, user_ids, expected_modified_time)
+    if enrollments is None:
+        raise self.retry()
+    course_keys = _program_course_keys(program_id)
+    user_ids = [user_id for user_id in user_ids if enrollments[user_id].is_active]
+    for start in range(0, len(user_ids), COHORT_BATCH_SIZE):
+        batch = user_ids[start:start + COHORT_BATCH_SIZE]
+        try:
+            for user in User.objects.filter(pk__in=batch):
+                enroll_in_courses(user, course_keys)
+        except DatabaseError as exc:
+            raise self.retry(args=[program_id, user_ids[start:], expected_modified_time], exc=exc)
+    log.info(u'Program %s: enrolled a cohort of %d users in its courses.', program_id, len(user_ids))
+
+
+@task(bind=True, default_retry_delay=60, max_retries=3)
+def index_programs(self, program_ids=None, force=False):
+    """
+    Update the course discovery documents of programs, all of them by default.
+    """
+    from .program_reindex import reindex_programs
+    try:
+        indexed = reindex_programs(program_ids, force)
+    except Exception as exc:  # pylint: disable=broad-except
+        raise self.retry(exc=exc)
+    log.info(u'Programs: indexed %d changed program documents.', indexed)
+
+
+@task(bind=True, default_retry_delay=60, max_retries=5)
+def send_program_receipt(self, order_id, site_name, site_settings=None):
+    """
+    Render the pdf receipt of a purchased program order and mail it to the
+    buyer. The rendered receipt is cached, so retries only resend the email.
+
+    `site_settings` are the email settings of the site the order was
+    purchased on, as returned by ProgramOrder.get_site_email_settings.
+    """
+    order = ProgramOrder.objects.select_related('user').get(pk=order_id)
+    if order.status == 'initiate':
+        # The purchase transaction has not committed yet.
+        raise self.retry()
+
+    try:
+        pdf_file = BytesIO(order.receipt_pdf())
+    except Exception:  # pylint: disable=broad-except
+        log.exception(u'Exception at creating pdf file of program order %s.', order_id)
+        pdf_file = None
+
+    try:
+        order.send_confirmation_emails(pdf_file, site_name, site_settings)
+    except (smtplib.SMTPException, BotoServerError) as exc:
+        raise self.retry(exc=exc)
@@ -0,0 +1,57 @@
+"""Provides factories for micro_masters models."""
+import factory
+from factory.django import DjangoModelFactory
+
+from student.tests.factories import UserFactory
+
+from ..models import Courses, Program, ProgramCoupon, ProgramEnrollment, ProgramOrder
+
+# Factories are self documenting
+# pylint: disable=missing-docstring
+
+
+class CoursesFactory(DjangoModelFactory):
+    class Meta(object):
+        model = Courses
+
+    course_key = None
+    name = factory.Sequence(u'Course {0}'.format)
+
+
+class ProgramFactory(DjangoModelFactory):
+    class Meta(object):
+        model = Program
+
+    name = factory.Sequence(u'Program {0}'.format)
+    price = 100
+    banner_image = 'programs/banner.png'
+    introductory_video = 'programs/video.mp4'
+    sample_certificate_pdf = 'programs/certificate.pdf'
+
+
+class ProgramEnrollmentFactory(DjangoModelFactory):
+    class Meta(object):
+        model = ProgramEnrollment
+
+    user = factory.SubFactory(UserFactory)
+    program = factory.SubFactory(ProgramFactory)
+    is_active = True
+
+
+class ProgramOrderFactory(DjangoModelFactory):
+    class Meta(object):
+        model = ProgramOrder
+
+    user = factory.SubFactory(UserFactory)
+    program = factory.SubFactory(ProgramFactory)
+    item_name = factory.LazyAttribute(lambda order: order.program.name)
+    item_price = factory.LazyAttribute(lambda order: order.program.price)
+
+
+class ProgramCouponFactory(DjangoModelFactory):
+    class Meta(object):
+        model = ProgramCoupon
+
+    code = factory.Sequence(u'COUPON{0}'.format)
+    program = factory.SubFactory(ProgramFactory)
+    percentage_discount = 10
@@ -0,0 +1,93 @@
+"""
+Tests for the program coupon lookups and redemption counters.
+"""
+from datetime import datetime, timedelta
+
+import pytz
+from django.test import TestCase
+from mock import patch
+
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+
+from ..coupons import get_active_program_coupons, get_user_coupon_redemptions
+from ..models import ProgramCoupon, ProgramCouponRedemption
+from .factories import ProgramCouponFactory, ProgramOrderFactory
+
+
+class ProgramCouponLookupTest(CacheIsolationTestCase):
+    """
+    Tests that the cached active coupons of a code follow coupon changes.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(ProgramCouponLookupTest, self).setUp()
+        self.coupon = ProgramCouponFactory(code='SAVE10')
+
+    def test_active_coupons_are_cached(self):
+        self.assertEqual(get_active_program_coupons('SAVE10'), [self.coupon])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_active_program_coupons('SAVE10'), [self.coupon])
+
+    def test_expired_coupons_are_skipped(self):
+        self.coupon.expiration_date = datetime.now(pytz.UTC) - timedelta(days=1)
+        self.coupon.save()
+        self.assertEqual(get_active_program_coupons('SAVE10'), [])
+
+    def test_deactivated_coupons_are_invalidated(self):
+        get_active_program_coupons('SAVE10')
+        self.coupon.is_active = False
+        self.coupon.save()
+        self.assertEqual(get_active_program_coupons('SAVE10'), [])
+
+    def test_renamed_coupons_are_invalidated(self):
+        get_active_program_coupons('SAVE10')
+        self.coupon.code = 'SAVE20'
+        self.coupon.save()
+        self.assertEqual(get_active_program_coupons('SAVE10'), [])
+        self.assertEqual(get_active_program_coupons('SAVE20'), [self.coupon])
+
+    def test_deleted_coupons_are_invalidated(self):
+        get_active_program_coupons('SAVE10')
+        self.coupon.delete()
+        self.assertEqual(get_active_program_coupons('SAVE10'), [])
+
+
+@patch('openedx.core.djangoapps.micro_masters.tasks.send_program_receipt.apply_async')
+class ProgramCouponRedemptionTest(TestCase):
+    """
+    Tests that coupons count as redeemed once their order is purchased.
+    """
+    def setUp(self):
+        super(ProgramCouponRedemptionTest, self).setUp()
+        self.coupon = ProgramCouponFactory()
+        self.order = ProgramOrderFactory(program=self.coupon.program)
+
+    def assert_redemption_count(self, count):
+        self.assertEqual(ProgramCoupon.objects.get(id=self.coupon.id).redemption_count, count)
+
+    def test_cart_changes_are_not_counted(self, _mock_receipt):
+        self.assertTrue(ProgramCouponRedemption.add_coupon_redemption(self.coupon, self.order))
+        self.assert_redemption_count(0)
+
+        ProgramCouponRedemption.remove_coupon_redemption_from_cart(self.order.user, self.order)
+        self.assert_redemption_count(0)
+
+    def test_purchase_is_counted(self, _mock_receipt):
+        ProgramCouponRedemption.add_coupon_redemption(self.coupon, self.order)
+        self.assertFalse(get_user_coupon_redemptions(self.order.user, self.coupon.code).exists())
+
+        self.order.purchase()
+        self.assert_redemption_count(1)
+        self.assertEqual(
+            [redemption.coupon for redemption in get_user_coupon_redemptions(self.order.user, self.coupon.code)],
+            [self.coupon]
+        )
+
+        # Purchasing again is refused and not counted twice.
+        self.order.purchase()
+        self.assert_redemption_count(1)
+
+    def test_purchase_without_coupon(self, _mock_receipt):
+        self.order.purchase()
+        self.assert_redemption_count(0)
@@ -0,0 +1,60 @@
+"""
+Tests for the purchase ledger order history.
+"""
+from datetime import datetime, timedelta
+
+import pytz
+from django.test import TestCase
+
+from student.tests.factories import UserFactory
+
+from ..ledger import backfill_purchase_ledger, get_purchase_history
+from ..models import PurchaseLedgerEntry
+from .factories import ProgramOrderFactory
+
+
+class PurchaseHistoryTest(TestCase):
+    """
+    Tests that order history pages are read from the ledger.
+    """
+    def setUp(self):
+        super(PurchaseHistoryTest, self).setUp()
+        self.user = UserFactory()
+        now = datetime.now(pytz.UTC)
+        self.orders = [
+            ProgramOrderFactory(user=self.user, status='purchased', purchase_time=now - timedelta(days=index))
+            for index in range(3)
+        ]
+
+    def assert_history(self, order_history, orders):
+        self.assertEqual([order['number'] for order in order_history], [order.id for order in orders])
+
+    def test_purchases_are_recorded(self):
+        order_history, previous_page, next_page = get_purchase_history(self.user)
+        self.assert_history(order_history, self.orders)
+        self.assertIsNone(previous_page)
+        self.assertIsNone(next_page)
+
+    def test_pages(self):
+        order_history, previous_page, next_page = get_purchase_history(self.user, page=2, page_size=1)
+        self.assert_history(order_history, self.orders[1:2])
+        self.assertEqual((previous_page, next_page), (1, 3))
+
+    def test_history_only_reads_the_ledger(self):
+        # Orders purchased before the ledger was installed.
+        PurchaseLedgerEntry.objects.filter(order_number__in=[order.id for order in self.orders[1:]]).delete()
+
+        order_history, _previous_page, _next_page = get_purchase_history(self.user)
+        self.assert_history(order_history, self.orders[:1])
+
+        self.assertEqual(backfill_purchase_ledger(), 2)
+        order_history, _previous_page, _next_page = get_purchase_history(self.user)
+        self.assert_history(order_history, self.orders)
+        self.assertEqual(backfill_purchase_ledger(), 0)
+
+    def test_refunded_orders_are_hidden(self):
+        self.orders[0].status = 'refunded'
+        self.orders[0].save()
+
+        order_history, _previous_page, _next_page = get_purchase_history(self.user)
+        self.assert_history(order_history, self.orders[1:])
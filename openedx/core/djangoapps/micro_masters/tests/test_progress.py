@@ -0,0 +1,53 @@
+"""
+Tests for the program certificates issued from course grades.
+"""
+from django.test import TestCase
+
+from leaderboard.models import LeaderBoard
+from opaque_keys.edx.locator import CourseLocator
+from student.tests.factories import UserFactory
+
+from ..models import ProgramGeneratedCertificate
+from ..progress import issue_missing_program_certificates
+from .factories import CoursesFactory, ProgramEnrollmentFactory, ProgramFactory
+
+
+class IssueMissingProgramCertificatesTest(TestCase):
+    """
+    Tests that learners who passed their program courses earlier get their
+    program certificate.
+    """
+    def setUp(self):
+        super(IssueMissingProgramCertificatesTest, self).setUp()
+        self.course_keys = [CourseLocator('testx', 'course{}'.format(index), 'run') for index in range(2)]
+        self.program = ProgramFactory()
+        self.program.courses.add(*[CoursesFactory(course_key=course_key) for course_key in self.course_keys])
+
+    def enroll(self, passed_course_keys, is_active=True):
+        user = UserFactory()
+        ProgramEnrollmentFactory(user=user, program=self.program, is_active=is_active)
+        for course_key in self.course_keys:
+            LeaderBoard.objects.create(
+                student=user, course_id=unicode(course_key), points=10, has_passed=course_key in passed_course_keys
+            )
+        return user
+
+    def certified_users(self):
+        return set(
+            certificate.user for certificate in
+            ProgramGeneratedCertificate.objects.filter(program=self.program, issued=True)
+        )
+
+    def test_certificates_are_issued(self):
+        passed = self.enroll(self.course_keys)
+        self.enroll(self.course_keys[:1])
+        self.enroll(self.course_keys, is_active=False)
+
+        self.assertEqual(issue_missing_program_certificates(), 1)
+        self.assertEqual(self.certified_users(), {passed})
+        self.assertEqual(issue_missing_program_certificates([self.program.id]), 0)
+
+    def test_other_programs_are_skipped(self):
+        self.enroll(self.course_keys)
+        self.assertEqual(issue_missing_program_certificates([self.program.id + 1]), 0)
+        self.assertEqual(self.certified_users(), set())
@@ -0,0 +1,158 @@
+"""
+Tests for the program course enrollment tasks.
+"""
+from celery.exceptions import Retry
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+from mock import patch
+
+from opaque_keys.edx.locator import CourseLocator
+from student.models import CourseEnrollment
+from student.tests.factories import CourseEnrollmentFactory, UserFactory
+from util.date_utils import to_timestamp
+
+from ..models import TASK_COMMIT_COUNTDOWN, ProgramEnrollment, ProgramOrder
+from ..tasks import (
+    enroll_cohort_in_program_courses, enroll_in_program_courses, send_program_receipt, unenroll_from_program_courses
+)
+from .factories import CoursesFactory, ProgramEnrollmentFactory, ProgramFactory, ProgramOrderFactory
+
+
+class ProgramCourseEnrollmentTest(TestCase):
+    """
+    Tests that program learners are enrolled in the program courses once
+    their program enrollment committed.
+    """
+    def setUp(self):
+        super(ProgramCourseEnrollmentTest, self).setUp()
+        self.course_keys = [CourseLocator('testx', 'course{}'.format(index), 'run') for index in range(2)]
+        self.program = ProgramFactory()
+        self.program.courses.add(*[CoursesFactory(course_key=course_key) for course_key in self.course_keys])
+        self.user = UserFactory()
+
+    def assert_enrolled(self, user, is_enrolled=True):
+        for course_key in self.course_keys:
+            self.assertEqual(CourseEnrollment.is_enrolled(user, course_key), is_enrolled)
+
+    def test_enroll_and_unenroll(self):
+        # Celery runs the tasks eagerly in tests.
+        self.assertTrue(ProgramEnrollment.enroll(self.user, self.program.id))
+        self.assert_enrolled(self.user)
+
+        self.assertTrue(ProgramEnrollment.unenroll(self.user, self.program.id))
+        self.assert_enrolled(self.user, False)
+
+    def test_enrollment_tasks_are_delayed(self):
+        with patch('openedx.core.djangoapps.micro_masters.tasks.enroll_in_program_courses.apply_async') as mock_task:
+            ProgramEnrollment.enroll(self.user, self.program.id)
+        enrollment = ProgramEnrollment.objects.get(user=self.user, program=self.program)
+        mock_task.assert_called_once_with(
+            args=[self.user.id, self.program.id, to_timestamp(enrollment.modified)], countdown=TASK_COMMIT_COUNTDOWN,
+        )
+
+    def test_existing_enrollment_modes_are_kept(self):
+        CourseEnrollmentFactory(user=self.user, course_id=self.course_keys[0], mode='verified', is_active=False)
+        ProgramEnrollment.enroll(self.user, self.program.id)
+        self.assert_enrolled(self.user)
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_keys[0]), ('verified', True))
+
+    def test_retry_until_enrollment_committed(self):
+        ProgramEnrollmentFactory(user=self.user, program=self.program, is_active=False)
+        # The program enrollment of a request that did not commit yet is
+        # either missing or not modified since the task was queued.
+        for user_id in (self.user.id, UserFactory().id):
+            with patch.object(enroll_in_program_courses, 'retry', return_value=Retry()) as mock_retry:
+                with self.assertRaises(Retry):
+                    enroll_in_program_courses(user_id, self.program.id, to_timestamp(timezone.now()) + 60)
+            self.assertTrue(mock_retry.called)
+        self.assert_enrolled(self.user, False)
+
+    def test_superseded_enrollment_changes_are_skipped(self):
+        enrollment = ProgramEnrollmentFactory(user=self.user, program=self.program, is_active=False)
+        enroll_in_program_courses(self.user.id, self.program.id, to_timestamp(enrollment.modified))
+        self.assert_enrolled(self.user, False)
+
+        enrollment.is_active = True
+        enrollment.save()
+        enroll_in_program_courses(self.user.id, self.program.id, to_timestamp(enrollment.modified))
+        unenroll_from_program_courses(self.user.id, self.program.id, to_timestamp(enrollment.modified))
+        self.assert_enrolled(self.user)
+
+    @patch('openedx.core.djangoapps.micro_masters.enrollment.CourseEnrollment.emit_event')
+    def test_enrollment_receivers_run(self, mock_emit_event):
+        CourseEnrollmentFactory(user=self.user, course_id=self.course_keys[0], is_active=False)
+        with patch('student.models.ENROLL_STATUS_CHANGE.send') as mock_signal:
+            ProgramEnrollment.enroll(self.user, self.program.id)
+        self.assertEqual(mock_signal.call_count, len(self.course_keys))
+        self.assertEqual(mock_emit_event.call_count, len(self.course_keys))
+        for course_key in self.course_keys:
+            history = CourseEnrollment.history.filter(user=self.user, course_id=course_key).latest('history_date')
+            self.assertTrue(history.is_active)
+
+        with patch('student.models.ENROLL_STATUS_CHANGE.send') as mock_signal:
+            ProgramEnrollment.unenroll(self.user, self.program.id)
+        self.assertEqual(mock_signal.call_count, len(self.course_keys))
+        for course_key in self.course_keys:
+            history = CourseEnrollment.history.filter(user=self.user, course_id=course_key).latest('history_date')
+            self.assertFalse(history.is_active)
+
+    def test_bulk_enroll(self):
+        users = [self.user, UserFactory(), UserFactory()]
+        ProgramEnrollmentFactory(user=users[1], program=self.program, is_active=False)
+        ProgramEnrollmentFactory(user=users[2], program=self.program, is_active=True)
+
+        self.assertEqual(ProgramEnrollment.bulk_enroll(self.program, users), 2)
+        for user in users:
+            self.assertTrue(ProgramEnrollment.is_enrolled(user, self.program.id))
+            self.assert_enrolled(user)
+
+    def test_cohort_retry_until_enrollments_committed(self):
+        users = [self.user, UserFactory()]
+        ProgramEnrollmentFactory(user=self.user, program=self.program)
+        with patch.object(enroll_cohort_in_program_courses, 'retry', return_value=Retry()):
+            with self.assertRaises(Retry):
+                enroll_cohort_in_program_courses(
+                    self.program.id, [user.id for user in users], to_timestamp(timezone.now()) - 60,
+                )
+        for user in users:
+            self.assert_enrolled(user, False)
+
+
+class ProgramReceiptTest(TestCase):
+    """
+    Tests that program receipts are mailed with the settings of the site
+    the order was purchased on.
+    """
+    SITE_VALUES = {
+        'SITE_NAME': 'learn.example.com',
+        'email_from_address': 'sales@example.com',
+        'platform_name': 'Example Academy',
+        'payment_support_email': 'billing@example.com',
+        'payment_email_signature': 'The Example team',
+    }
+
+    def get_site_value(self, name, default=None):
+        return self.SITE_VALUES.get(name, default)
+
+    @patch.object(ProgramOrder, 'receipt_pdf', return_value='%PDF')
+    @patch('openedx.core.djangoapps.micro_masters.models.render_to_string', return_value='Receipt')
+    def test_receipt_uses_site_of_purchase(self, mock_render, _mock_pdf):
+        order = ProgramOrderFactory()
+        with patch('openedx.core.djangoapps.micro_masters.tasks.send_program_receipt.apply_async') as mock_task:
+            with patch(
+                'openedx.core.djangoapps.micro_masters.models.configuration_helpers.get_value',
+                side_effect=self.get_site_value
+            ):
+                order.purchase()
+
+        # The worker runs without the site of the request.
+        send_program_receipt(*mock_task.call_args[1]['args'])
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].from_email, 'sales@example.com')
+        context = mock_render.call_args[0][1]
+        self.assertEqual(context['site_name'], 'learn.example.com')
+        self.assertEqual(context['platform_name'], 'Example Academy')
+        self.assertEqual(context['payment_support_email'], 'billing@example.com')
+        self.assertEqual(context['payment_email_signature'], 'The Example team')
@@ -10,7 +10,6 @@ from datetime import datetime
 from hashlib import sha256
 from decimal import Decimal, InvalidOperation
 
-from django.db.models import Q
 from django.utils.encoding import smart_str
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
@@ -25,18 +24,20 @@ from django.conf import settings
 from django.utils.translation import ugettext as _, ugettext_noop
 
 from edxmako.shortcuts import render_to_response, render_to_string
-from xmodule.modulestore.django import ModuleI18nService
 from shoppingcart.processors.exceptions import *
 from microsite_configuration import microsite
 from courseware.courses import get_course_by_id
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
+from opaque_keys.edx.keys import CourseKey
 from .models import (
     Program, ProgramEnrollment,
-    ProgramOrder, ProgramCoupon,
+    ProgramOrder,
     ProgramCouponRedemption, ProgramGeneratedCertificate,
     ProgramCertificateSignatories
 )
+from .coupons import get_active_program_coupons
+from .program_cards import get_program_cards, load_course_overviews
 from shoppingcart.exceptions import (
     MultipleCouponsNotAllowedException, InvalidCartItem,
     ItemNotFoundInCartException, RedemptionCodeError
@@ -578,9 +579,11 @@ def program_about(request, program_id):
     except Exception, e:
         raise Http404
 
-    courses = []
-    for course in program.courses.select_related():
-        courses += [CourseOverview.get_from_id(course.course_key)]
+    program_card = get_program_cards([program.id])[0]
+    # The template reads CourseOverview attributes, the card only provides the keys.
+    course_keys = [CourseKey.from_string(course['id']) for course in program_card['courses']]
+    overviews = load_course_overviews(course_keys)
+    courses = [overviews[course_key] for course_key in course_keys if course_key in overviews]
     user_is_enrolled = False
     if user.is_authenticated():
         user_is_enrolled = ProgramEnrollment.is_enrolled(user, program.id)
@@ -592,6 +595,7 @@ def program_about(request, program_id):
     currency = settings.PAID_COURSE_REGISTRATION_CURRENCY
     context['currency'] = currency
     context['program'] = program
+    context['program_card'] = program_card
     context['courses'] = courses
     context['user_is_enrolled'] = user_is_enrolled
 
@@ -635,27 +639,6 @@ def program_postpay_callback(request):
                                                               'error_html': result['error_html']})
 
 
-def programs_order_history(user):
-    """
-    Returns the list of previously purchased orders for a user. Only the orders with
-    PaidCourseRegistration and CourseRegCodeItem are returned.
-    """
-    order_history_list = []
-    purchased_order_items = ProgramOrder.objects.filter(
-        user=user, status='purchased').order_by('-purchase_time')
-    for order_item in purchased_order_items:
-        # Avoid repeated entries for the same order id.
-        if order_item.id not in [item['number'] for item in order_history_list]:
-            order_history_list.append({
-                'number': order_item.id,
-                'title': order_item.program.name,
-                'price': float(order_item.program.price),
-                'receipt_url': reverse('openedx.core.djangoapps.micro_masters.views.show_program_receipt', kwargs={'ordernum': order_item.id}),
-                'order_date': ModuleI18nService().strftime(order_item.purchase_time, 'SHORT_DATE')
-            })
-    return order_history_list
-
-
 def render_purchase_form_html(cart, callback_url=None, extra_data=None):
     """
     Renders the HTML of the hidden POST form that must be used to initiate a purchase with CyberSource
@@ -800,12 +783,7 @@ def use_code(request):
         order = ProgramOrder.objects.get(pk=order_id)
     except Exception, e:
         return HttpResponseNotFound(_("Order does not exist"))
-    coupons = ProgramCoupon.objects.filter(
-        Q(code=code),
-        Q(is_active=True),
-        Q(expiration_date__gt=datetime.now(pytz.UTC)) |
-        Q(expiration_date__isnull=True)
-    )
+    coupons = get_active_program_coupons(code)
     if not coupons:
         return HttpResponseNotFound(_("Discount does not exist against code '{code}'.").format(code=code))
 